@@ -1,57 +1,342 @@
-from fastapi import APIRouter, Depends
+import base64
+import binascii
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.core.database import get_db
-from app.schemas import DashboardResponse, ForecastPointItem, LocationRequest, ProvinceItem, WarningItem
-from app.services.province import sorted_provinces
+from app.core.database import get_async_db, get_db
+from app.core.metrics import API_STAGE_SECONDS
+from app.schemas import (
+    BatchDashboardRequest,
+    BatchDashboardResponse,
+    DashboardResponse,
+    LocationRequest,
+    ReadinessResponse,
+    TrackedLocationItem,
+    TrackedLocationRequest,
+    WarningItem,
+    WarningPage,
+)
+from app.services.cache import DashboardCache, get_dashboard_cache
+from app.services.events import get_warning_broker
+from app.services.geo import resolve_province
+from app.services.locations import LocationRegistry
+from app.services.province import PROVINCE_LOOKUP, sorted_provinces
+from app.services.serialization import dumps
+from app.services.spatial import get_forecast_locator
+from app.models import WarningRecord
 from app.storage.repository import WeatherRepository
+from app.storage.series import SeriesPoint
 
 router = APIRouter()
 
+T = TypeVar("T")
+
 
 @router.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@router.get("/ready", response_model=ReadinessResponse)
+async def ready(db: AsyncSession = Depends(get_async_db)) -> ReadinessResponse:
+    """Readiness only needs the database; data freshness is reported, not enforced."""
+    try:
+        status = await db.run_sync(lambda session: WeatherRepository(session).get_refresh_status("ingestion"))
+    except SQLAlchemyError as exc:
+        raise HTTPException(status_code=503, detail="database unavailable") from exc
+
+    last_success_at = status.last_success_at if status else None
+    if last_success_at is None:
+        return ReadinessResponse(
+            status="empty", last_success_at=None, age_seconds=None, last_error=status.last_error if status else None
+        )
+    if last_success_at.tzinfo is None:
+        last_success_at = last_success_at.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - last_success_at).total_seconds()
+    stale = age > get_settings().data_stale_after_minutes * 60
+    return ReadinessResponse(
+        status="stale" if stale else "fresh",
+        last_success_at=last_success_at,
+        age_seconds=round(age, 1),
+        last_error=status.last_error,
+    )
+
+
 @router.post("/dashboard", response_model=DashboardResponse)
-def dashboard(payload: LocationRequest, db: Session = Depends(get_db)) -> DashboardResponse:
+async def dashboard(payload: LocationRequest, db: AsyncSession = Depends(get_async_db)) -> Response:
+    payload = payload.model_copy(update={"province": resolve_province(payload.lat, payload.lon, fallback=payload.province)})
+    cache = get_dashboard_cache()
+    # The data version doubles as the rebuild token for the in-memory cell index.
+    version = await _cache_io(cache, cache.version)
+    with API_STAGE_SECONDS.labels("dashboard", "locate").time():
+        cell = await db.run_sync(
+            lambda session: get_forecast_locator().nearest_cell(
+                WeatherRepository(session), payload.lat, payload.lon, token=version
+            )
+        )
+
+    def lookup() -> tuple[str, bytes | None]:
+        key = cache.key(
+            cell if cell is not None else "-",
+            payload.province or "",
+            int(payload.warnings_province_only),
+            payload.level or "",
+            payload.hazard_type or "",
+            int(payload.active_only),
+            payload.warning_limit or "",
+        )
+        return key, cache.get(key)
+
+    with API_STAGE_SECONDS.labels("dashboard", "cache").time():
+        key, body = await _cache_io(cache, lookup)
+    if body is None:
+        body = await db.run_sync(lambda session: _dashboard_body(payload, WeatherRepository(session), cell))
+        await _cache_io(cache, lambda: cache.set(key, body))
+    return Response(content=body, media_type="application/json")
+
+
+async def _cache_io(cache: DashboardCache, func: Callable[[], T]) -> T:
+    # Redis calls block, so they go to the threadpool; the in-process tier alone needs no thread hop.
+    if cache.redis is None:
+        return func()
+    return await run_in_threadpool(func)
+
+
+def _dashboard_body(payload: LocationRequest, repo: WeatherRepository, cell: int | None) -> bytes:
+    """DashboardResponse JSON built straight from column tuples, without per-row ORM or Pydantic objects."""
+    with API_STAGE_SECONDS.labels("dashboard", "query").time():
+        warnings = repo.list_warning_rows(
+            payload.province if payload.warnings_province_only else None,
+            level=payload.level,
+            hazard_type=payload.hazard_type,
+            active_at=datetime.now(timezone.utc) if payload.active_only else None,
+            limit=payload.warning_limit,
+        )
+        forecast = repo.list_forecast_rows(cell) if cell is not None else []
+        last_refresh_at = repo.get_last_refresh("ingestion")
+        stale_sources = repo.list_stale_sources()
+    with API_STAGE_SECONDS.labels("dashboard", "serialize").time():
+        return dumps(
+            {
+                "current_province": payload.province,
+                "provinces": _province_items(payload.province if payload.province in PROVINCE_LOOKUP else None),
+                "warnings": [_warning_row(row) for row in warnings],
+                "forecast_points": [
+                    {"forecast_time": forecast_time, "temperature_c": temperature_c, "humidity_pct": humidity_pct}
+                    for forecast_time, temperature_c, humidity_pct in forecast
+                ],
+                "last_refresh_at": last_refresh_at,
+                "refresh_interval_minutes": get_settings().warning_refresh_minutes,
+                "stale_sources": stale_sources,
+            }
+        )
+
+
+@lru_cache(maxsize=None)
+def _province_items(current: str | None) -> tuple[dict[str, Any], ...]:
+    return tuple(
+        {"name": item.name, "pinyin_initial": item.pinyin_initial, "highlighted": item.name == current}
+        for item in sorted_provinces(current)
+    )
+
+
+def _warning_row(row: Any) -> dict[str, Any]:
+    item = dict(row._mapping)
+    item["is_ai_augmented"] = "LLM" in item["source"]
+    return item
+
+
+@router.post("/dashboard/batch", response_model=BatchDashboardResponse)
+async def dashboard_batch(
+    payload: BatchDashboardRequest,
+    accept: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Many locations in one call: one warnings query, one (chunked) forecast query, shared parts sent once.
+
+    With `Accept: application/x-ndjson` the same content is streamed as one JSON object per line.
+    """
     settings = get_settings()
-    repo = WeatherRepository(db)
-    warnings = repo.list_warnings(None)
-    forecast_rows = repo.list_forecast(round(payload.lat, 4), round(payload.lon, 4))
-    provinces = [
-        ProvinceItem(name=item.name, pinyin_initial=item.pinyin_initial, highlighted=item.name == payload.province)
-        for item in sorted_provinces(payload.province)
+    if len(payload.locations) > settings.dashboard_batch_max_locations:
+        raise HTTPException(
+            status_code=413, detail=f"at most {settings.dashboard_batch_max_locations} locations per batch"
+        )
+    cache = get_dashboard_cache()
+    version = await _cache_io(cache, cache.version)
+    rows = await db.run_sync(lambda session: _batch_rows(payload, WeatherRepository(session), version))
+    if accept and "application/x-ndjson" in accept:
+        # All queries are done above, so the session can close with the request; Starlette pulls each line of the
+        # sync generator in the threadpool as the client reads.
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+    body = await run_in_threadpool(lambda: dumps(_batch_body(rows)))
+    return Response(content=body, media_type="application/json")
+
+
+@dataclass
+class _BatchRows:
+    warnings: list[Any]
+    # (request item, resolved province, forecast points of its nearest cell)
+    locations: list[tuple[Any, str | None, list[SeriesPoint]]]
+    last_refresh_at: datetime | None
+    stale_sources: list[str]
+
+
+def _batch_rows(payload: BatchDashboardRequest, repo: WeatherRepository, token: object) -> _BatchRows:
+    """Query results only; serialization happens off the event loop."""
+    locator = get_forecast_locator()
+    resolved = [
+        (
+            item,
+            resolve_province(item.lat, item.lon, fallback=item.province),
+            locator.nearest_cell(repo, item.lat, item.lon, token=token),
+        )
+        for item in payload.locations
     ]
-    return DashboardResponse(
-        current_province=payload.province,
-        provinces=provinces,
-        warnings=[
-            WarningItem(
-                source=w.source,
-                title=w.title,
-                level=w.level,
-                hazard_type=w.hazard_type,
-                province=w.province,
-                issue_time=w.issue_time,
-                expires_at=w.expires_at,
-                detail_url=w.detail_url,
-                summary=w.summary,
-                confidence=w.confidence,
-                is_ai_augmented="LLM" in w.source,
-            )
-            for w in warnings
-        ],
-        forecast_points=[
-            ForecastPointItem(
-                forecast_time=f.forecast_time,
-                temperature_c=f.temperature_c,
-                humidity_pct=f.humidity_pct,
-            )
-            for f in forecast_rows
+    series = repo.list_forecasts({cell for _, _, cell in resolved if cell is not None})
+    warnings = repo.list_warning_rows(
+        None,
+        level=payload.level,
+        hazard_type=payload.hazard_type,
+        active_at=datetime.now(timezone.utc) if payload.active_only else None,
+        limit=payload.warning_limit,
+    )
+    return _BatchRows(
+        warnings=warnings,
+        locations=[
+            (item, province, series.get(cell, []) if cell is not None else []) for item, province, cell in resolved
         ],
         last_refresh_at=repo.get_last_refresh("ingestion"),
-        refresh_interval_minutes=settings.refresh_interval_minutes,
+        stale_sources=repo.list_stale_sources(),
+    )
+
+
+def _batch_meta(rows: _BatchRows) -> dict[str, Any]:
+    return {
+        "provinces": _province_items(None),
+        "last_refresh_at": rows.last_refresh_at,
+        "refresh_interval_minutes": get_settings().warning_refresh_minutes,
+        "stale_sources": rows.stale_sources,
+    }
+
+
+def _batch_body(rows: _BatchRows) -> dict[str, Any]:
+    return {
+        **_batch_meta(rows),
+        "warnings": [_warning_row(row) for row in rows.warnings],
+        "locations": [_location_item(*location) for location in rows.locations],
+    }
+
+
+def _ndjson_lines(rows: _BatchRows) -> Iterator[bytes]:
+    yield dumps({"type": "meta", **_batch_meta(rows)}) + b"\n"
+    for row in rows.warnings:
+        yield dumps({"type": "warning", "item": _warning_row(row)}) + b"\n"
+    for location in rows.locations:
+        yield dumps({"type": "location", "item": _location_item(*location)}) + b"\n"
+
+
+def _location_item(item: Any, province: str | None, points: list[SeriesPoint]) -> dict[str, Any]:
+    return {
+        "ref": item.ref,
+        "lat": item.lat,
+        "lon": item.lon,
+        "province": province,
+        "forecast_points": [
+            {"forecast_time": forecast_time, "temperature_c": temperature_c, "humidity_pct": humidity_pct}
+            for forecast_time, temperature_c, humidity_pct in points
+        ],
+    }
+
+
+@router.get("/warnings", response_model=WarningPage)
+async def list_warnings(
+    province: str | None = None,
+    level: str | None = None,
+    hazard_type: str | None = None,
+    active: bool = True,
+    at: datetime | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> WarningPage:
+    after = _decode_cursor(cursor) if cursor else None
+    rows = await db.run_sync(
+        lambda session: WeatherRepository(session).list_warnings(
+            province,
+            level=level,
+            hazard_type=hazard_type,
+            active_at=(at or datetime.now(timezone.utc)) if active else None,
+            after=after,
+            limit=limit + 1,
+        )
+    )
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1]) if len(rows) > limit else None
+    return WarningPage(items=[_warning_item(w) for w in page], next_cursor=next_cursor)
+
+
+@router.get("/warnings/stream")
+async def stream_warnings(province: str | None = None) -> StreamingResponse:
+    """Server-sent events: a `warnings` event with new/updated/expired items per province changed by a refresh."""
+    return StreamingResponse(
+        get_warning_broker().subscribe(province),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+def _warning_item(w: WarningRecord) -> WarningItem:
+    return WarningItem(
+        source=w.source,
+        title=w.title,
+        level=w.level,
+        hazard_type=w.hazard_type,
+        province=w.province,
+        issue_time=w.issue_time,
+        expires_at=w.expires_at,
+        detail_url=w.detail_url,
+        summary=w.summary,
+        confidence=w.confidence,
+        is_ai_augmented="LLM" in w.source,
+    )
+
+
+def _encode_cursor(row: WarningRecord) -> str:
+    return base64.urlsafe_b64encode(f"{row.issue_time.isoformat()}|{row.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        issue_time, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(issue_time), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="invalid cursor") from exc
+
+
+@router.get("/locations", response_model=list[TrackedLocationItem])
+def list_locations(db: Session = Depends(get_db)) -> list[TrackedLocationItem]:
+    registry = LocationRegistry(WeatherRepository(db))
+    return [
+        TrackedLocationItem(lat=item.lat, lon=item.lon, label=item.label, province=item.province)
+        for item in registry.list_locations()
+    ]
+
+
+@router.post("/locations", response_model=TrackedLocationItem)
+def register_location(payload: TrackedLocationRequest, db: Session = Depends(get_db)) -> TrackedLocationItem:
+    province = resolve_province(payload.lat, payload.lon, fallback=payload.province)
+    if province is None:
+        raise HTTPException(status_code=422, detail="province could not be resolved from lat/lon")
+    item = WeatherRepository(db).add_tracked_location(payload.lat, payload.lon, payload.label, province)
+    return TrackedLocationItem(lat=item.lat, lon=item.lon, label=item.location_label, province=item.province)
@@ -7,19 +7,62 @@ class Settings(BaseSettings):
     env: str = "dev"
     api_prefix: str = "/api/v1"
     database_url: str = "sqlite:///./weather.db"
-    refresh_interval_minutes: int = 30
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    sqlite_busy_timeout_ms: int = 5000
+    warning_refresh_minutes: int = 5
+    forecast_refresh_minutes: int = 60
+    nmc_max_refresh_minutes: int = 60
+    scheduler_tick_seconds: float = 15.0
+    job_lease_seconds: int = 600
+    retention_interval_minutes: int = 360
+    warning_history_days: int = 30
+    forecast_retention_hours: int = 24
+    forecast_history_days: int = 7
+    sqlite_vacuum_free_ratio: float = 0.25
+    ingest_on_startup: bool = False
+    data_stale_after_minutes: int = 90
+    metrics_enabled: bool = True
+    worker_metrics_port: int = 9100
     ai_confidence_threshold: float = 0.65
     http_timeout_seconds: int = 20
+    http_max_connections: int = 50
+    http_max_connections_per_host: int = 8
+    http_keepalive_expiry_seconds: float = 60.0
+    ingestion_max_concurrency: int = 4
+    ingest_province_capitals: bool = True
+    forecast_storage: str = "rows"
+    forecast_grid_degrees: float = 0.1
+    forecast_search_radius_km: float = 50.0
+    forecast_index_max_age_seconds: float = 300.0
+    province_geojson_path: str | None = None
+
+    redis_url: str | None = None
+    redis_socket_timeout_seconds: float = 0.5
+    dashboard_cache_ttl_seconds: int = 1800
+    dashboard_cache_local_ttl_seconds: int = 30
+    dashboard_cache_max_entries: int = 1024
+    dashboard_cache_version_check_seconds: float = 5.0
+    dashboard_batch_max_locations: int = 1000
+    warning_stream_heartbeat_seconds: float = 15.0
+    warning_stream_queue_size: int = 100
 
     warning_provider: str = "mock"
     forecast_provider: str = "mock"
     fallback_to_mock_on_failure: bool = True
+    circuit_failure_threshold: int = 3
+    circuit_open_seconds: int = 300
+    circuit_max_open_seconds: int = 3600
+    warning_source_deadline_seconds: float = 90.0
 
     nmc_source_urls: str = (
         "https://www.nmc.cn/publish/weatherperday/index.htm,"
         "https://www.nmc.cn/publish/country/warning/dust.html,"
         "https://www.nmc.cn/publish/weather-bulletin/index.htm"
     )
+    nmc_content_element_id: str = "text"
 
     qweather_api_base: str = "https://devapi.qweather.com/v7"
     qweather_api_key: str | None = None
@@ -31,6 +74,15 @@ class Settings(BaseSettings):
     openai_api_base: str = "https://api.openai.com/v1"
     openai_api_key: str | None = None
     openai_model: str = "gpt-4.1-mini"
+    ai_cache_ttl_seconds: int = 604800
+    ai_cache_max_entries: int = 5000
+    ai_max_concurrency: int = 4
+    ai_tokens_per_minute: int = 60000
+    ai_batch_max_chars: int = 3000
+    ai_batch_max_bulletins: int = 4
+    ai_max_retries: int = 3
+    ai_retry_base_seconds: float = 0.5
+    ai_cycle_deadline_seconds: float = 60.0
 
     default_lat: float = 39.9042
     default_lon: float = 116.4074
@@ -43,6 +95,11 @@ class Settings(BaseSettings):
     def nmc_source_urls_list(self) -> list[str]:
         return [item.strip() for item in self.nmc_source_urls.split(",") if item.strip()]
 
+    @property
+    def warning_providers_list(self) -> list[str]:
+        names = [item.strip().lower() for item in self.warning_provider.split(",") if item.strip()]
+        return list(dict.fromkeys(names)) or ["mock"]
+
 
 @lru_cache
 def get_settings() -> Settings:
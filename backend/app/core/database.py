@@ -1,14 +1,104 @@
-from sqlalchemy import create_engine
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Collection
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args)
+
+def _engine_options(url: str, settings: Settings) -> dict[str, Any]:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+        }
+    options: dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    # In-memory databases live in a single connection, so queue-pool sizing does not apply.
+    if parsed.database not in (None, "", ":memory:") and parsed.query.get("mode") != "memory":
+        options.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    return options
+
+
+def _configure_sqlite(engine: Engine, settings: Settings) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection: Any, _record: Any) -> None:
+        # WAL lets API readers proceed while the worker writes; busy_timeout waits out the remaining lock windows.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def build_engine(settings: Settings, url: str | None = None) -> Engine:
+    """Sync engine with the configured pool; shared by the API and the worker."""
+    url = url or settings.database_url
+    engine = create_engine(url, **_engine_options(url, settings))
+    _configure_sqlite(engine, settings)
+    return engine
+
+
+def compact(engine: Engine, tables: Collection[str], settings: Settings) -> list[str]:
+    """Refresh planner statistics of `tables` and give back space freed by deletes; returns the statements run.
+
+    PostgreSQL gets a plain `VACUUM (ANALYZE)` per table, which marks dead tuples reusable without locking
+    readers. SQLite only shrinks with a whole-file `VACUUM`, so that runs once free pages reach
+    SQLITE_VACUUM_FREE_RATIO of the file.
+    """
+    statements: list[str] = []
+    # VACUUM cannot run inside a transaction block on either backend.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == "postgresql":
+            statements = [f'VACUUM (ANALYZE) "{table}"' for table in tables]
+        elif engine.dialect.name == "sqlite":
+            pages = conn.exec_driver_sql("PRAGMA page_count").scalar() or 0
+            free = conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+            if pages and free / pages >= settings.sqlite_vacuum_free_ratio:
+                statements.append("VACUUM")
+            statements += [f'ANALYZE "{table}"' for table in tables]
+        else:
+            statements = [f"ANALYZE {table}" for table in tables]
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+    return statements
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync URL: aiosqlite for SQLite, psycopg's async mode for PostgreSQL."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() in ("psycopg2", "psycopg"):
+        return parsed.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url
+
+
+def build_async_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
+    url = async_database_url(url or settings.database_url)
+    engine = create_async_engine(url, **_engine_options(url, settings))
+    _configure_sqlite(engine.sync_engine, settings)
+    return engine
+
+
+engine = build_engine(settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_engine: AsyncEngine | None = None
+_async_sessions: async_sessionmaker[AsyncSession] | None = None
+
 
 class Base(DeclarativeBase):
     pass
@@ -20,3 +110,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    # Built on first use, so the worker (sync only) never loads an async driver.
+    global _async_engine, _async_sessions
+    if _async_engine is None:
+        _async_engine = build_async_engine(settings)
+        _async_sessions = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_sessions() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from importlib.util import find_spec
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import Settings
+from app.core.metrics import HTTP_DOWNLOAD_BYTES
+
+
+class HttpPool:
+    """Long-lived pooled AsyncClient shared by every provider, with a per-host concurrency cap."""
+
+    def __init__(self, settings: Settings, transport: httpx.AsyncBaseTransport | None = None):
+        self.settings = settings
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.settings.http_timeout_seconds,
+                # HTTP/2 needs the optional `h2` package (installed via `httpx[http2]`).
+                http2=find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=self.settings.http_max_connections,
+                    max_keepalive_connections=self.settings.http_max_connections,
+                    keepalive_expiry=self.settings.http_keepalive_expiry_seconds,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.settings.http_max_connections_per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        async with self._host_slot(url):
+            response = await self.client.request(method, url, **kwargs)
+        HTTP_DOWNLOAD_BYTES.labels(response.url.host).inc(response.num_bytes_downloaded)
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_slots.clear()
+
+    async def __aenter__(self) -> HttpPool:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Upstream fetches and AI calls run from tens of milliseconds to the full HTTP timeout.
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+# In-process stages (parsing, serialization, single queries) are expected well under a second.
+_FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PROVIDER_FETCH_SECONDS = Histogram(
+    "weather_provider_fetch_seconds",
+    "Time spent in one provider fetch, fallback excluded.",
+    ["kind", "provider", "outcome"],
+    buckets=_SLOW_BUCKETS,
+)
+PROVIDER_CIRCUIT_SKIPS = Counter(
+    "weather_provider_circuit_skips", "Provider calls skipped because the circuit was open.", ["kind", "provider"]
+)
+HTTP_DOWNLOAD_BYTES = Counter(
+    "weather_http_download_bytes", "Response bytes downloaded from upstream hosts.", ["host"]
+)
+NMC_PARSE_SECONDS = Histogram(
+    "weather_nmc_parse_seconds", "Time spent classifying one NMC bulletin page.", buckets=_FAST_BUCKETS
+)
+AI_REQUEST_SECONDS = Histogram(
+    "weather_ai_request_seconds", "Latency of one AI extraction request, retries included.", ["outcome"],
+    buckets=_SLOW_BUCKETS,
+)
+AI_TOKENS = Counter("weather_ai_tokens", "Tokens reported by the AI provider.", ["kind"])
+AI_CACHE_LOOKUPS = Counter("weather_ai_cache_lookups", "AI result cache lookups.", ["result"])
+INGESTION_STAGE_SECONDS = Histogram(
+    "weather_ingestion_stage_seconds", "Time spent in each stage of an ingestion cycle.", ["stage"],
+    buckets=_SLOW_BUCKETS,
+)
+DB_WRITE_SECONDS = Histogram(
+    "weather_db_write_seconds", "Time spent in one repository upsert, commit included.", ["table"],
+    buckets=_FAST_BUCKETS,
+)
+DB_ROWS_WRITTEN = Counter("weather_db_rows_written", "Rows changed by ingestion upserts.", ["table", "op"])
+RETENTION_ROWS = Counter(
+    "weather_retention_rows", "Rows archived or pruned by the retention job.", ["table", "op"]
+)
+API_REQUEST_SECONDS = Histogram(
+    "weather_api_request_seconds",
+    "Time from request to response start, by route name.",
+    ["method", "route", "status"],
+    buckets=_FAST_BUCKETS,
+)
+API_STAGE_SECONDS = Histogram(
+    "weather_api_stage_seconds", "Time spent in each stage of building a read response.", ["endpoint", "stage"],
+    buckets=_FAST_BUCKETS,
+)
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware recording API_REQUEST_SECONDS.
+
+    Latency is taken at `http.response.start`, so long-lived streams report their time to first byte. Requests
+    that match no route share one label to keep the series count bounded.
+    """
+
+    def __init__(self, app: Any, skip_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+
+        async def timed_send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                # The router stores the matched route in the scope; its name is stable whatever the mount prefix.
+                route = getattr(scope.get("route"), "name", "unmatched")
+                API_REQUEST_SECONDS.labels(scope["method"], route, str(message["status"])).observe(
+                    time.perf_counter() - started
+                )
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
@@ -1,11 +1,16 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
 from app.core.config import get_settings
-from app.core.database import Base, engine, SessionLocal
-from app.services.ingestion import IngestionInput, IngestionService
-from app.storage.repository import WeatherRepository
+from app.core.database import Base, engine, SessionLocal, dispose_async_engine
+from app.core.metrics import MetricsMiddleware, render
+from app.services.events import close_warning_broker
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -18,22 +23,49 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, skip_paths=("/metrics",))
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
+
+
+def _ingest_once() -> None:
+    from app.services.ingestion import IngestionService
+    from app.services.locations import LocationRegistry
+    from app.storage.repository import WeatherRepository
+
     db = SessionLocal()
     try:
         repository = WeatherRepository(db)
         service = IngestionService(repository, settings=settings)
-        service.refresh(
-            IngestionInput(
-                lat=settings.default_lat,
-                lon=settings.default_lon,
-                province=settings.default_province,
-                label=settings.default_label,
-            )
-        )
+        service.refresh_many(LocationRegistry(repository, settings=settings).list_locations())
+    except Exception:  # noqa: BLE001
+        logger.exception("Startup ingestion failed; serving the data already in the database")
     finally:
         db.close()
+
+
+@app.on_event("startup")
+async def on_startup() -> None:
+    # Serve whatever the database holds right away; the worker owns ingestion.
+    Base.metadata.create_all(bind=engine)
+    app.state.ingestion_task = None
+    if settings.ingest_on_startup:
+        # On a worker thread with its own event loop: parsing, AI calls and database writes are blocking and must
+        # not stall requests served meanwhile.
+        app.state.ingestion_task = asyncio.create_task(asyncio.to_thread(_ingest_once))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    task = getattr(app.state, "ingestion_task", None)
+    if task is not None and not task.done():
+        task.cancel()
+    await close_warning_broker()
+    await dispose_async_engine()
@@ -1,3 +1,27 @@
-from app.models.weather import WarningRecord, ForecastPoint, RefreshStatus
+from app.models.weather import (
+    AiExtractionCacheEntry,
+    ForecastHistory,
+    ForecastPoint,
+    ForecastSeries,
+    JobLease,
+    ProviderCircuit,
+    RefreshStatus,
+    SourceFetchState,
+    TrackedLocation,
+    WarningHistory,
+    WarningRecord,
+)
 
-__all__ = ["WarningRecord", "ForecastPoint", "RefreshStatus"]
+__all__ = [
+    "AiExtractionCacheEntry",
+    "WarningRecord",
+    "ForecastHistory",
+    "ForecastPoint",
+    "ForecastSeries",
+    "JobLease",
+    "ProviderCircuit",
+    "RefreshStatus",
+    "SourceFetchState",
+    "TrackedLocation",
+    "WarningHistory",
+]
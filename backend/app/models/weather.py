@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Index, Integer, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -8,27 +8,65 @@ from app.core.database import Base
 
 class WarningRecord(Base):
     __tablename__ = "warning_records"
+    __table_args__ = (
+        UniqueConstraint("source", "detail_url", "province", "issue_time", name="uq_warning_records_natural_key"),
+        Index("ix_warning_records_province_issue_time", "province", "issue_time"),
+        Index("ix_warning_records_expires_at", "expires_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     source: Mapped[str] = mapped_column(String(64), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     level: Mapped[str] = mapped_column(String(32), nullable=False)
     hazard_type: Mapped[str] = mapped_column(String(64), nullable=False)
-    province: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    province: Mapped[str] = mapped_column(String(64), nullable=False)
     issue_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     detail_url: Mapped[str] = mapped_column(String(512), nullable=False)
     summary: Mapped[str] = mapped_column(String(1024), nullable=False)
     confidence: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
+    # Lost the cross-source merge to another source's copy: hidden from every read, but kept so a conditional fetch
+    # of its page can still hand it back.
+    superseded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
+class WarningHistory(Base):
+    """Warnings removed from `warning_records` (expired or withdrawn), one logical partition per `archive_day`.
+
+    Pruning drops whole days past WARNING_HISTORY_DAYS; nothing on the dashboard path reads this table.
+    """
+
+    __tablename__ = "warning_history"
+    __table_args__ = (Index("ix_warning_history_archive_day", "archive_day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    archive_day: Mapped[date] = mapped_column(Date, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    level: Mapped[str] = mapped_column(String(32), nullable=False)
+    hazard_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    province: Mapped[str] = mapped_column(String(64), nullable=False)
+    issue_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    detail_url: Mapped[str] = mapped_column(String(512), nullable=False)
+    summary: Mapped[str] = mapped_column(String(1024), nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class ForecastPoint(Base):
     __tablename__ = "forecast_points"
+    __table_args__ = (
+        UniqueConstraint("lat", "lon", "forecast_time", name="uq_forecast_points_natural_key"),
+        Index("ix_forecast_points_cell_key_forecast_time", "cell_key", "forecast_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     lat: Mapped[float] = mapped_column(Float, nullable=False)
     lon: Mapped[float] = mapped_column(Float, nullable=False)
+    # Grid cell of (lat, lon) at FORECAST_GRID_DEGREES; see app.services.spatial.cell_key.
+    cell_key: Mapped[int] = mapped_column(BigInteger, nullable=False)
     location_label: Mapped[str] = mapped_column(String(128), nullable=False)
     province: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
     forecast_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
@@ -38,6 +76,57 @@ class ForecastPoint(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
+class ForecastSeries(Base):
+    """Latest forecast run of one location, stored columnar (FORECAST_STORAGE=series); see app.storage.series."""
+
+    __tablename__ = "forecast_series"
+    __table_args__ = (
+        UniqueConstraint("lat", "lon", name="uq_forecast_series_location"),
+        Index("ix_forecast_series_cell_key", "cell_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    lat: Mapped[float] = mapped_column(Float, nullable=False)
+    lon: Mapped[float] = mapped_column(Float, nullable=False)
+    cell_key: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    location_label: Mapped[str] = mapped_column(String(128), nullable=False)
+    province: Mapped[str] = mapped_column(String(64), nullable=False)
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    step_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Little-endian float32 arrays of `count` values; NaN marks a missing step.
+    temperatures: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    humidities: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class ForecastHistory(Base):
+    """Forecast runs removed from the hot tables (replaced by a newer run or pruned), columnar like `ForecastSeries`,
+    one logical partition per `archive_day`.
+
+    Pruning drops whole days past FORECAST_HISTORY_DAYS; nothing on the dashboard path reads this table.
+    """
+
+    __tablename__ = "forecast_history"
+    __table_args__ = (Index("ix_forecast_history_archive_day", "archive_day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    archive_day: Mapped[date] = mapped_column(Date, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    lat: Mapped[float] = mapped_column(Float, nullable=False)
+    lon: Mapped[float] = mapped_column(Float, nullable=False)
+    cell_key: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    location_label: Mapped[str] = mapped_column(String(128), nullable=False)
+    province: Mapped[str] = mapped_column(String(64), nullable=False)
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    step_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    temperatures: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    humidities: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
 class RefreshStatus(Base):
     __tablename__ = "refresh_status"
 
@@ -46,3 +135,78 @@ class RefreshStatus(Base):
     last_success_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_error: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TrackedLocation(Base):
+    __tablename__ = "tracked_locations"
+    __table_args__ = (UniqueConstraint("lat", "lon", name="uq_tracked_locations_lat_lon"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    lat: Mapped[float] = mapped_column(Float, nullable=False)
+    lon: Mapped[float] = mapped_column(Float, nullable=False)
+    location_label: Mapped[str] = mapped_column(String(128), nullable=False)
+    province: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SourceFetchState(Base):
+    __tablename__ = "source_fetch_states"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    url: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
+    etag: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # sha256 of the extracted title and text the current records were derived from.
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AiExtractionCacheEntry(Base):
+    __tablename__ = "ai_extraction_cache"
+    __table_args__ = (
+        UniqueConstraint("model", "prompt_version", "input_hash", name="uq_ai_extraction_cache_key"),
+        Index("ix_ai_extraction_cache_last_used_at", "last_used_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    model: Mapped[str] = mapped_column(String(128), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    # sha256 of the (truncated) user message sent to the model.
+    input_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    summary: Mapped[str] = mapped_column(String(1024), nullable=False)
+    level: Mapped[str] = mapped_column(String(32), nullable=False)
+    hazard_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class JobLease(Base):
+    __tablename__ = "job_leases"
+    __table_args__ = (Index("ix_job_leases_next_run_at", "next_run_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_key: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
+    # Worker holding the job until `lease_until`; an expired lease is free to claim again.
+    owner: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    next_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    interval_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class ProviderCircuit(Base):
+    """Circuit breaker of one upstream provider (`<kind>:<provider>`), shared by every worker run."""
+
+    __tablename__ = "provider_circuits"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    circuit_key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    state: Mapped[str] = mapped_column(String(16), nullable=False, default="closed")
+    # Consecutive failed calls; non-zero means the data of this provider is the last-known-good copy.
+    failures: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    open_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    open_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    last_success_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
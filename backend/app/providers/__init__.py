@@ -1,11 +1,19 @@
-from app.providers.mock_provider import MockWeatherProvider
-from app.providers.nmc_provider import NmcBulletinWarningProvider
-from app.providers.openmeteo_provider import OpenMeteoForecastProvider
-from app.providers.qweather_provider import QWeatherProvider
-
-__all__ = [
-    "MockWeatherProvider",
-    "NmcBulletinWarningProvider",
-    "OpenMeteoForecastProvider",
-    "QWeatherProvider",
-]
+from importlib import import_module
+from typing import Any
+
+# Providers load on first attribute access, so importing `app.providers.base` does not pull in httpx,
+# dateutil or the AI extractor.
+_EXPORTS = {
+    "MockWeatherProvider": "app.providers.mock_provider",
+    "NmcBulletinWarningProvider": "app.providers.nmc_provider",
+    "OpenMeteoForecastProvider": "app.providers.openmeteo_provider",
+    "QWeatherProvider": "app.providers.qweather_provider",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name]), name)
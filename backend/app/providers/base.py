@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol
+from datetime import datetime
+from typing import TYPE_CHECKING, Protocol
 
-from app.models import ForecastPoint, WarningRecord
+from app.models import ForecastPoint, SourceFetchState, WarningRecord
+
+if TYPE_CHECKING:
+    from app.core.http import HttpPool
 
 
 @dataclass(frozen=True)
@@ -14,11 +18,29 @@ class IngestionContext:
     label: str
 
 
-class WarningProvider(Protocol):
-    def fetch_warnings(self, context: IngestionContext) -> list[WarningRecord]:
+@dataclass(frozen=True)
+class FetchStateUpdate:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+
+
+class AsyncWarningProvider(Protocol):
+    warning_sources: tuple[str, ...]
+
+    async def afetch_warnings(self, context: IngestionContext, http: HttpPool) -> list[WarningRecord]:
         ...
 
 
-class ForecastProvider(Protocol):
-    def fetch_forecast(self, context: IngestionContext) -> list[ForecastPoint]:
+class AsyncForecastProvider(Protocol):
+    async def afetch_forecast(self, context: IngestionContext, http: HttpPool) -> list[ForecastPoint]:
+        ...
+
+
+class FetchStateStore(Protocol):
+    def get_fetch_state(self, url: str) -> SourceFetchState | None:
+        ...
+
+    def list_url_warnings(self, detail_url: str, active_at: datetime) -> list[WarningRecord]:
         ...
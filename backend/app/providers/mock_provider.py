@@ -2,16 +2,25 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 import math
+from typing import TYPE_CHECKING
 
 from app.models import ForecastPoint, WarningRecord
 from app.providers.base import IngestionContext
 
+if TYPE_CHECKING:
+    from app.core.http import HttpPool
+
 
 class MockWeatherProvider:
     """Mock provider for local development and fallback."""
 
-    def fetch_warnings(self, context: IngestionContext) -> list[WarningRecord]:
-        now = datetime.now(timezone.utc)
+    warning_sources = ("MockScenario",)
+
+    async def afetch_warnings(self, context: IngestionContext, http: HttpPool) -> list[WarningRecord]:
+        # Anchored to the UTC day so the natural keys stay put between refreshes and the demo set is written once
+        # a day, not rewritten every cycle; each set stays valid into the next day.
+        anchor = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        valid_until = anchor + timedelta(days=1)
         scenarios = [
             ("台风红色预警（演示）", "红色", "台风", "福建", 15, 10, "沿海风力可达13级以上，注意海上作业安全。"),
             ("暴雨橙色预警（演示）", "橙色", "暴雨", "广东", 25, 12, "部分地区小时雨强较大，低洼路段有内涝风险。"),
@@ -34,8 +43,8 @@ class MockWeatherProvider:
                     level=level,
                     hazard_type=hazard_type,
                     province=province,
-                    issue_time=now - timedelta(minutes=minutes_ago),
-                    expires_at=now + timedelta(hours=duration_hours),
+                    issue_time=anchor - timedelta(minutes=minutes_ago),
+                    expires_at=valid_until + timedelta(hours=duration_hours),
                     detail_url="https://www.nmc.cn/publish/weather-bulletin/index.htm",
                     summary=summary,
                     confidence=1.0,
@@ -50,8 +59,8 @@ class MockWeatherProvider:
                 level="黄色",
                 hazard_type="综合风险",
                 province=context.province,
-                issue_time=now - timedelta(minutes=10),
-                expires_at=now + timedelta(hours=6),
+                issue_time=anchor - timedelta(minutes=10),
+                expires_at=valid_until + timedelta(hours=6),
                 detail_url="https://www.nmc.cn/publish/weatherperday/index.htm",
                 summary="该提示用于演示当前省份高亮与预警联动效果。",
                 confidence=0.95,
@@ -59,7 +68,7 @@ class MockWeatherProvider:
         )
         return warnings
 
-    def fetch_forecast(self, context: IngestionContext) -> list[ForecastPoint]:
+    async def afetch_forecast(self, context: IngestionContext, http: HttpPool) -> list[ForecastPoint]:
         now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
         points: list[ForecastPoint] = []
         for h in range(0, 24 * 7, 3):
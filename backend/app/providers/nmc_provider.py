@@ -1,98 +1,218 @@
 from __future__ import annotations
 
-import html
-import re
+import asyncio
+from dataclasses import dataclass
+import hashlib
 from datetime import datetime, timedelta, timezone
 
 import httpx
 
 from app.core.config import Settings
-from app.models import WarningRecord
-from app.providers.base import IngestionContext
-from app.services.ai_extractor import AiExtractor
+from app.core.http import HttpPool
+from app.core.metrics import NMC_PARSE_SECONDS
+from app.models import SourceFetchState, WarningRecord
+from app.providers.base import FetchStateStore, FetchStateUpdate, IngestionContext
+from app.services.ai_extractor import AiExtractionResult, AiExtractor, BulletinInput
+from app.services.html_text import PageText, extract_page
 from app.services.province import PROVINCES
 
 _LEVEL_PATTERNS = ["红色", "橙色", "黄色", "蓝色"]
 _HAZARD_KEYWORDS = ["暴雨", "暴雪", "高温", "寒潮", "雷电", "大风", "沙尘", "台风", "强对流", "冰雹"]
+_DEFAULT_LEVEL = "蓝色"
+_DEFAULT_HAZARD = "综合风险"
 
 
 class NmcBulletinWarningProvider:
-    def __init__(self, settings: Settings, ai_extractor: AiExtractor | None = None):
+    # Bulletin pages are national; ingestion fetches them once per cycle instead of once per location.
+    national_scope = True
+    # `source` values of the records it produces, so a failed cycle can leave exactly these rows untouched.
+    warning_sources = ("NMC", "NMC+LLM")
+
+    def __init__(
+        self,
+        settings: Settings,
+        ai_extractor: AiExtractor | None = None,
+        fetch_state: FetchStateStore | None = None,
+    ):
         self.settings = settings
         self.ai_extractor = ai_extractor
+        self.fetch_state = fetch_state
+        # Validators and hashes of the latest cycle; ingestion saves them with the warnings they describe.
+        self.pending_fetch_states: list[FetchStateUpdate] = []
 
-    def fetch_warnings(self, context: IngestionContext) -> list[WarningRecord]:
-        rows: list[WarningRecord] = []
+    @property
+    def _ai_enabled(self) -> bool:
+        return self.settings.ai_enabled_for_nmc and self.ai_extractor is not None
+
+    async def afetch_warnings(self, context: IngestionContext, http: HttpPool) -> list[WarningRecord]:
         now = datetime.now(timezone.utc)
+        self.pending_fetch_states = []
+        fetched = await asyncio.gather(
+            *(self._afetch_source(source_url, context, now, http) for source_url in self.settings.nmc_source_urls_list)
+        )
+        rows = [row for item in fetched if isinstance(item, list) for row in item]
+        parsed = [item for item in fetched if isinstance(item, _ParsedSource)]
+
+        # One AI stage for every changed page, so LLM round-trips overlap instead of adding up.
+        ai_results: list[AiExtractionResult | None] = [None] * len(parsed)
+        if self._ai_enabled and parsed:
+            ai_results = await self.ai_extractor.aextract_many(
+                [BulletinInput(item.source_url, item.bulletin.title, item.bulletin.plain) for item in parsed], http
+            )
+        for item, ai_result in zip(parsed, ai_results):
+            rows.extend(self._build_rows(item.source_url, item.bulletin, ai_result, now))
+            self._remember(item.source_url, item.state, item.headers, item.digest)
+        return rows
+
+    async def _afetch_source(
+        self, source_url: str, context: IngestionContext, now: datetime, http: HttpPool
+    ) -> list[WarningRecord] | _ParsedSource:
+        """Previous records when the page is unchanged, otherwise the parsed bulletin awaiting row building."""
+        state, previous = self._previous(source_url, now)
+        response = await http.get(source_url, headers=_validators(state, previous))
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return previous
+        response.raise_for_status()
+        page = extract_page(response.text, self.settings.nmc_content_element_id)
+        digest = _content_hash(page)
+        if previous and state is not None and state.content_hash == digest:
+            # Same text under new validators (or a server ignoring them): keep the records, skip parsing and AI.
+            self._remember(source_url, state, response.headers, digest)
+            return previous
+
+        with NMC_PARSE_SECONDS.time():
+            bulletin = _parse_bulletin(page, context)
+        return _ParsedSource(source_url, bulletin, state, response.headers, digest)
+
+    def _previous(self, source_url: str, now: datetime) -> tuple[SourceFetchState | None, list[WarningRecord]]:
+        if self.fetch_state is None:
+            return None, []
+        state = self.fetch_state.get_fetch_state(source_url)
+        if state is None:
+            return None, []
+        return state, self.fetch_state.list_url_warnings(source_url, now)
+
+    def _remember(
+        self, source_url: str, state: SourceFetchState | None, headers: httpx.Headers, digest: str
+    ) -> None:
+        if self.fetch_state is None:
+            return
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if state is not None and (state.etag, state.last_modified, state.content_hash) == (etag, last_modified, digest):
+            return
+        self.pending_fetch_states.append(FetchStateUpdate(source_url, etag, last_modified, digest))
+
+    def _build_rows(
+        self, source_url: str, bulletin: _Bulletin, ai_result: AiExtractionResult | None, now: datetime
+    ) -> list[WarningRecord]:
+        summary = _compact_text(bulletin.plain)
+        level = bulletin.level
+        hazard = bulletin.hazard
+        confidence = 0.75
+        source_name = "NMC"
+        regional = bulletin.regional
+
+        if ai_result is not None and ai_result.confidence >= self.settings.ai_confidence_threshold:
+            summary = ai_result.summary
+            level = ai_result.level
+            hazard = ai_result.hazard_type
+            confidence = ai_result.confidence
+            source_name = "NMC+LLM"
+            regional = {}
 
-        with httpx.Client(timeout=self.settings.http_timeout_seconds) as client:
-            for source_url in self.settings.nmc_source_urls_list:
-                response = client.get(source_url)
-                response.raise_for_status()
-                body = response.text
-                title = _extract_title(body) or "天气公告"
-                plain = _to_plain_text(body)
-                level = _detect_level(plain)
-                hazard = _detect_hazard(plain)
-                provinces = _detect_provinces(plain) or [context.province]
-                summary = _compact_text(plain)
-                confidence = 0.75
-                source_name = "NMC"
-
-                if self.settings.ai_enabled_for_nmc and self.ai_extractor is not None:
-                    ai_result = self.ai_extractor.extract_bulletin(source_url=source_url, title=title, text=plain)
-                    if ai_result is not None and ai_result.confidence >= self.settings.ai_confidence_threshold:
-                        summary = ai_result.summary
-                        level = ai_result.level
-                        hazard = ai_result.hazard_type
-                        confidence = ai_result.confidence
-                        source_name = "NMC+LLM"
-
-                for province in provinces:
-                    rows.append(
-                        WarningRecord(
-                            source=source_name,
-                            title=title,
-                            level=level,
-                            hazard_type=hazard,
-                            province=province,
-                            issue_time=now,
-                            expires_at=now + timedelta(hours=12),
-                            detail_url=source_url,
-                            summary=summary,
-                            confidence=confidence,
-                        )
-                    )
+        rows: list[WarningRecord] = []
+        for province in bulletin.provinces:
+            province_level, province_hazard = regional.get(province, (level, hazard))
+            rows.append(
+                WarningRecord(
+                    source=source_name,
+                    title=bulletin.title,
+                    level=province_level,
+                    hazard_type=province_hazard,
+                    province=province,
+                    issue_time=now,
+                    expires_at=now + timedelta(hours=12),
+                    detail_url=source_url,
+                    summary=summary,
+                    confidence=confidence,
+                )
+            )
         return rows
 
 
-def _extract_title(html_text: str) -> str | None:
-    match = re.search(r"<title>(.*?)</title>", html_text, flags=re.IGNORECASE | re.DOTALL)
-    if not match:
-        return None
-    return html.unescape(match.group(1)).strip()
+@dataclass(frozen=True)
+class _Bulletin:
+    title: str
+    plain: str
+    level: str
+    hazard: str
+    provinces: list[str]
+    # Province -> (level, hazard) from table rows / list items that name a single province.
+    regional: dict[str, tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class _ParsedSource:
+    source_url: str
+    bulletin: _Bulletin
+    state: SourceFetchState | None
+    headers: httpx.Headers
+    digest: str
+
+
+def _validators(state: SourceFetchState | None, previous: list[WarningRecord]) -> dict[str, str]:
+    # A 304 is only useful while there are still records to reuse; otherwise ask for the full page.
+    if state is None or not previous:
+        return {}
+    headers: dict[str, str] = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return headers
+
+
+def _content_hash(page: PageText) -> str:
+    return hashlib.sha256(f"{page.title}\n{page.text}".encode()).hexdigest()
+
+
+def _parse_bulletin(page: PageText, context: IngestionContext) -> _Bulletin:
+    level, hazard, provinces = _classify(page.text)
+    return _Bulletin(
+        title=page.title or "天气公告",
+        plain=page.text,
+        level=level,
+        hazard=hazard,
+        provinces=provinces or [context.province],
+        regional=_regional_warnings(page.blocks),
+    )
+
+
+def _regional_warnings(blocks: list[str]) -> dict[str, tuple[str, str]]:
+    regional: dict[str, tuple[str, str]] = {}
+    for block in blocks:
+        level, hazard, provinces = _classify(block)
+        if len(provinces) == 1 and hazard != _DEFAULT_HAZARD:
+            regional.setdefault(provinces[0], (level, hazard))
+    return regional
 
 
-def _to_plain_text(html_text: str) -> str:
-    no_script = re.sub(r"<script[^>]*>.*?</script>", " ", html_text, flags=re.IGNORECASE | re.DOTALL)
-    no_style = re.sub(r"<style[^>]*>.*?</style>", " ", no_script, flags=re.IGNORECASE | re.DOTALL)
-    stripped = re.sub(r"<[^>]+>", " ", no_style)
-    stripped = html.unescape(stripped)
-    return re.sub(r"\s+", " ", stripped).strip()
+def _classify(text: str) -> tuple[str, str, list[str]]:
+    return _detect_level(text), _detect_hazard(text), _detect_provinces(text)
 
 
 def _detect_level(text: str) -> str:
     for level in _LEVEL_PATTERNS:
         if level in text:
             return level
-    return "蓝色"
+    return _DEFAULT_LEVEL
 
 
 def _detect_hazard(text: str) -> str:
     for keyword in _HAZARD_KEYWORDS:
         if keyword in text:
             return keyword
-    return "综合风险"
+    return _DEFAULT_HAZARD
 
 
 def _detect_provinces(text: str) -> list[str]:
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 from zoneinfo import ZoneInfo
 
-import httpx
 from dateutil.parser import isoparse
 
 from app.core.config import Settings
+from app.core.http import HttpPool
 from app.models import ForecastPoint
 from app.providers.base import IngestionContext
 
@@ -14,8 +15,10 @@ from app.providers.base import IngestionContext
 class OpenMeteoForecastProvider:
     def __init__(self, settings: Settings):
         self.settings = settings
+        # Per-point rows keep every 3rd hour to bound the row count; columnar series store the full hourly run.
+        self._step = 1 if settings.forecast_storage.lower() == "series" else 3
 
-    def fetch_forecast(self, context: IngestionContext) -> list[ForecastPoint]:
+    def _request(self, context: IngestionContext) -> tuple[str, dict[str, Any]]:
         params = {
             "latitude": context.lat,
             "longitude": context.lon,
@@ -23,38 +26,42 @@ class OpenMeteoForecastProvider:
             "forecast_days": 7,
             "timezone": "Asia/Shanghai",
         }
+        return f"{self.settings.openmeteo_api_base.rstrip('/')}/forecast", params
 
-        with httpx.Client(timeout=self.settings.http_timeout_seconds) as client:
-            response = client.get(f"{self.settings.openmeteo_api_base.rstrip('/')}/forecast", params=params)
-            response.raise_for_status()
-            payload = response.json()
-
-        hourly = payload.get("hourly", {})
-        times: list[str] = hourly.get("time", [])
-        temps: list[float] = hourly.get("temperature_2m", [])
-        humidity: list[float] = hourly.get("relative_humidity_2m", [])
-
-        rows: list[ForecastPoint] = []
-        for idx, t in enumerate(times):
-            if idx % 3 != 0:
-                continue
-            if idx >= len(temps) or idx >= len(humidity):
-                break
-            dt = isoparse(t)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=ZoneInfo("Asia/Shanghai"))
-            rows.append(
-                ForecastPoint(
-                    lat=round(context.lat, 4),
-                    lon=round(context.lon, 4),
-                    location_label=context.label,
-                    province=context.province,
-                    forecast_time=dt,
-                    temperature_c=float(temps[idx]),
-                    humidity_pct=float(humidity[idx]),
-                    source="OpenMeteo",
-                    created_at=datetime.utcnow(),
-                )
+    async def afetch_forecast(self, context: IngestionContext, http: HttpPool) -> list[ForecastPoint]:
+        url, params = self._request(context)
+        response = await http.get(url, params=params)
+        response.raise_for_status()
+        return _parse_forecast(response.json(), context, self._step)
+
+
+def _parse_forecast(payload: dict[str, Any], context: IngestionContext, step: int = 3) -> list[ForecastPoint]:
+    hourly = payload.get("hourly", {})
+    times: list[str] = hourly.get("time", [])
+    temps: list[float] = hourly.get("temperature_2m", [])
+    humidity: list[float] = hourly.get("relative_humidity_2m", [])
+
+    rows: list[ForecastPoint] = []
+    for idx, t in enumerate(times):
+        if idx % step != 0:
+            continue
+        if idx >= len(temps) or idx >= len(humidity):
+            break
+        dt = isoparse(t)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=ZoneInfo("Asia/Shanghai"))
+        rows.append(
+            ForecastPoint(
+                lat=round(context.lat, 4),
+                lon=round(context.lon, 4),
+                location_label=context.label,
+                province=context.province,
+                forecast_time=dt,
+                temperature_c=float(temps[idx]),
+                humidity_pct=float(humidity[idx]),
+                source="OpenMeteo",
+                created_at=datetime.utcnow(),
             )
+        )
 
-        return rows
+    return rows
@@ -7,6 +7,43 @@ class LocationRequest(BaseModel):
     lon: float = Field(ge=-180, le=180)
     address: str | None = None
     province: str | None = None
+    # Warning filters; by default the dashboard returns every active warning nationally for the map.
+    warnings_province_only: bool = False
+    level: str | None = None
+    hazard_type: str | None = None
+    active_only: bool = True
+    warning_limit: int | None = Field(default=None, ge=1, le=1000)
+
+
+class BatchLocation(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    province: str | None = None
+    # Caller's own identifier, echoed back on the matching result.
+    ref: str | None = Field(default=None, max_length=128)
+
+
+class BatchDashboardRequest(BaseModel):
+    locations: list[BatchLocation] = Field(min_length=1)
+    level: str | None = None
+    hazard_type: str | None = None
+    active_only: bool = True
+    warning_limit: int | None = Field(default=None, ge=1, le=1000)
+
+
+class TrackedLocationRequest(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    label: str = Field(min_length=1, max_length=128)
+    # Only used when the coordinate falls outside the bundled province boundaries.
+    province: str | None = Field(default=None, min_length=1, max_length=64)
+
+
+class TrackedLocationItem(BaseModel):
+    lat: float
+    lon: float
+    label: str
+    province: str
 
 
 class ProvinceItem(BaseModel):
@@ -29,6 +66,14 @@ class WarningItem(BaseModel):
     is_ai_augmented: bool = False
 
 
+class WarningChanges(BaseModel):
+    # One province's share of a refresh; pushed to /warnings/stream subscribers.
+    province: str
+    new: list[WarningItem]
+    updated: list[WarningItem]
+    expired: list[WarningItem]
+
+
 class ForecastPointItem(BaseModel):
     forecast_time: datetime
     temperature_c: float
@@ -41,4 +86,39 @@ class DashboardResponse(BaseModel):
     warnings: list[WarningItem]
     forecast_points: list[ForecastPointItem]
     last_refresh_at: datetime | None
+    # The worker's warning job interval (WARNING_REFRESH_MINUTES).
     refresh_interval_minutes: int
+    # "kind:provider" circuits whose latest call failed; their data is the last-known-good copy.
+    stale_sources: list[str] = []
+
+
+class LocationForecast(BaseModel):
+    ref: str | None
+    lat: float
+    lon: float
+    province: str | None
+    forecast_points: list[ForecastPointItem]
+
+
+class BatchDashboardResponse(BaseModel):
+    provinces: list[ProvinceItem]
+    # National warnings, shared by every location; filter by `province` client-side.
+    warnings: list[WarningItem]
+    locations: list[LocationForecast]
+    last_refresh_at: datetime | None
+    # The worker's warning job interval (WARNING_REFRESH_MINUTES).
+    refresh_interval_minutes: int
+    stale_sources: list[str] = []
+
+
+class WarningPage(BaseModel):
+    items: list[WarningItem]
+    next_cursor: str | None
+
+
+class ReadinessResponse(BaseModel):
+    # fresh | stale | empty; the API serves whatever the database holds in every case.
+    status: str
+    last_success_at: datetime | None
+    age_seconds: float | None
+    last_error: str | None
@@ -1,11 +1,41 @@
 from __future__ import annotations
 
-import json
+import asyncio
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import Any, Protocol
 
 import httpx
 
 from app.core.config import Settings
+from app.core.http import HttpPool
+from app.core.metrics import AI_CACHE_LOOKUPS, AI_REQUEST_SECONDS, AI_TOKENS
+from app.models import AiExtractionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt or the response parsing changes, so cached results from the old prompt are not reused.
+PROMPT_VERSION = "1"
+
+_TEXT_LIMIT = 3000
+# Rough allowance for the JSON answer of one bulletin when budgeting tokens.
+_ANSWER_TOKENS = 200
+
+_SINGLE_PROMPT = (
+    "你是气象公告信息抽取器。请从输入文本中提取并返回 JSON："
+    "summary(<=60字), level(红色/橙色/黄色/蓝色/未知), hazard_type, confidence(0-1)。"
+    "如果信息不足，给出保守结果。"
+)
+_BATCH_PROMPT = (
+    "你是气象公告信息抽取器。输入包含多条公告，每条以 [编号] 开头。请逐条提取并返回 JSON："
+    '{"results": [{"id": 编号, "summary"(<=60字), "level"(红色/橙色/黄色/蓝色/未知), "hazard_type", '
+    '"confidence"(0-1)}]}，每条公告对应一项。如果信息不足，给出保守结果。'
+)
 
 
 @dataclass
@@ -16,30 +46,56 @@ class AiExtractionResult:
     confidence: float
 
 
+@dataclass(frozen=True)
+class BulletinInput:
+    source_url: str
+    title: str
+    text: str
+
+    @property
+    def message(self) -> str:
+        return f"source_url={self.source_url}\ntitle={self.title}\ntext={self.text[:_TEXT_LIMIT]}"
+
+
+@dataclass
+class AiCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class AiResultStore(Protocol):
+    def get_ai_result(
+        self, model: str, prompt_version: str, input_hash: str, fresh_after: datetime
+    ) -> AiExtractionCacheEntry | None:
+        ...
+
+    def save_ai_result(self, entry: AiExtractionCacheEntry, expired_before: datetime, max_entries: int) -> None:
+        ...
+
+
 class AiExtractor:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, cache: AiResultStore | None = None):
         self.settings = settings
+        self.cache = cache
+        self.cache_stats = AiCacheStats()
+        self._budget = _token_budget(settings)
 
-    def extract_bulletin(self, source_url: str, title: str, text: str) -> AiExtractionResult | None:
-        if self.settings.ai_provider.lower() != "openai":
-            return None
-        if not self.settings.openai_api_key:
-            return None
+    @property
+    def enabled(self) -> bool:
+        return self.settings.ai_provider.lower() == "openai" and bool(self.settings.openai_api_key)
 
-        prompt = (
-            "你是气象公告信息抽取器。请从输入文本中提取并返回 JSON："
-            "summary(<=60字), level(红色/橙色/黄色/蓝色/未知), hazard_type, confidence(0-1)。"
-            "如果信息不足，给出保守结果。"
-        )
+    def _request(self, bulletins: list[BulletinInput]) -> tuple[str, dict[str, str], dict[str, Any]]:
+        if len(bulletins) == 1:
+            prompt, content = _SINGLE_PROMPT, bulletins[0].message
+        else:
+            prompt = _BATCH_PROMPT
+            content = "\n\n".join(f"[{idx}] {bulletin.message}" for idx, bulletin in enumerate(bulletins))
 
         payload = {
             "model": self.settings.openai_model,
             "messages": [
                 {"role": "system", "content": prompt},
-                {
-                    "role": "user",
-                    "content": f"source_url={source_url}\ntitle={title}\ntext={text[:3000]}",
-                },
+                {"role": "user", "content": content},
             ],
             "response_format": {"type": "json_object"},
             "temperature": 0.1,
@@ -49,36 +105,236 @@ class AiExtractor:
             "Authorization": f"Bearer {self.settings.openai_api_key}",
             "Content-Type": "application/json",
         }
+        return f"{self.settings.openai_api_base.rstrip('/')}/chat/completions", headers, payload
+
+    async def aextract_bulletin(self, source_url: str, title: str, text: str, http: HttpPool) -> AiExtractionResult | None:
+        results = await self.aextract_many([BulletinInput(source_url=source_url, title=title, text=text)], http)
+        return results[0]
+
+    async def aextract_many(self, bulletins: list[BulletinInput], http: HttpPool) -> list[AiExtractionResult | None]:
+        """Extract every bulletin, concurrently and within AI_CYCLE_DEADLINE_SECONDS.
 
-        with httpx.Client(timeout=self.settings.http_timeout_seconds) as client:
-            response = client.post(
-                f"{self.settings.openai_api_base.rstrip('/')}/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-            response.raise_for_status()
-            body = response.json()
+        Short bulletins are packed into shared requests. Anything not extracted in time, or whose request failed,
+        comes back as None so callers keep their keyword result.
+        """
+        results: list[AiExtractionResult | None] = [None] * len(bulletins)
+        if not self.enabled or not bulletins:
+            return results
 
-        content = body.get("choices", [{}])[0].get("message", {}).get("content", "{}")
-        parsed = json.loads(content)
+        hashes = [_input_hash(bulletin) for bulletin in bulletins]
+        missing: list[int] = []
+        for idx, input_hash in enumerate(hashes):
+            results[idx] = self._cached(input_hash)
+            if results[idx] is None:
+                missing.append(idx)
+        if not missing:
+            return results
 
-        summary = str(parsed.get("summary", "")).strip()
-        level = str(parsed.get("level", "未知")).strip() or "未知"
-        hazard_type = str(parsed.get("hazard_type", "综合风险")).strip() or "综合风险"
-        confidence_raw = parsed.get("confidence", 0.0)
+        slots = asyncio.Semaphore(max(1, self.settings.ai_max_concurrency))
 
+        async def run(batch: list[int]) -> None:
+            async with slots:
+                extracted = await self._aextract_batch([bulletins[idx] for idx in batch], http)
+            for idx, result in zip(batch, extracted):
+                results[idx] = self._remember(hashes[idx], result)
+
+        tasks = [asyncio.create_task(run(batch)) for batch in self._batches(bulletins, missing)]
+        done, pending = await asyncio.wait(tasks, timeout=self.settings.ai_cycle_deadline_seconds)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning("AI extraction deadline reached; %d request(s) fall back to keyword results", len(pending))
+        for task in done:
+            if task.exception() is not None:
+                logger.warning("AI extraction failed: %s", task.exception())
+        return results
+
+    def _batches(self, bulletins: list[BulletinInput], indices: list[int]) -> list[list[int]]:
+        # Greedy packing in input order; a bulletin longer than the batch budget is sent on its own.
+        batches: list[list[int]] = []
+        current: list[int] = []
+        size = 0
+        for idx in indices:
+            length = len(bulletins[idx].message)
+            full = len(current) >= self.settings.ai_batch_max_bulletins
+            if current and (full or size + length > self.settings.ai_batch_max_chars):
+                batches.append(current)
+                current, size = [], 0
+            current.append(idx)
+            size += length
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _aextract_batch(self, bulletins: list[BulletinInput], http: HttpPool) -> list[AiExtractionResult | None]:
+        url, headers, payload = self._request(bulletins)
+        # Characters as tokens: Chinese text runs close to one token per character, so this errs on the safe side.
+        tokens = sum(len(message["content"]) for message in payload["messages"]) + _ANSWER_TOKENS * len(bulletins)
+        await self._budget.acquire(tokens)
+        parsed = _message_json(await self._apost(url, headers, payload, http))
+        if len(bulletins) == 1:
+            return [_parse_item(parsed)]
+
+        by_id: dict[int, dict[str, Any]] = {}
+        for item in parsed.get("results", []):
+            try:
+                by_id[int(item.get("id"))] = item
+            except (AttributeError, TypeError, ValueError):
+                continue
+        return [_parse_item(by_id[idx]) if idx in by_id else None for idx in range(len(bulletins))]
+
+    async def _apost(self, url: str, headers: dict[str, str], payload: dict[str, Any], http: HttpPool) -> dict[str, Any]:
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            confidence = float(confidence_raw)
-        except (TypeError, ValueError):
-            confidence = 0.0
+            body = await self._apost_with_retries(url, headers, payload, http)
+            outcome = "ok"
+        finally:
+            # Cancellation at the cycle deadline is recorded as an error too.
+            AI_REQUEST_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+        _record_usage(body)
+        return body
 
-        confidence = max(0.0, min(1.0, confidence))
-        if not summary:
-            return None
+    async def _apost_with_retries(
+        self, url: str, headers: dict[str, str], payload: dict[str, Any], http: HttpPool
+    ) -> dict[str, Any]:
+        retries = max(0, self.settings.ai_max_retries)
+        attempt = 0
+        while True:
+            retry_after = 0.0
+            try:
+                response = await http.post(url, headers=headers, json=payload)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            else:
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt >= retries:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = _retry_after(response)
+            # Full jitter keeps concurrent requests from retrying in lockstep.
+            backoff = random.uniform(0, self.settings.ai_retry_base_seconds * 2**attempt)
+            await asyncio.sleep(max(retry_after, backoff))
+            attempt += 1
 
+    def _cached(self, input_hash: str) -> AiExtractionResult | None:
+        if self.cache is None:
+            return None
+        fresh_after = datetime.now(timezone.utc) - timedelta(seconds=self.settings.ai_cache_ttl_seconds)
+        entry = self.cache.get_ai_result(self.settings.openai_model, PROMPT_VERSION, input_hash, fresh_after)
+        if entry is None:
+            self.cache_stats.misses += 1
+            AI_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        self.cache_stats.hits += 1
+        AI_CACHE_LOOKUPS.labels("hit").inc()
         return AiExtractionResult(
-            summary=summary,
-            level=level,
-            hazard_type=hazard_type,
-            confidence=confidence,
+            summary=entry.summary, level=entry.level, hazard_type=entry.hazard_type, confidence=entry.confidence
+        )
+
+    def _remember(self, input_hash: str, result: AiExtractionResult | None) -> AiExtractionResult | None:
+        if self.cache is None or result is None:
+            return result
+        now = datetime.now(timezone.utc)
+        self.cache.save_ai_result(
+            AiExtractionCacheEntry(
+                model=self.settings.openai_model,
+                prompt_version=PROMPT_VERSION,
+                input_hash=input_hash,
+                summary=result.summary,
+                level=result.level,
+                hazard_type=result.hazard_type,
+                confidence=result.confidence,
+                created_at=now,
+                last_used_at=now,
+            ),
+            expired_before=now - timedelta(seconds=self.settings.ai_cache_ttl_seconds),
+            max_entries=self.settings.ai_cache_max_entries,
         )
+        return result
+
+
+class _TokenBudget:
+    """Token bucket refilled continuously at `per_minute`; 0 disables the limit."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._available = float(per_minute)
+        self._updated = time.monotonic()
+
+    async def acquire(self, tokens: int) -> None:
+        if self.per_minute <= 0:
+            return
+        # A request larger than the whole budget waits for a full bucket rather than forever.
+        tokens = min(tokens, self.per_minute)
+        rate = self.per_minute / 60
+        # No lock needed: the check and the decrement run without an await in between.
+        while True:
+            now = time.monotonic()
+            self._available = min(self.per_minute, self._available + (now - self._updated) * rate)
+            self._updated = now
+            if self._available >= tokens:
+                self._available -= tokens
+                return
+            await asyncio.sleep((tokens - self._available) / rate)
+
+
+# Shared by every extractor in the process: ingestion builds a new extractor per job, the upstream limit is per key.
+_budgets: dict[tuple[str, str | None, int], _TokenBudget] = {}
+
+
+def _token_budget(settings: Settings) -> _TokenBudget:
+    key = (settings.openai_api_base, settings.openai_api_key, settings.ai_tokens_per_minute)
+    if key not in _budgets:
+        _budgets[key] = _TokenBudget(settings.ai_tokens_per_minute)
+    return _budgets[key]
+
+
+def _input_hash(bulletin: BulletinInput) -> str:
+    # The message carries the source URL, title and truncated text; the prompt itself is covered by PROMPT_VERSION.
+    return hashlib.sha256(bulletin.message.encode()).hexdigest()
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("retry-after", 0)))
+    except ValueError:
+        return 0.0
+
+
+def _record_usage(body: dict[str, Any]) -> None:
+    usage = body.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(kind), int):
+            AI_TOKENS.labels(kind.removesuffix("_tokens")).inc(usage[kind])
+
+
+def _message_json(body: dict[str, Any]) -> dict[str, Any]:
+    content = body.get("choices", [{}])[0].get("message", {}).get("content", "{}")
+    parsed = json.loads(content)
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _parse_item(parsed: dict[str, Any]) -> AiExtractionResult | None:
+    summary = str(parsed.get("summary", "")).strip()
+    level = str(parsed.get("level", "未知")).strip() or "未知"
+    hazard_type = str(parsed.get("hazard_type", "综合风险")).strip() or "综合风险"
+    confidence_raw = parsed.get("confidence", 0.0)
+
+    try:
+        confidence = float(confidence_raw)
+    except (TypeError, ValueError):
+        confidence = 0.0
+
+    confidence = max(0.0, min(1.0, confidence))
+    if not summary:
+        return None
+
+    return AiExtractionResult(
+        summary=summary,
+        level=level,
+        hazard_type=hazard_type,
+        confidence=confidence,
+    )
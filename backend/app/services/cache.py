@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "dashboard:version"
+
+
+class DashboardCache:
+    """Serialized dashboard payloads in an in-process LRU, backed by Redis when `REDIS_URL` is set.
+
+    Keys embed a data version; ingestion bumps the version after each commit, which orphans every cached entry
+    at once (the LRU evicts them, Redis lets them expire). Without Redis a worker's bump never reaches the API
+    process, so local entries then expire after DASHBOARD_CACHE_LOCAL_TTL_SECONDS instead.
+    """
+
+    def __init__(self, settings: Settings, redis_client: Any | None = None):
+        self.settings = settings
+        self.redis = redis_client
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._version_checked_at = float("-inf")
+
+    def version(self) -> int:
+        if self.redis is None:
+            return self._version
+        now = time.monotonic()
+        if now - self._version_checked_at < self.settings.dashboard_cache_version_check_seconds:
+            return self._version
+        try:
+            remote = int(self.redis.get(VERSION_KEY) or 0)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Dashboard cache version check failed: %s", exc)
+            return self._version
+        self._version_checked_at = now
+        if remote != self._version:
+            with self._lock:
+                self._version = remote
+                self._local.clear()
+        return self._version
+
+    def refresh_version(self) -> None:
+        """Re-read the shared version on the next lookup instead of after DASHBOARD_CACHE_VERSION_CHECK_SECONDS."""
+        self._version_checked_at = float("-inf")
+
+    def key(self, *parts: object) -> str:
+        return ":".join(["dashboard", f"v{self.version()}", *(str(part) for part in parts)])
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._local.move_to_end(key)
+                return entry[1]
+            if entry is not None:
+                del self._local[key]
+        if self.redis is None:
+            return None
+        try:
+            payload = self.redis.get(key)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Dashboard cache read failed: %s", exc)
+            return None
+        if payload is not None:
+            self._store_local(key, payload)
+        return payload
+
+    def set(self, key: str, payload: bytes) -> None:
+        self._store_local(key, payload)
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(key, self.settings.dashboard_cache_ttl_seconds, payload)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Dashboard cache write failed: %s", exc)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._local.clear()
+        if self.redis is None:
+            return
+        try:
+            self._version = int(self.redis.incr(VERSION_KEY))
+            self._version_checked_at = time.monotonic()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Dashboard cache invalidation failed: %s", exc)
+
+    def _store_local(self, key: str, payload: bytes) -> None:
+        if self.redis is None:
+            ttl = self.settings.dashboard_cache_local_ttl_seconds
+        else:
+            ttl = self.settings.dashboard_cache_ttl_seconds
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self.settings.dashboard_cache_max_entries:
+                self._local.popitem(last=False)
+
+
+_cache: DashboardCache | None = None
+
+
+def get_dashboard_cache(settings: Settings | None = None) -> DashboardCache:
+    global _cache
+    if _cache is None:
+        settings = settings or get_settings()
+        _cache = DashboardCache(settings, redis_client=_connect_redis(settings))
+    return _cache
+
+
+def _connect_redis(settings: Settings) -> Any | None:
+    if not settings.redis_url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using the in-process cache only")
+        return None
+    return redis.Redis.from_url(settings.redis_url, socket_timeout=settings.redis_socket_timeout_seconds)
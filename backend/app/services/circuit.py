@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core.config import Settings
+from app.models import ProviderCircuit
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Breaker of one provider for the length of an ingestion cycle; loaded from and saved to `provider_circuits`.
+
+    CIRCUIT_FAILURE_THRESHOLD consecutive failures open it for CIRCUIT_OPEN_SECONDS. Once that has passed, a single
+    probe call is let through: success closes the circuit, failure reopens it for twice as long (up to
+    CIRCUIT_MAX_OPEN_SECONDS).
+    """
+
+    key: str
+    state: str = CLOSED
+    failures: int = 0
+    open_until: datetime | None = None
+    open_seconds: int = 0
+    last_error: str | None = None
+    last_success_at: datetime | None = None
+    _probing: bool = field(default=False, repr=False)
+
+    @classmethod
+    def from_row(cls, row: ProviderCircuit) -> CircuitBreaker:
+        return cls(
+            key=row.circuit_key,
+            state=row.state,
+            failures=row.failures,
+            open_until=_utc(row.open_until),
+            open_seconds=row.open_seconds,
+            last_error=row.last_error,
+            last_success_at=_utc(row.last_success_at),
+        )
+
+    @property
+    def stale(self) -> bool:
+        return self.failures > 0
+
+    def allow(self, now: datetime) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.open_until is not None and now >= self.open_until:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            # Concurrent calls of the same cycle stay skipped until the probe has answered.
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, now: datetime) -> None:
+        self.state, self.failures, self.open_until, self.open_seconds = CLOSED, 0, None, 0
+        self.last_error = None
+        self.last_success_at = now
+        self._probing = False
+
+    def abandon(self) -> None:
+        """Forget a call that got no answer; a probe cut off this way lets the next call probe instead."""
+        self._probing = False
+
+    def record_failure(self, error: str, now: datetime, settings: Settings) -> None:
+        self.failures += 1
+        self.last_error = error[:1024]
+        if self.state == HALF_OPEN:
+            self.open_seconds = min(max(self.open_seconds, 1) * 2, settings.circuit_max_open_seconds)
+        elif self.state == CLOSED and self.failures >= max(1, settings.circuit_failure_threshold):
+            self.open_seconds = settings.circuit_open_seconds
+        else:
+            return
+        self.state = OPEN
+        self.open_until = now + timedelta(seconds=self.open_seconds)
+        self._probing = False
+
+    def values(self) -> dict[str, Any]:
+        return {
+            "circuit_key": self.key,
+            "state": self.state,
+            "failures": self.failures,
+            "open_until": self.open_until,
+            "open_seconds": self.open_seconds,
+            "last_error": self.last_error,
+            "last_success_at": self.last_success_at,
+        }
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    # SQLite returns naive datetimes even for timezone-aware columns.
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
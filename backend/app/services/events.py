@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+import json
+import logging
+import threading
+from typing import Any
+
+from app.core.config import Settings, get_settings
+from app.schemas import WarningChanges, WarningItem
+from app.services.cache import DashboardCache, get_dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "warnings:changes"
+_RECONNECT_SECONDS = 5.0
+_RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+_PING_FRAME = b": ping\n\n"
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[bytes]
+    province: str | None
+    lagged: bool = False
+
+
+class WarningBroker:
+    """Fans warning diffs out to server-sent-event subscribers.
+
+    With Redis, ingestion publishes each province's diff to one channel and every API process relays it from a
+    single subscription; without Redis, diffs only reach subscribers in the publishing process. Idle subscribers
+    are a parked queue each, woken for a heartbeat every WARNING_STREAM_HEARTBEAT_SECONDS.
+    """
+
+    def __init__(self, settings: Settings, redis_client: Any | None = None, cache: DashboardCache | None = None):
+        self.settings = settings
+        self.redis = redis_client
+        self.cache = cache
+        self._subscribers: set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._listener: asyncio.Task[None] | None = None
+
+    def publish(self, changes: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        for message in _messages(changes):
+            if self.redis is None:
+                self._dispatch(message)
+                continue
+            try:
+                self.redis.publish(CHANNEL, message)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Warning change publish failed: %s", exc)
+
+    async def subscribe(self, province: str | None = None) -> AsyncIterator[bytes]:
+        """SSE frames for `province` (every province when None); ends after a `resync` event if the client lags."""
+        subscriber = _Subscriber(
+            asyncio.get_running_loop(), asyncio.Queue(maxsize=max(1, self.settings.warning_stream_queue_size)), province
+        )
+        self._ensure_listener()
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            # Sent right away so proxies flush the headers and the client knows the stream is open.
+            yield b"retry: 5000\n\n"
+            while not subscriber.lagged:
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=self.settings.warning_stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield _PING_FRAME
+            # Diffs were dropped; the client should reload the dashboard, then reconnect.
+            yield _RESYNC_FRAME
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def _relay(self, message: bytes) -> None:
+        # Ingestion bumps the cache version before publishing, so clients reloading on this event must not be
+        # served the previous version from this process's cache.
+        if self.cache is not None:
+            self.cache.refresh_version()
+        self._dispatch(message)
+
+    def _dispatch(self, message: bytes) -> None:
+        province = json.loads(message)["province"]
+        frame = b"event: warnings\ndata: " + message + b"\n\n"
+        with self._lock:
+            targets = [item for item in self._subscribers if item.province in (None, province)]
+        for subscriber in targets:
+            # Publishers may run on another thread or event loop than the subscriber.
+            subscriber.loop.call_soon_threadsafe(_offer, subscriber, frame)
+
+    def _ensure_listener(self) -> None:
+        if self.redis is None or not self.settings.redis_url:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(self.settings.redis_url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._relay(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Warning change subscription failed: %s", exc)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+
+def _offer(subscriber: _Subscriber, frame: bytes) -> None:
+    try:
+        subscriber.queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        subscriber.lagged = True
+
+
+def _messages(changes: Iterable[tuple[str, dict[str, Any]]]) -> list[bytes]:
+    # Serialized once per refresh, however many clients are listening.
+    grouped: dict[str, dict[str, list[WarningItem]]] = {}
+    for kind, row in changes:
+        kinds = grouped.setdefault(row["province"], {"new": [], "updated": [], "expired": []})
+        kinds[kind].append(WarningItem(**row, is_ai_augmented="LLM" in row["source"]))
+    return [
+        WarningChanges(province=province, **kinds).model_dump_json().encode() for province, kinds in grouped.items()
+    ]
+
+
+_broker: WarningBroker | None = None
+
+
+def get_warning_broker(settings: Settings | None = None) -> WarningBroker:
+    global _broker
+    if _broker is None:
+        settings = settings or get_settings()
+        cache = get_dashboard_cache(settings)
+        _broker = WarningBroker(settings, redis_client=cache.redis, cache=cache)
+    return _broker
+
+
+async def close_warning_broker() -> None:
+    if _broker is not None:
+        await _broker.aclose()
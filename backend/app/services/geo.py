@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from array import array
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any
+
+from app.core.config import Settings, get_settings
+from app.services.province import PROVINCE_LOOKUP
+
+logger = logging.getLogger(__name__)
+
+# The frontend map asset ships next to the backend in the repo; containers set PROVINCE_GEOJSON_PATH instead.
+DEFAULT_GEOJSON_PATH = Path(__file__).resolve().parents[3] / "frontend" / "src" / "assets" / "china.json"
+
+# Map features that are not provinces of their own.
+_FEATURE_ALIASES = {"南海诸岛": "海南"}
+
+# Height of the latitude bands edges are bucketed into; a lookup only tests the edges of one band.
+_BAND_DEGREES = 0.25
+
+# Points this close to a boundary still resolve when the simplified outline misses them (small or coastal regions).
+_SNAP_DEGREES = 0.05
+
+
+class _Ring:
+    __slots__ = ("bbox", "xs", "ys", "x1", "y1", "x2", "y2", "bands")
+
+    def __init__(self, coordinates: list[list[float]]):
+        xs = [float(point[0]) for point in coordinates]
+        ys = [float(point[1]) for point in coordinates]
+        self.xs, self.ys = array("d", xs), array("d", ys)
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.x1, self.y1, self.x2, self.y2 = array("d"), array("d"), array("d"), array("d")
+        self.bands: dict[int, array] = {}
+        count = len(xs)
+        for idx in range(count):
+            ax, ay = xs[idx], ys[idx]
+            bx, by = xs[(idx + 1) % count], ys[(idx + 1) % count]
+            if ay == by:
+                # Horizontal edges never cross a horizontal ray.
+                continue
+            edge = len(self.x1)
+            self.x1.append(ax)
+            self.y1.append(ay)
+            self.x2.append(bx)
+            self.y2.append(by)
+            for band in range(_band(min(ay, by)), _band(max(ay, by)) + 1):
+                self.bands.setdefault(band, array("I")).append(edge)
+
+    def crossings(self, x: float, y: float) -> int:
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return 0
+        hits = 0
+        x1, y1, x2, y2 = self.x1, self.y1, self.x2, self.y2
+        for edge in self.bands.get(_band(y), ()):
+            ay, by = y1[edge], y2[edge]
+            if (ay > y) != (by > y):
+                cross_x = x1[edge] + (y - ay) * (x2[edge] - x1[edge]) / (by - ay)
+                if x < cross_x:
+                    hits += 1
+        return hits
+
+    def distance(self, x: float, y: float) -> float:
+        xs, ys = self.xs, self.ys
+        count = len(xs)
+        best = math.inf
+        for idx in range(count):
+            ax, ay = xs[idx], ys[idx]
+            bx, by = xs[(idx + 1) % count], ys[(idx + 1) % count]
+            dx, dy = bx - ax, by - ay
+            length = dx * dx + dy * dy
+            t = 0.0 if length == 0 else max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / length))
+            best = min(best, math.hypot(x - ax - t * dx, y - ay - t * dy))
+        return best
+
+
+class _Region:
+    __slots__ = ("name", "bbox", "rings")
+
+    def __init__(self, name: str, rings: list[_Ring]):
+        self.name = name
+        self.rings = rings
+        self.bbox = (
+            min(ring.bbox[0] for ring in rings),
+            min(ring.bbox[1] for ring in rings),
+            max(ring.bbox[2] for ring in rings),
+            max(ring.bbox[3] for ring in rings),
+        )
+
+    def contains(self, x: float, y: float) -> bool:
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        # Even-odd rule over outer rings and holes alike.
+        return sum(ring.crossings(x, y) for ring in self.rings) % 2 == 1
+
+    def distance(self, x: float, y: float, limit: float) -> float:
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x - limit or x > max_x + limit or y < min_y - limit or y > max_y + limit:
+            return math.inf
+        return min(ring.distance(x, y) for ring in self.rings)
+
+
+def _band(y: float) -> int:
+    return math.floor(y / _BAND_DEGREES)
+
+
+class ProvinceResolver:
+    """Offline lat/lon -> province lookup over the bundled province boundaries."""
+
+    def __init__(self, regions: list[_Region]):
+        self.regions = regions
+
+    @classmethod
+    def from_geojson(cls, payload: dict[str, Any]) -> ProvinceResolver:
+        regions: list[_Region] = []
+        for feature in payload.get("features", []):
+            name = feature.get("properties", {}).get("name", "")
+            name = _FEATURE_ALIASES.get(name, name)
+            if name not in PROVINCE_LOOKUP:
+                continue
+            geometry = feature.get("geometry") or {}
+            polygons = geometry.get("coordinates", [])
+            if geometry.get("type") == "Polygon":
+                polygons = [polygons]
+            rings = [_Ring(ring) for polygon in polygons for ring in polygon if len(ring) >= 3]
+            if rings:
+                regions.append(_Region(name, rings))
+        return cls(regions)
+
+    @classmethod
+    def from_file(cls, path: Path) -> ProvinceResolver:
+        with path.open(encoding="utf-8") as handle:
+            return cls.from_geojson(json.load(handle))
+
+    def resolve(self, lat: float, lon: float) -> str | None:
+        for region in self.regions:
+            if region.contains(lon, lat):
+                return region.name
+        # Outside every outline: snap to the nearest boundary within tolerance.
+        nearest, best = None, _SNAP_DEGREES
+        for region in self.regions:
+            distance = region.distance(lon, lat, best)
+            if distance <= best:
+                nearest, best = region.name, distance
+        return nearest
+
+
+_resolver: ProvinceResolver | None = None
+
+
+def get_province_resolver(settings: Settings | None = None) -> ProvinceResolver:
+    global _resolver
+    if _resolver is None:
+        settings = settings or get_settings()
+        path = Path(settings.province_geojson_path) if settings.province_geojson_path else DEFAULT_GEOJSON_PATH
+        try:
+            _resolver = ProvinceResolver.from_file(path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Province boundaries unavailable (%s); falling back to client-supplied provinces", exc)
+            _resolver = ProvinceResolver([])
+    return _resolver
+
+
+def resolve_province(lat: float, lon: float, fallback: str | None = None) -> str | None:
+    return get_province_resolver().resolve(lat, lon) or fallback
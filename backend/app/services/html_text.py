@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import html
+import re
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_SKIPPED_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_BLOCK_RE = re.compile(r"<(tr|li)\b[^>]*>(.*?)</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_TAG_NAME_RE = re.compile(r"<(\w+)")
+_ID_PREFIX_RE = re.compile(r"\bid\s*=\s*[\"']?$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PageText:
+    title: str | None
+    text: str
+    # Text of each table row / list item, in document order.
+    blocks: list[str]
+
+
+def extract_page(html_text: str, content_id: str | None = None) -> PageText:
+    """Title, visible text and table row / list item texts of an HTML page.
+
+    With `content_id`, only the element carrying that id contributes text and blocks; pages without the element
+    fall back to the whole document.
+    """
+    title = _TITLE_RE.search(html_text)
+    body = _SKIPPED_RE.sub(" ", _content_region(html_text, content_id) or html_text)
+    return PageText(
+        title=(_plain(title.group(1)) or None) if title else None,
+        text=_plain(body),
+        blocks=[text for text in (_plain(match.group(2)) for match in _BLOCK_RE.finditer(body)) if text],
+    )
+
+
+def _content_region(html_text: str, content_id: str | None) -> str | None:
+    """The element whose id is `content_id`, up to its matching close tag (or the end of the page)."""
+    if not content_id:
+        return None
+    start = _id_attribute(html_text, content_id)
+    if start is None:
+        return None
+    start = html_text.rfind("<", 0, start)
+    name = _TAG_NAME_RE.match(html_text, start) if start >= 0 else None
+    if name is None:
+        return None
+    depth = 0
+    for tag in re.compile(rf"<(/?){name.group(1)}\b[^>]*>", re.IGNORECASE).finditer(html_text, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html_text[start : tag.end()]
+    return html_text[start:]
+
+
+def _id_attribute(html_text: str, value: str) -> int | None:
+    # A plain substring search, checked against the attribute syntax around it, is far cheaper than one regex
+    # that the engine would retry at every position of the page.
+    idx = html_text.find(value)
+    while idx >= 0:
+        end = idx + len(value)
+        quoted = _ID_PREFIX_RE.search(html_text, max(idx - 16, 0), idx)
+        if quoted and html_text[end : end + 1] in ("\"", "'", ">", " "):
+            return idx
+        idx = html_text.find(value, end)
+    return None
+
+
+def _plain(fragment: str) -> str:
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", fragment))).strip()
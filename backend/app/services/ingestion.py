@@ -1,15 +1,39 @@
+from __future__ import annotations
+
+import asyncio
 from dataclasses import dataclass
+from datetime import datetime, timezone
 import logging
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, TypeVar
 
 from app.core.config import Settings, get_settings
-from app.providers.base import IngestionContext
-from app.providers.mock_provider import MockWeatherProvider
-from app.services.ai_extractor import AiExtractor
-from app.services.provider_factory import build_forecast_provider, build_warning_provider
-from app.storage.repository import WeatherRepository
+from app.core.metrics import (
+    DB_ROWS_WRITTEN,
+    DB_WRITE_SECONDS,
+    INGESTION_STAGE_SECONDS,
+    PROVIDER_CIRCUIT_SKIPS,
+    PROVIDER_FETCH_SECONDS,
+)
+from app.models import ForecastPoint, WarningRecord
+from app.providers.base import FetchStateUpdate, IngestionContext
+from app.services.cache import get_dashboard_cache
+from app.services.circuit import CircuitBreaker
+from app.services.events import get_warning_broker
+from app.services.geo import resolve_province
+from app.services.spatial import cell_key, snap_to_grid
+from app.services.warning_merge import merge_warnings
+from app.storage.repository import UpsertResult, WeatherRepository
+from app.storage.series import build_series
+
+if TYPE_CHECKING:
+    from app.core.http import HttpPool
+    from app.providers.base import AsyncWarningProvider
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 @dataclass
 class IngestionInput:
@@ -19,53 +43,308 @@ class IngestionInput:
     label: str
 
 
+@dataclass
+class LocationRefreshResult:
+    location: IngestionInput
+    warnings: int = 0
+    forecast_points: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def location_pipeline(payload: IngestionInput) -> str:
+    return f"location:{payload.lat:.4f},{payload.lon:.4f}"
+
+
 class IngestionService:
-    def __init__(self, repository: WeatherRepository, settings: Settings | None = None):
+    def __init__(self, repository: WeatherRepository, settings: Settings | None = None, http: HttpPool | None = None):
         self.repository = repository
         self.settings = settings or get_settings()
-        self.ai_extractor = AiExtractor(self.settings)
-        self.warning_provider = build_warning_provider(self.settings, self.ai_extractor)
+        self.http = http
+        # Providers, httpx and the AI extractor load here rather than at import, so the API process
+        # (which imports this module for IngestionInput) never pays for them.
+        from app.providers.mock_provider import MockWeatherProvider
+        from app.services.ai_extractor import AiExtractor
+        from app.services.provider_factory import build_forecast_provider, build_warning_providers
+
+        self.ai_extractor = AiExtractor(self.settings, cache=repository)
+        self.warning_providers = build_warning_providers(self.settings, self.ai_extractor, repository)
         self.forecast_provider = build_forecast_provider(self.settings)
         self.fallback_provider = MockWeatherProvider()
+        # Outcome of the latest warning upsert; None when the last cycle wrote no warnings.
+        self.last_warning_upsert: UpsertResult | None = None
+        # Breakers of the current cycle by circuit key ("kind:provider"); mock providers have none.
+        self.circuits: dict[str, CircuitBreaker] = {}
 
-    def refresh(self, payload: IngestionInput) -> None:
-        context = IngestionContext(
-            lat=payload.lat,
-            lon=payload.lon,
-            province=payload.province,
-            label=payload.label,
-        )
-        if self.settings.warning_provider.lower() == "mock" or self.settings.forecast_provider.lower() == "mock":
+    @property
+    def national_warnings(self) -> bool:
+        """True when every warning source is national, so warnings need no per-location fetches."""
+        return all(getattr(provider, "national_scope", False) for provider in self.warning_providers.values())
+
+    def refresh(self, payload: IngestionInput) -> LocationRefreshResult:
+        return self.refresh_many([payload])[0]
+
+    def refresh_many(self, payloads: list[IngestionInput]) -> list[LocationRefreshResult]:
+        return asyncio.run(self.arefresh_many(payloads))
+
+    async def arefresh_many(
+        self, payloads: list[IngestionInput], *, warnings: bool = True, forecast: bool = True
+    ) -> list[LocationRefreshResult]:
+        """Refresh warnings and/or forecasts for `payloads`; with only national warning sources and
+        `forecast=False` no per-location results are returned."""
+        if not payloads:
+            return []
+        if self.http is not None:
+            return await self._arefresh_many(payloads, self.http, warnings, forecast)
+        from app.core.http import HttpPool
+
+        async with HttpPool(self.settings) as http:
+            return await self._arefresh_many(payloads, http, warnings, forecast)
+
+    async def _arefresh_many(
+        self, payloads: list[IngestionInput], http: HttpPool, include_warnings: bool, include_forecast: bool
+    ) -> list[LocationRefreshResult]:
+        if "mock" in self.settings.warning_providers_list or self.settings.forecast_provider.lower() == "mock":
             logger.info(
                 "Ingestion running in demo mode (warning_provider=%s, forecast_provider=%s)",
                 self.settings.warning_provider,
                 self.settings.forecast_provider,
             )
 
-        fallback_messages: list[str] = []
-        try:
-            warnings = self.warning_provider.fetch_warnings(context)
-        except Exception as exc:  # noqa: BLE001
-            if not self.settings.fallback_to_mock_on_failure:
-                self.repository.update_refresh_status("ingestion", error=f"warning provider failed: {exc}")
-                raise
-            warnings = self.fallback_provider.fetch_warnings(context)
-            fallback_messages.append(f"warning provider failed: {exc}")
+        started = time.perf_counter()
+        self.circuits = self._load_circuits(include_warnings, include_forecast)
+        # National bulletin sources return the same pages for every location, so fetch them once per cycle.
+        national: dict[str, AsyncWarningProvider] = {}
+        local: dict[str, AsyncWarningProvider] = {}
+        if include_warnings:
+            for name, provider in self.warning_providers.items():
+                (national if getattr(provider, "national_scope", False) else local)[name] = provider
+        slots = asyncio.Semaphore(max(1, self.settings.ingestion_max_concurrency))
+        national_tasks = [
+            self._fetch("warning", name, provider.afetch_warnings, self._context(payloads[0]), http)
+            for name, provider in national.items()
+        ]
+        location_tasks = []
+        if local or include_forecast:
+            location_tasks = [
+                self._fetch_location(payload, local, include_forecast, http, slots) for payload in payloads
+            ]
+        fetched_all = await asyncio.gather(*national_tasks, *location_tasks)
+        national_fetched, fetched = fetched_all[: len(national_tasks)], fetched_all[len(national_tasks) :]
 
-        try:
-            forecast = self.forecast_provider.fetch_forecast(context)
-        except Exception as exc:  # noqa: BLE001
-            if not self.settings.fallback_to_mock_on_failure:
-                self.repository.update_refresh_status("ingestion", error=f"forecast provider failed: {exc}")
-                raise
-            forecast = self.fallback_provider.fetch_forecast(context)
-            fallback_messages.append(f"forecast provider failed: {exc}")
+        results: list[LocationRefreshResult] = []
+        # Warnings per source, in configured order; a source that failed everywhere has no entry.
+        batches: dict[str, list[WarningRecord]] = {}
+        forecast: list[ForecastPoint] = []
+        forecast_ok = False
+        messages: list[str] = []
+        fetch_states: list[FetchStateUpdate] = []
+        for name, (rows, error) in zip(national, national_fetched):
+            if rows is not None:
+                batches[name] = rows
+                fetch_states.extend(getattr(national[name], "pending_fetch_states", ()))
+            if error:
+                messages.append(error)
+        # A source whose warning fetch failed for a province keeps its last-known-good rows there.
+        keep_provinces: set[tuple[str, str]] = set()
+        for result, location_warnings, location_forecast in fetched:
+            for name, rows in location_warnings.items():
+                if rows is None:
+                    province = self._context(result.location).province
+                    keep_provinces.update((source, province) for source in self.warning_providers[name].warning_sources)
+                else:
+                    batches.setdefault(name, []).extend(rows)
+            if location_forecast is not None:
+                forecast.extend(location_forecast)
+                forecast_ok = True
+            if result.error:
+                messages.append(f"{result.location.label}: {result.error}")
+            results.append(result)
 
+        warnings: list[WarningRecord] = []
+        dropped: list[WarningRecord] = []
+        warning_sources: set[str] | None = None
+        if batches:
+            warnings, dropped = merge_warnings([batches[name] for name in self.warning_providers if name in batches])
+            if len(batches) < len(national) + len(local):
+                # Rows of sources that delivered nothing this cycle stay as they are.
+                warning_sources = {
+                    source
+                    for provider in [self.fallback_provider, *(self.warning_providers[name] for name in batches)]
+                    for source in provider.warning_sources
+                }
+
+        written = time.perf_counter()
+        INGESTION_STAGE_SECONDS.labels("fetch").observe(written - started)
+        self.last_warning_upsert = None
         try:
-            self.repository.replace_warnings(warnings)
-            self.repository.replace_forecast(forecast)
-            status_error = "; ".join(fallback_messages) if fallback_messages else None
+            if batches:
+                self.last_warning_upsert = _timed_write(
+                    "warnings",
+                    lambda: self.repository.upsert_warnings(
+                        _dedupe_warnings(warnings),
+                        sources=warning_sources,
+                        keep_provinces=keep_provinces,
+                        # Stored hidden, so a 304 or unchanged hash of their page still returns every record.
+                        superseded=dropped,
+                        fetch_states=fetch_states,
+                    ),
+                )
+            if forecast_ok and self.settings.forecast_storage.lower() == "series":
+                _timed_write("forecast_series", lambda: self.repository.upsert_forecast_series(build_series(forecast)))
+            elif forecast_ok:
+                _timed_write("forecast_points", lambda: self.repository.upsert_forecast(forecast))
+            self.repository.save_circuits([breaker.values() for breaker in self.circuits.values()])
+            for result in results:
+                self.repository.update_refresh_status(location_pipeline(result.location), error=result.error)
+            status_error = "; ".join(messages)[:1024] if messages else None
             self.repository.update_refresh_status("ingestion", error=status_error)
         except Exception as exc:  # noqa: BLE001
             self.repository.update_refresh_status("ingestion", error=str(exc))
             raise
+        finally:
+            INGESTION_STAGE_SECONDS.labels("write").observe(time.perf_counter() - written)
+        get_dashboard_cache(self.settings).invalidate()
+        if self.last_warning_upsert is not None and self.last_warning_upsert.changes:
+            get_warning_broker(self.settings).publish(self.last_warning_upsert.changes)
+
+        logger.info(
+            "Ingestion cycle finished: %d locations, %d failed, AI cache %d hits / %d misses",
+            len(results),
+            sum(1 for result in results if not result.ok),
+            self.ai_extractor.cache_stats.hits,
+            self.ai_extractor.cache_stats.misses,
+        )
+        return results
+
+    async def _fetch_location(
+        self,
+        payload: IngestionInput,
+        warning_providers: dict[str, AsyncWarningProvider],
+        include_forecast: bool,
+        http: HttpPool,
+        slots: asyncio.Semaphore,
+    ) -> tuple[LocationRefreshResult, dict[str, list[WarningRecord] | None], list[ForecastPoint] | None]:
+        context = self._context(payload)
+        result = LocationRefreshResult(location=payload)
+        errors: list[str] = []
+
+        async def skipped() -> tuple[None, None]:
+            return None, None
+
+        async with slots:
+            forecast_task = (
+                self._fetch("forecast", self._forecast_name, self.forecast_provider.afetch_forecast, context, http)
+                if include_forecast
+                else skipped()
+            )
+            warning_tasks = [
+                self._fetch("warning", name, provider.afetch_warnings, context, http)
+                for name, provider in warning_providers.items()
+            ]
+            (forecast, forecast_error), *fetched = await asyncio.gather(forecast_task, *warning_tasks)
+
+        warnings: dict[str, list[WarningRecord] | None] = {}
+        for name, (rows, warning_error) in zip(warning_providers, fetched):
+            warnings[name] = rows
+            if warning_error:
+                errors.append(warning_error)
+        result.warnings = sum(len(rows or []) for rows in warnings.values())
+        if forecast_error:
+            errors.append(forecast_error)
+        for point in forecast or []:
+            point.cell_key = cell_key(point.lat, point.lon, self.settings.forecast_grid_degrees)
+        result.forecast_points = len(forecast or [])
+
+        result.error = "; ".join(errors) if errors else None
+        return result, warnings, forecast
+
+    async def _fetch(
+        self,
+        kind: str,
+        provider: str,
+        primary: Callable[[IngestionContext, HttpPool], Awaitable[list[T]]],
+        context: IngestionContext,
+        http: HttpPool,
+    ) -> tuple[list[T] | None, str | None]:
+        breaker = self.circuits.get(f"{kind}:{provider}")
+        if breaker is not None and not breaker.allow(datetime.now(timezone.utc)):
+            PROVIDER_CIRCUIT_SKIPS.labels(kind, provider).inc()
+            return None, f"{kind} provider {provider} circuit open"
+        started = time.perf_counter()
+        try:
+            if kind == "warning":
+                # Timed from here, after the concurrency slot is held, so queueing behind other locations never
+                # counts against the source; a slow call is dropped instead of holding up the cycle.
+                rows = await asyncio.wait_for(primary(context, http), self.settings.warning_source_deadline_seconds)
+            else:
+                rows = await primary(context, http)
+        except Exception as exc:  # noqa: BLE001
+            PROVIDER_FETCH_SECONDS.labels(kind, provider, "error").observe(time.perf_counter() - started)
+            timed_out = isinstance(exc, asyncio.TimeoutError)
+            error = "missed the source deadline" if timed_out else str(exc)
+            message = f"{kind} provider {provider} failed: {error}"
+            logger.warning("%s (%s)", message, context.label)
+            # A slow answer is not a broken upstream, so deadline drops leave the circuit as it was.
+            if breaker is not None and timed_out:
+                breaker.abandon()
+            elif breaker is not None:
+                breaker.record_failure(error, datetime.now(timezone.utc), self.settings)
+            # Demo data only stands in for a provider that never delivered; afterwards its
+            # last-known-good rows are kept instead.
+            if not self.settings.fallback_to_mock_on_failure or (
+                breaker is not None and breaker.last_success_at is not None
+            ):
+                return None, message
+            if kind == "warning":
+                return await self.fallback_provider.afetch_warnings(context, http), message
+            return await self.fallback_provider.afetch_forecast(context, http), message
+        PROVIDER_FETCH_SECONDS.labels(kind, provider, "ok").observe(time.perf_counter() - started)
+        if breaker is not None:
+            breaker.record_success(datetime.now(timezone.utc))
+        return rows, None
+
+    @property
+    def _forecast_name(self) -> str:
+        return self.settings.forecast_provider.lower()
+
+    def _load_circuits(self, include_warnings: bool, include_forecast: bool) -> dict[str, CircuitBreaker]:
+        keys = [f"warning:{name}" for name in self.warning_providers if include_warnings and name != "mock"]
+        if include_forecast and self._forecast_name != "mock":
+            keys.append(f"forecast:{self._forecast_name}")
+        rows = {row.circuit_key: row for row in self.repository.get_circuits(keys)} if keys else {}
+        return {key: CircuitBreaker.from_row(rows[key]) if key in rows else CircuitBreaker(key=key) for key in keys}
+
+    def _context(self, payload: IngestionInput) -> IngestionContext:
+        # Forecasts are fetched at the grid cell centre so nearby locations share one series.
+        lat, lon = snap_to_grid(payload.lat, payload.lon, self.settings.forecast_grid_degrees)
+        return IngestionContext(
+            lat=lat,
+            lon=lon,
+            province=resolve_province(payload.lat, payload.lon, fallback=payload.province),
+            label=payload.label,
+        )
+
+
+def _timed_write(table: str, write: Callable[[], UpsertResult]) -> UpsertResult:
+    started = time.perf_counter()
+    result = write()
+    DB_WRITE_SECONDS.labels(table).observe(time.perf_counter() - started)
+    for op in ("inserted", "updated", "deleted"):
+        DB_ROWS_WRITTEN.labels(table, op).inc(getattr(result, op))
+    return result
+
+
+def _dedupe_warnings(warnings: list[WarningRecord]) -> list[WarningRecord]:
+    seen: set[tuple[str, str, str, str]] = set()
+    unique: list[WarningRecord] = []
+    for item in warnings:
+        key = (item.source, item.detail_url, item.province, item.title)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+    return unique
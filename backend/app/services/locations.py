@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from app.core.config import Settings, get_settings
+from app.services.ingestion import IngestionInput
+from app.services.spatial import cell_key
+from app.storage.repository import WeatherRepository
+
+# Province -> (capital label, lat, lon). Covers every entry in `PROVINCES`.
+PROVINCE_CAPITALS: dict[str, tuple[str, float, float]] = {
+    "安徽": ("合肥", 31.8206, 117.2272),
+    "北京": ("北京", 39.9042, 116.4074),
+    "重庆": ("重庆", 29.5630, 106.5516),
+    "福建": ("福州", 26.0745, 119.2965),
+    "甘肃": ("兰州", 36.0611, 103.8343),
+    "广东": ("广州", 23.1291, 113.2644),
+    "广西": ("南宁", 22.8170, 108.3665),
+    "贵州": ("贵阳", 26.6470, 106.6302),
+    "海南": ("海口", 20.0440, 110.1999),
+    "河北": ("石家庄", 38.0428, 114.5149),
+    "黑龙江": ("哈尔滨", 45.8038, 126.5350),
+    "河南": ("郑州", 34.7466, 113.6254),
+    "湖北": ("武汉", 30.5928, 114.3055),
+    "湖南": ("长沙", 28.2282, 112.9388),
+    "江苏": ("南京", 32.0603, 118.7969),
+    "江西": ("南昌", 28.6820, 115.8579),
+    "吉林": ("长春", 43.8171, 125.3235),
+    "辽宁": ("沈阳", 41.8057, 123.4315),
+    "内蒙古": ("呼和浩特", 40.8424, 111.7490),
+    "宁夏": ("银川", 38.4872, 106.2309),
+    "青海": ("西宁", 36.6171, 101.7782),
+    "山东": ("济南", 36.6512, 117.1201),
+    "上海": ("上海", 31.2304, 121.4737),
+    "山西": ("太原", 37.8706, 112.5489),
+    "陕西": ("西安", 34.3416, 108.9398),
+    "四川": ("成都", 30.5728, 104.0668),
+    "天津": ("天津", 39.0842, 117.2009),
+    "西藏": ("拉萨", 29.6520, 91.1721),
+    "新疆": ("乌鲁木齐", 43.8256, 87.6168),
+    "云南": ("昆明", 24.8801, 102.8329),
+    "浙江": ("杭州", 30.2741, 120.1551),
+    "香港": ("香港", 22.3193, 114.1694),
+    "澳门": ("澳门", 22.1987, 113.5439),
+    "台湾": ("台北", 25.0330, 121.5654),
+}
+
+
+class LocationRegistry:
+    """Every location the ingestion cycle covers: province capitals, the default point and user-registered points."""
+
+    def __init__(self, repository: WeatherRepository, settings: Settings | None = None):
+        self.repository = repository
+        self.settings = settings or get_settings()
+
+    def list_locations(self) -> list[IngestionInput]:
+        candidates: list[IngestionInput] = [
+            IngestionInput(
+                lat=self.settings.default_lat,
+                lon=self.settings.default_lon,
+                province=self.settings.default_province,
+                label=self.settings.default_label,
+            )
+        ]
+        if self.settings.ingest_province_capitals:
+            candidates.extend(
+                IngestionInput(lat=lat, lon=lon, province=province, label=label)
+                for province, (label, lat, lon) in PROVINCE_CAPITALS.items()
+            )
+        candidates.extend(
+            IngestionInput(lat=item.lat, lon=item.lon, province=item.province, label=item.location_label)
+            for item in self.repository.list_tracked_locations()
+        )
+
+        # One location per forecast grid cell; earlier candidates (default point, capitals) keep their label.
+        seen: set[int] = set()
+        locations: list[IngestionInput] = []
+        for item in candidates:
+            key = cell_key(item.lat, item.lon, self.settings.forecast_grid_degrees)
+            if key in seen:
+                continue
+            seen.add(key)
+            locations.append(item)
+        return locations
@@ -1,27 +1,54 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from app.core.config import Settings
-from app.providers.base import ForecastProvider, WarningProvider
-from app.providers.mock_provider import MockWeatherProvider
-from app.providers.nmc_provider import NmcBulletinWarningProvider
-from app.providers.openmeteo_provider import OpenMeteoForecastProvider
-from app.providers.qweather_provider import QWeatherProvider
-from app.services.ai_extractor import AiExtractor
+
+if TYPE_CHECKING:
+    from app.providers.base import AsyncForecastProvider, AsyncWarningProvider, FetchStateStore
+    from app.services.ai_extractor import AiExtractor
+
+# Provider modules are imported only once the configured one is built, so unused providers (and their
+# dependencies) are never loaded.
 
 
-def build_warning_provider(settings: Settings, ai_extractor: AiExtractor) -> WarningProvider:
-    provider = settings.warning_provider.lower()
+def build_warning_providers(
+    settings: Settings, ai_extractor: AiExtractor, fetch_state: FetchStateStore | None = None
+) -> dict[str, AsyncWarningProvider]:
+    """Every source named in WARNING_PROVIDER (comma-separated), in configured order; ingestion fans out to all."""
+    return {
+        name: build_warning_provider(settings, ai_extractor, fetch_state, name)
+        for name in settings.warning_providers_list
+    }
+
+
+def build_warning_provider(
+    settings: Settings, ai_extractor: AiExtractor, fetch_state: FetchStateStore | None = None, name: str | None = None
+) -> AsyncWarningProvider:
+    provider = (name or settings.warning_providers_list[0]).lower()
     if provider == "nmc":
-        return NmcBulletinWarningProvider(settings=settings, ai_extractor=ai_extractor)
+        from app.providers.nmc_provider import NmcBulletinWarningProvider
+
+        return NmcBulletinWarningProvider(settings=settings, ai_extractor=ai_extractor, fetch_state=fetch_state)
     if provider == "qweather":
+        from app.providers.qweather_provider import QWeatherProvider
+
         return QWeatherProvider(settings=settings)
+    from app.providers.mock_provider import MockWeatherProvider
+
     return MockWeatherProvider()
 
 
-def build_forecast_provider(settings: Settings) -> ForecastProvider:
+def build_forecast_provider(settings: Settings) -> AsyncForecastProvider:
     provider = settings.forecast_provider.lower()
     if provider == "openmeteo":
+        from app.providers.openmeteo_provider import OpenMeteoForecastProvider
+
         return OpenMeteoForecastProvider(settings=settings)
     if provider == "qweather":
+        from app.providers.qweather_provider import QWeatherProvider
+
         return QWeatherProvider(settings=settings)
+    from app.providers.mock_provider import MockWeatherProvider
+
     return MockWeatherProvider()
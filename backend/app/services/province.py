@@ -22,9 +22,14 @@ PROVINCES = [
 PROVINCE_LOOKUP = {item.name: item for item in PROVINCES}
 
 
-def sorted_provinces(current_province: str | None) -> list[ProvinceMeta]:
-    provinces = sorted(PROVINCES, key=lambda p: (p.pinyin_initial, p.name))
-    if current_province and current_province in PROVINCE_LOOKUP:
-        current = PROVINCE_LOOKUP[current_province]
-        provinces = [current] + [p for p in provinces if p.name != current.name]
-    return provinces
+_SORTED_PROVINCES = tuple(sorted(PROVINCES, key=lambda p: (p.pinyin_initial, p.name)))
+# Every possible ordering, built once: the highlighted province first, the rest in pinyin order.
+_HIGHLIGHT_ORDERS = {
+    current.name: (current, *(p for p in _SORTED_PROVINCES if p.name != current.name)) for current in PROVINCES
+}
+
+
+def sorted_provinces(current_province: str | None) -> tuple[ProvinceMeta, ...]:
+    if current_province:
+        return _HIGHLIGHT_ORDERS.get(current_province, _SORTED_PROVINCES)
+    return _SORTED_PROVINCES
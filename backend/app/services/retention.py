@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import logging
+import time
+
+from app.core.config import Settings, get_settings
+from app.core.database import compact
+from app.core.metrics import RETENTION_ROWS
+from app.storage.repository import WeatherRepository
+
+logger = logging.getLogger(__name__)
+
+# Tables whose statistics and free space are maintained after each run.
+COMPACTED_TABLES = ("warning_records", "warning_history", "forecast_points", "forecast_series", "forecast_history")
+
+
+@dataclass
+class RetentionResult:
+    archived_warnings: int = 0
+    pruned_history: int = 0
+    pruned_forecasts: int = 0
+    pruned_forecast_history: int = 0
+    statements: list[str] = field(default_factory=list)
+
+
+class RetentionService:
+    """Keeps the hot tables down to active rows: archives expired warnings and forecast steps older than
+    FORECAST_RETENTION_HOURS, drops history past WARNING_HISTORY_DAYS / FORECAST_HISTORY_DAYS, then compacts."""
+
+    def __init__(self, repository: WeatherRepository, settings: Settings | None = None):
+        self.repository = repository
+        self.settings = settings or get_settings()
+
+    def run(self, now: datetime | None = None) -> RetentionResult:
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+        result = RetentionResult(
+            archived_warnings=self.repository.archive_expired_warnings(now),
+            pruned_history=self.repository.prune_warning_history(
+                now.date() - timedelta(days=self.settings.warning_history_days)
+            ),
+            pruned_forecasts=self.repository.prune_forecasts(
+                now - timedelta(hours=self.settings.forecast_retention_hours)
+            ),
+            pruned_forecast_history=self.repository.prune_forecast_history(
+                now.date() - timedelta(days=self.settings.forecast_history_days)
+            ),
+        )
+        RETENTION_ROWS.labels("warning_records", "archived").inc(result.archived_warnings)
+        RETENTION_ROWS.labels("warning_history", "pruned").inc(result.pruned_history)
+        RETENTION_ROWS.labels("forecast", "pruned").inc(result.pruned_forecasts)
+        RETENTION_ROWS.labels("forecast_history", "pruned").inc(result.pruned_forecast_history)
+        result.statements = compact(self.repository.db.get_bind(), COMPACTED_TABLES, self.settings)
+        logger.info(
+            "Retention finished in %.1fs: %d warnings and %d forecast rows archived, %d warning and %d forecast "
+            "history rows pruned, ran %s",
+            time.perf_counter() - started,
+            result.archived_warnings,
+            result.pruned_forecasts,
+            result.pruned_history,
+            result.pruned_forecast_history,
+            ", ".join(result.statements) or "nothing",
+        )
+        return result
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from typing import TYPE_CHECKING, Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, get_settings
+from app.services.ingestion import IngestionInput, IngestionService
+from app.services.locations import LocationRegistry
+from app.services.retention import RetentionService
+from app.storage.repository import UpsertResult, WeatherRepository
+
+if TYPE_CHECKING:
+    from app.core.http import HttpPool
+
+logger = logging.getLogger(__name__)
+
+# The warning set is synced as a whole (stale rows are deleted per source), so warnings stay one job.
+WARNINGS_JOB = "warnings"
+RETENTION_JOB = "retention"
+_FORECAST_PREFIX = "forecast:"
+
+
+def forecast_job(payload: IngestionInput) -> str:
+    return f"{_FORECAST_PREFIX}{payload.lat:.4f},{payload.lon:.4f}"
+
+
+def next_warning_interval(current: int, changed: bool, settings: Settings, adaptive: bool) -> int:
+    """Seconds until the next warnings run: doubles while a national source is unchanged, resets on change."""
+    base = settings.warning_refresh_minutes * 60
+    if not adaptive or changed:
+        return base
+    return min(max(current, base) * 2, max(base, settings.nmc_max_refresh_minutes * 60))
+
+
+def _changed(result: UpsertResult | None) -> bool:
+    return result is not None and bool(result.inserted or result.updated or result.deleted)
+
+
+class RefreshScheduler:
+    """Runs ingestion as leased jobs in the shared database, so several workers split the work and never run
+    the same job twice at once. Call `tick` periodically; each call claims and runs whatever is due."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        settings: Settings | None = None,
+        http: HttpPool | None = None,
+        owner: str | None = None,
+    ):
+        self.session_factory = session_factory
+        self.settings = settings or get_settings()
+        self.http = http
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+
+    def jobs(self, payloads: list[IngestionInput]) -> dict[str, int]:
+        jobs = {
+            WARNINGS_JOB: self.settings.warning_refresh_minutes * 60,
+            RETENTION_JOB: self.settings.retention_interval_minutes * 60,
+        }
+        forecast_interval = self.settings.forecast_refresh_minutes * 60
+        for payload in payloads:
+            jobs[forecast_job(payload)] = forecast_interval
+        return jobs
+
+    async def tick(self) -> list[str]:
+        """Claim due jobs and run them; returns the keys of the jobs this worker ran."""
+        db = self.session_factory()
+        try:
+            repository = WeatherRepository(db)
+            payloads = LocationRegistry(repository, settings=self.settings).list_locations()
+            repository.ensure_jobs(self.jobs(payloads))
+            claimed = repository.claim_due_jobs(
+                self.owner, self.settings.job_lease_seconds, max(1, self.settings.ingestion_max_concurrency)
+            )
+        finally:
+            db.close()
+        if not claimed:
+            return []
+
+        intervals = dict(claimed)
+        by_job = {forecast_job(payload): payload for payload in payloads}
+        runs = []
+        if WARNINGS_JOB in intervals:
+            runs.append(self._run_warnings(payloads, intervals[WARNINGS_JOB]))
+        forecast_keys = [key for key in intervals if key in by_job]
+        if forecast_keys:
+            runs.append(self._run_forecasts(forecast_keys, [by_job[key] for key in forecast_keys]))
+        if RETENTION_JOB in intervals:
+            # Deletes and VACUUM block; on a thread they do not hold up the fetches running alongside.
+            runs.append(asyncio.to_thread(self._run_retention))
+        for outcome in await asyncio.gather(*runs, return_exceptions=True):
+            if isinstance(outcome, BaseException):
+                logger.warning("Scheduled refresh failed: %s", outcome)
+        return list(intervals)
+
+    async def _run_warnings(self, payloads: list[IngestionInput], interval: int) -> None:
+        db = self.session_factory()
+        repository = WeatherRepository(db)
+        next_interval = self.settings.warning_refresh_minutes * 60
+        try:
+            service = IngestionService(repository, settings=self.settings, http=self.http)
+            await service.arefresh_many(payloads, forecast=False)
+            adaptive = service.national_warnings
+            next_interval = next_warning_interval(interval, _changed(service.last_warning_upsert), self.settings, adaptive)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            try:
+                repository.release_job(WARNINGS_JOB, self.owner, next_interval)
+            finally:
+                db.close()
+
+    async def _run_forecasts(self, keys: list[str], payloads: list[IngestionInput]) -> None:
+        # One batched cycle for all claimed locations, so shared grid cells are fetched once.
+        db = self.session_factory()
+        repository = WeatherRepository(db)
+        try:
+            service = IngestionService(repository, settings=self.settings, http=self.http)
+            await service.arefresh_many(payloads, warnings=False)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            try:
+                for key in keys:
+                    repository.release_job(key, self.owner, self.settings.forecast_refresh_minutes * 60)
+            finally:
+                db.close()
+
+    def _run_retention(self) -> None:
+        db = self.session_factory()
+        repository = WeatherRepository(db)
+        try:
+            RetentionService(repository, settings=self.settings).run()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            try:
+                repository.release_job(RETENTION_JOB, self.owner, self.settings.retention_interval_minutes * 60)
+            finally:
+                db.close()
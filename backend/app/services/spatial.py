@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from app.core.config import Settings, get_settings
+from app.storage.repository import WeatherRepository
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _grid_shape(grid_degrees: float) -> int:
+    return int(round(360 / grid_degrees)) + 1
+
+
+def grid_indices(lat: float, lon: float, grid_degrees: float) -> tuple[int, int]:
+    return int(round((lat + 90) / grid_degrees)), int(round((lon + 180) / grid_degrees))
+
+
+def cell_key(lat: float, lon: float, grid_degrees: float) -> int:
+    row, col = grid_indices(lat, lon, grid_degrees)
+    return row * _grid_shape(grid_degrees) + col
+
+
+def snap_to_grid(lat: float, lon: float, grid_degrees: float) -> tuple[float, float]:
+    row, col = grid_indices(lat, lon, grid_degrees)
+    return round(row * grid_degrees - 90, 4), round(col * grid_degrees - 180, 4)
+
+
+def _unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+@dataclass
+class _Node:
+    point: tuple[float, float, float]
+    key: int
+    axis: int
+    left: _Node | None
+    right: _Node | None
+
+
+class CellIndex:
+    """Static 3-D KD-tree over ingested grid cells.
+
+    Cells are stored as unit vectors, so the nearest chord distance is also the nearest great-circle distance.
+    """
+
+    def __init__(self, cells: list[tuple[int, float, float]]):
+        points = [(_unit_vector(lat, lon), key) for key, lat, lon in cells]
+        self.size = len(points)
+        self._root = self._build(points, 0)
+
+    def _build(self, points: list[tuple[tuple[float, float, float], int]], depth: int) -> _Node | None:
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda item: item[0][axis])
+        mid = len(points) // 2
+        point, key = points[mid]
+        return _Node(point, key, axis, self._build(points[:mid], depth + 1), self._build(points[mid + 1 :], depth + 1))
+
+    def nearest(self, lat: float, lon: float, radius_km: float) -> int | None:
+        target = _unit_vector(lat, lon)
+        # Chord length on the unit sphere for the given arc.
+        best_dist = (2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        best_key: int | None = None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            dist = sum((a - b) ** 2 for a, b in zip(node.point, target))
+            if dist <= best_dist:
+                best_dist, best_key = dist, node.key
+            delta = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+            if delta * delta <= best_dist:
+                stack.append(far)
+            stack.append(near)
+        return best_key
+
+
+class ForecastLocator:
+    """Resolves a coordinate to the nearest ingested forecast cell, rebuilding the index when data changes."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._index: CellIndex | None = None
+        self._token: object = None
+        self._built_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def nearest_cell(self, repository: WeatherRepository, lat: float, lon: float, token: object = None) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            expired = now - self._built_at > self.settings.forecast_index_max_age_seconds
+            index = None if self._index is None or token != self._token or expired else self._index
+        if index is None:
+            # Queried outside the lock: under an async session the query yields to the event loop, and another
+            # request on the same thread must not block on the lock meanwhile. Concurrent rebuilds are harmless.
+            index = CellIndex(repository.list_forecast_cells())
+            with self._lock:
+                self._index, self._token, self._built_at = index, token, now
+        return index.nearest(lat, lon, self.settings.forecast_search_radius_km)
+
+
+_locator: ForecastLocator | None = None
+
+
+def get_forecast_locator(settings: Settings | None = None) -> ForecastLocator:
+    global _locator
+    if _locator is None:
+        _locator = ForecastLocator(settings or get_settings())
+    return _locator
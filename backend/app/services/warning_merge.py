@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterable
+
+from app.models import WarningRecord
+
+_OPEN_END = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def merge_warnings(batches: Iterable[list[WarningRecord]]) -> tuple[list[WarningRecord], list[WarningRecord]]:
+    """Merge the batches of several sources into (kept, dropped).
+
+    Warnings of different batches with the same province, hazard type and level and overlapping validity are one
+    warning; the most confident version is kept, the earlier batch on a tie. Records within one batch are never
+    merged with each other. Candidates are found through a hash index on (province, hazard_type, level), so a
+    merge costs one bucket scan per record instead of a pairwise comparison.
+    """
+    kept: list[WarningRecord] = []
+    origins: list[int] = []
+    dropped: list[WarningRecord] = []
+    index: dict[tuple[str, str, str], list[int]] = {}
+    for batch_idx, batch in enumerate(batches):
+        for item in batch:
+            bucket = index.setdefault((item.province, item.hazard_type, item.level), [])
+            match = next(
+                (slot for slot in bucket if origins[slot] != batch_idx and _overlaps(kept[slot], item)), None
+            )
+            if match is None:
+                bucket.append(len(kept))
+                kept.append(item)
+                origins.append(batch_idx)
+            elif item.confidence > kept[match].confidence:
+                dropped.append(kept[match])
+                kept[match], origins[match] = item, batch_idx
+            else:
+                dropped.append(item)
+    return kept, dropped
+
+
+def _overlaps(a: WarningRecord, b: WarningRecord) -> bool:
+    return _utc(a.issue_time) <= _end(b) and _utc(b.issue_time) <= _end(a)
+
+
+def _end(item: WarningRecord) -> datetime:
+    return _utc(item.expires_at) if item.expires_at is not None else _OPEN_END
+
+
+def _utc(value: datetime) -> datetime:
+    # Records reused from SQLite come back naive; every stored timestamp is UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
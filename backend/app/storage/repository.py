@@ -1,43 +1,414 @@
-from datetime import datetime, timezone
-from sqlalchemy import delete, select
+from collections.abc import Collection, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models import ForecastPoint, RefreshStatus, WarningRecord
+from app.models import (
+    AiExtractionCacheEntry,
+    ForecastHistory,
+    ForecastPoint,
+    ForecastSeries,
+    JobLease,
+    ProviderCircuit,
+    RefreshStatus,
+    SourceFetchState,
+    TrackedLocation,
+    WarningHistory,
+    WarningRecord,
+)
+from app.providers.base import FetchStateUpdate
+from app.storage.series import SeriesPoint, build_series, decode_series
+
+WARNING_KEY = ("source", "detail_url", "province", "issue_time")
+WARNING_VALUES = ("title", "level", "hazard_type", "expires_at", "summary", "confidence")
+# Column order of the API's WarningItem, for serializing rows without building ORM objects.
+WARNING_ITEM_COLUMNS = (
+    "source", "title", "level", "hazard_type", "province", "issue_time", "expires_at", "detail_url", "summary",
+    "confidence",
+)
+FORECAST_KEY = ("lat", "lon", "forecast_time")
+FORECAST_VALUES = ("cell_key", "location_label", "province", "temperature_c", "humidity_pct", "source")
+SERIES_KEY = ("lat", "lon")
+SERIES_VALUES = (
+    "cell_key", "location_label", "province", "source", "start_time", "step_seconds", "count", "temperatures",
+    "humidities",
+)
+_POINT_COLUMNS = ("forecast_time", "temperature_c", "humidity_pct")
+
+# Keeps tuple IN (...) lists well under the bound-parameter limits of SQLite and Postgres.
+_SCOPE_CHUNK = 500
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    # Warning upserts only: ("new" | "updated" | "expired", key and value columns) per changed row.
+    changes: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
 
 
 class WeatherRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def list_warnings(self, province: str | None) -> list[WarningRecord]:
-        stmt = select(WarningRecord).order_by(WarningRecord.issue_time.desc())
-        if province:
-            stmt = stmt.where(WarningRecord.province == province)
+    def list_warnings(
+        self,
+        province: str | None,
+        *,
+        level: str | None = None,
+        hazard_type: str | None = None,
+        active_at: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+    ) -> list[WarningRecord]:
+        """Newest first. `after` is the (issue_time, id) keyset cursor of the last row already returned."""
+        stmt = _filter_warnings(select(WarningRecord), province, level, hazard_type, active_at, after, limit)
         return list(self.db.scalars(stmt).all())
 
-    def list_forecast(self, lat: float, lon: float) -> list[ForecastPoint]:
-        stmt = (
-            select(ForecastPoint)
-            .where(ForecastPoint.lat == lat, ForecastPoint.lon == lon)
-            .order_by(ForecastPoint.forecast_time.asc())
+    def list_warning_rows(
+        self,
+        province: str | None,
+        *,
+        level: str | None = None,
+        hazard_type: str | None = None,
+        active_at: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Any]:
+        """Same rows as `list_warnings`, as plain `WARNING_ITEM_COLUMNS` tuples that skip ORM object loading."""
+        stmt = _filter_warnings(
+            select(*_columns(WarningRecord, WARNING_ITEM_COLUMNS)), province, level, hazard_type, active_at, None, limit
+        )
+        return list(self.db.execute(stmt).all())
+
+    def list_url_warnings(self, detail_url: str, active_at: datetime) -> list[WarningRecord]:
+        """Active warnings derived from one source page, superseded ones included, as detached copies that are safe
+        to hand back to an upsert (which merges them again)."""
+        stmt = select(*_columns(WarningRecord, WARNING_KEY + WARNING_VALUES)).where(
+            WarningRecord.detail_url == detail_url,
+            or_(WarningRecord.expires_at.is_(None), WarningRecord.expires_at > _utc(active_at)),
         )
-        rows = list(self.db.scalars(stmt).all())
+        return [WarningRecord(**row._mapping) for row in self.db.execute(stmt)]
+
+    def list_forecast(self, cell_key: int) -> list[ForecastPoint]:
+        stmt = select(ForecastPoint).where(ForecastPoint.cell_key == cell_key).order_by(ForecastPoint.forecast_time.asc())
+        return list(self.db.scalars(stmt).all())
+
+    def list_forecast_rows(self, cell_key: int) -> list[Any]:
+        """(forecast_time, temperature_c, humidity_pct) tuples of one cell, oldest first, from either storage mode."""
+        return self.list_forecasts([cell_key])[cell_key]
+
+    def list_forecasts(self, cell_keys: Collection[int]) -> dict[int, list[Any]]:
+        """Series of several cells at once, with chunked IN queries instead of one query per cell.
+
+        A location lives in exactly one of the two forecast tables (each upsert clears the other), so a cell's
+        series is whichever table holds it.
+        """
+        keys = sorted(set(cell_keys))
+        series: dict[int, list[Any]] = {key: [] for key in keys}
+        for start in range(0, len(keys), _SCOPE_CHUNK):
+            chunk = keys[start : start + _SCOPE_CHUNK]
+            packed = select(
+                ForecastSeries.cell_key,
+                ForecastSeries.start_time,
+                ForecastSeries.step_seconds,
+                ForecastSeries.temperatures,
+                ForecastSeries.humidities,
+            ).where(ForecastSeries.cell_key.in_(chunk))
+            for row in self.db.execute(packed):
+                series[row.cell_key] = decode_series(row.start_time, row.step_seconds, row.temperatures, row.humidities)
+            rows = (
+                select(ForecastPoint.cell_key, *_columns(ForecastPoint, _POINT_COLUMNS))
+                .where(ForecastPoint.cell_key.in_(chunk))
+                .order_by(ForecastPoint.cell_key.asc(), ForecastPoint.forecast_time.asc())
+            )
+            for row in self.db.execute(rows):
+                series[row.cell_key].append(SeriesPoint(*row[1:]))
+        return series
+
+    def list_forecast_cells(self) -> list[tuple[int, float, float]]:
+        cells: set[tuple[int, float, float]] = set()
+        for model in (ForecastPoint, ForecastSeries):
+            stmt = select(model.cell_key, model.lat, model.lon).distinct()
+            cells.update((row.cell_key, row.lat, row.lon) for row in self.db.execute(stmt))
+        return sorted(cells)
+
+    def upsert_warnings(
+        self,
+        warnings: Iterable[WarningRecord],
+        sources: Collection[str] | None = None,
+        keep_provinces: Collection[tuple[str, str]] = (),
+        superseded: Iterable[WarningRecord] = (),
+        fetch_states: Iterable[FetchStateUpdate] = (),
+    ) -> UpsertResult:
+        """Write only new or changed warnings; drop expired rows and in-scope rows missing from the batch.
+
+        `sources` limits the stale check to those sources; by default the batch is the complete warning set.
+        Rows of the `keep_provinces` (source, province) pairs, whose fetch failed this cycle, are kept until they
+        expire. `superseded` rows lost the cross-source merge: they are stored hidden, and reported as expired when
+        a visible row turns into one. `fetch_states` are committed with the rows, so a page's validators never
+        outlive a failed write of its warnings.
+        """
+        now = datetime.now(timezone.utc)
+        values = WARNING_VALUES + ("superseded",)
+        columns = _columns(WarningRecord, WARNING_KEY + values)
+        batch = _index_rows(superseded, WARNING_KEY, WARNING_VALUES)
+        for row in batch.values():
+            row["superseded"] = True
+        for key, row in _index_rows(warnings, WARNING_KEY, WARNING_VALUES).items():
+            batch[key] = {**row, "superseded": False}
+        # Already-expired rows are treated as missing from the batch, so they are deleted (and reported) once.
+        incoming = {
+            key: row for key, row in batch.items() if row["expires_at"] is None or row["expires_at"] >= now
+        }
+        stmt = select(WarningRecord.id, *columns)
+        if sources is not None:
+            stmt = stmt.where(WarningRecord.source.in_(list(sources)))
+        existing = self.db.execute(stmt).all()
+        keep = set(keep_provinces)
+        for row in existing:
+            # Carried forward as if re-fetched: unchanged, so neither rewritten nor reported.
+            if (row.source, row.province) in keep and (row.expires_at is None or _utc(row.expires_at) >= now):
+                record = _values(row, WARNING_KEY + values)
+                incoming.setdefault(tuple(record[name] for name in WARNING_KEY), record)
+
+        result, stale_ids = self._sync(WarningRecord, incoming, existing, WARNING_KEY, values, track=True)
+        stale = set(stale_ids)
+        expired = self.db.execute(
+            select(WarningRecord.id, *columns).where(
+                WarningRecord.expires_at.is_not(None), WarningRecord.expires_at < now
+            )
+        ).all()
+        for row in expired:
+            if row.id not in stale:
+                stale_ids.append(row.id)
+                result.changes.append(("expired", _values(row, WARNING_KEY + values)))
+        result.changes = _visible_changes(result.changes)
+        self._archive_warnings(stale_ids, now)
+        result.deleted += self._delete_ids(WarningRecord, stale_ids)
+        for update in fetch_states:
+            self._save_fetch_state(update)
+        self.db.commit()
+        return result
+
+    def archive_expired_warnings(self, now: datetime) -> int:
+        """Move every warning expired at `now` to `warning_history`; normally the warning upsert already has."""
+        expired = and_(WarningRecord.expires_at.is_not(None), WarningRecord.expires_at < _utc(now))
+        ids = list(self.db.scalars(select(WarningRecord.id).where(expired)))
+        self._archive_warnings(ids, now)
+        deleted = self._delete_ids(WarningRecord, ids)
+        self.db.commit()
+        return deleted
+
+    def _archive_warnings(self, ids: list[int], now: datetime) -> None:
+        names = WARNING_KEY + WARNING_VALUES
+        stamp = (literal(_utc(now).date(), WarningHistory.archive_day.type), literal(_utc(now)))
+        for start in range(0, len(ids), _SCOPE_CHUNK):
+            # Superseded rows are copies of a warning archived through its kept version.
+            rows = select(*stamp, *_columns(WarningRecord, names)).where(WarningRecord.superseded.is_(False))
+            self.db.execute(
+                insert(WarningHistory).from_select(
+                    ("archive_day", "archived_at", *names),
+                    rows.where(WarningRecord.id.in_(ids[start : start + _SCOPE_CHUNK])),
+                )
+            )
+
+    def prune_warning_history(self, before: date) -> int:
+        deleted = self.db.execute(delete(WarningHistory).where(WarningHistory.archive_day < before)).rowcount
+        self.db.commit()
+        return deleted
+
+    def prune_forecasts(self, before: datetime) -> int:
+        """Archive, then drop, forecast steps that ended before `before`: past point rows, and series whose last
+        step is past.
+
+        Refreshed locations replace their run anyway, so this only trims locations that are no longer ingested.
+        """
+        now = datetime.now(timezone.utc)
+        past = select(ForecastPoint.id, *_columns(ForecastPoint, FORECAST_KEY + FORECAST_VALUES)).where(
+            ForecastPoint.forecast_time < _utc(before)
+        )
+        points = self.db.execute(past).all()
+        self._archive_runs(build_series(points), now)
+        deleted = self._delete_ids(ForecastPoint, [row.id for row in points])
+        # Only a series that starts before the cutoff can have ended before it.
+        started = select(
+            ForecastSeries.id, ForecastSeries.start_time, ForecastSeries.step_seconds, ForecastSeries.count
+        ).where(ForecastSeries.start_time < _utc(before))
+        ended = [
+            row.id
+            for row in self.db.execute(started)
+            if _utc(row.start_time) + timedelta(seconds=row.step_seconds * max(row.count - 1, 0)) < _utc(before)
+        ]
+        for start in range(0, len(ended), _SCOPE_CHUNK):
+            self._archive_series(ForecastSeries.id.in_(ended[start : start + _SCOPE_CHUNK]), now)
+        deleted += self._delete_ids(ForecastSeries, ended)
+        self.db.commit()
+        return deleted
+
+    def prune_forecast_history(self, before: date) -> int:
+        deleted = self.db.execute(delete(ForecastHistory).where(ForecastHistory.archive_day < before)).rowcount
+        self.db.commit()
+        return deleted
+
+    def _archive_runs(self, runs: Iterable[Any], now: datetime) -> None:
+        names = SERIES_KEY + SERIES_VALUES
+        stamp = {"archive_day": _utc(now).date(), "archived_at": _utc(now)}
+        rows = [{**stamp, **_values(run, names)} for run in runs]
         if rows:
-            return rows
-        # fallback to same province not available in V1; return most recent location
-        fallback_stmt = select(ForecastPoint).order_by(ForecastPoint.created_at.desc(), ForecastPoint.forecast_time.asc())
-        return list(self.db.scalars(fallback_stmt).all())
+            self.db.execute(insert(ForecastHistory), rows)
+
+    def _archive_series(self, condition: Any, now: datetime) -> None:
+        names = SERIES_KEY + SERIES_VALUES
+        stamp = (literal(_utc(now).date(), ForecastHistory.archive_day.type), literal(_utc(now)))
+        rows = select(*stamp, *_columns(ForecastSeries, names)).where(condition)
+        self.db.execute(insert(ForecastHistory).from_select(("archive_day", "archived_at", *names), rows))
+
+    def upsert_forecast(self, forecast_points: Iterable[ForecastPoint]) -> UpsertResult:
+        """Write only new or changed forecast points; drop rows of the batch's locations that it no longer covers.
+
+        A location whose stored run loses or changes any step has that whole run archived first.
+        """
+        incoming = _index_rows(forecast_points, FORECAST_KEY, FORECAST_VALUES)
+        cells = sorted({(key[0], key[1]) for key in incoming})
+        existing: list[Any] = []
+        for start in range(0, len(cells), _SCOPE_CHUNK):
+            stmt = select(ForecastPoint.id, *_columns(ForecastPoint, FORECAST_KEY + FORECAST_VALUES)).where(
+                tuple_(ForecastPoint.lat, ForecastPoint.lon).in_(cells[start : start + _SCOPE_CHUNK])
+            )
+            existing.extend(self.db.execute(stmt).all())
+
+        replaced: list[Any] = []
+        result, stale_ids = self._sync(
+            ForecastPoint, incoming, existing, FORECAST_KEY, FORECAST_VALUES, replaced=replaced
+        )
+        now = datetime.now(timezone.utc)
+        superseded = {(row.lat, row.lon) for row in replaced}
+        self._archive_runs(build_series(row for row in existing if (row.lat, row.lon) in superseded), now)
+        result.deleted += self._delete_ids(ForecastPoint, stale_ids)
+        for start in range(0, len(cells), _SCOPE_CHUNK):
+            chunk = cells[start : start + _SCOPE_CHUNK]
+            self._archive_series(tuple_(ForecastSeries.lat, ForecastSeries.lon).in_(chunk), now)
+        result.deleted += self._delete_locations(ForecastSeries, cells)
+        self.db.commit()
+        return result
+
+    def upsert_forecast_series(self, series: Iterable[ForecastSeries]) -> UpsertResult:
+        """Columnar counterpart of `upsert_forecast`: one row per location, rewritten only when the series changed.
+
+        Per-point rows of the same locations are dropped, so switching FORECAST_STORAGE never leaves two copies.
+        Replaced runs, in either layout, are archived first.
+        """
+        incoming = _index_rows(series, SERIES_KEY, SERIES_VALUES)
+        locations = sorted(incoming)
+        existing: list[Any] = []
+        for start in range(0, len(locations), _SCOPE_CHUNK):
+            stmt = select(ForecastSeries.id, *_columns(ForecastSeries, SERIES_KEY + SERIES_VALUES)).where(
+                tuple_(ForecastSeries.lat, ForecastSeries.lon).in_(locations[start : start + _SCOPE_CHUNK])
+            )
+            existing.extend(self.db.execute(stmt).all())
 
-    def replace_warnings(self, warnings: list[WarningRecord]) -> None:
-        self.db.execute(delete(WarningRecord))
-        self.db.add_all(warnings)
+        replaced: list[Any] = []
+        result, _ = self._sync(ForecastSeries, incoming, existing, SERIES_KEY, SERIES_VALUES, replaced=replaced)
+        now = datetime.now(timezone.utc)
+        self._archive_runs(replaced, now)
+        points: list[Any] = []
+        for start in range(0, len(locations), _SCOPE_CHUNK):
+            stmt = select(*_columns(ForecastPoint, FORECAST_KEY + FORECAST_VALUES)).where(
+                tuple_(ForecastPoint.lat, ForecastPoint.lon).in_(locations[start : start + _SCOPE_CHUNK])
+            )
+            points.extend(self.db.execute(stmt).all())
+        self._archive_runs(build_series(points), now)
+        result.deleted += self._delete_locations(ForecastPoint, locations)
         self.db.commit()
+        return result
+
+    def _delete_locations(self, model: type, locations: list[tuple[float, float]]) -> int:
+        deleted = 0
+        for start in range(0, len(locations), _SCOPE_CHUNK):
+            stmt = delete(model).where(tuple_(model.lat, model.lon).in_(locations[start : start + _SCOPE_CHUNK]))
+            deleted += self.db.execute(stmt).rowcount
+        return deleted
+
+    def _sync(
+        self,
+        model: type,
+        incoming: dict[tuple, dict[str, Any]],
+        existing: Sequence[Any],
+        key: tuple[str, ...],
+        values: tuple[str, ...],
+        track: bool = False,
+        replaced: list[Any] | None = None,
+    ) -> tuple[UpsertResult, list[int]]:
+        """Upsert new and changed rows; return ids of existing rows missing from `incoming`.
 
-    def replace_forecast(self, forecast_points: list[ForecastPoint]) -> None:
-        self.db.execute(delete(ForecastPoint))
-        self.db.add_all(forecast_points)
+        `replaced`, when given, collects the existing rows (as read, before the write) that are stale or changed.
+        """
+        result = UpsertResult()
+        current: dict[tuple, tuple] = {}
+        previous: dict[tuple, Any] = {}
+        stale_ids: list[int] = []
+        for row in existing:
+            row_key = _normalize(tuple(getattr(row, name) for name in key))
+            if row_key in incoming:
+                current[row_key] = _normalize(tuple(getattr(row, name) for name in values))
+                previous[row_key] = row
+            else:
+                stale_ids.append(row.id)
+                if track:
+                    result.changes.append(("expired", _values(row, key + values)))
+                if replaced is not None:
+                    replaced.append(row)
+
+        pending: list[dict[str, Any]] = []
+        for row_key, row in incoming.items():
+            if row_key not in current:
+                result.inserted += 1
+                kind = "new"
+            elif current[row_key] != _normalize(tuple(row[name] for name in values)):
+                result.updated += 1
+                kind = "updated"
+                if replaced is not None:
+                    replaced.append(previous[row_key])
+            else:
+                continue
+            pending.append(row)
+            if track:
+                result.changes.append((kind, row))
+
+        if pending:
+            self.db.execute(_upsert_statement(self.db, model, key, values), pending)
+        return result, stale_ids
+
+    def _delete_ids(self, model: type, ids: list[int]) -> int:
+        deleted = 0
+        for start in range(0, len(ids), _SCOPE_CHUNK):
+            deleted += self.db.execute(delete(model).where(model.id.in_(ids[start : start + _SCOPE_CHUNK]))).rowcount
+        return deleted
+
+    def get_circuits(self, keys: Collection[str]) -> list[ProviderCircuit]:
+        return list(self.db.scalars(select(ProviderCircuit).where(ProviderCircuit.circuit_key.in_(list(keys)))))
+
+    def save_circuits(self, circuits: list[dict[str, Any]]) -> None:
+        if not circuits:
+            return
+        values = tuple(name for name in circuits[0] if name != "circuit_key") + ("updated_at",)
+        now = datetime.now(timezone.utc)
+        self.db.execute(
+            _upsert_statement(self.db, ProviderCircuit, ("circuit_key",), values),
+            [{**item, "updated_at": now} for item in circuits],
+        )
         self.db.commit()
 
+    def list_stale_sources(self) -> list[str]:
+        """Providers whose latest call failed, so their rows are the last-known-good copy."""
+        stmt = select(ProviderCircuit.circuit_key).where(ProviderCircuit.failures > 0)
+        return list(self.db.scalars(stmt.order_by(ProviderCircuit.circuit_key)))
+
     def update_refresh_status(self, pipeline: str, error: str | None = None) -> None:
         existing = self.db.scalar(select(RefreshStatus).where(RefreshStatus.pipeline == pipeline))
         now = datetime.now(timezone.utc)
@@ -50,6 +421,227 @@ class WeatherRepository:
         existing.updated_at = now
         self.db.commit()
 
+    def get_refresh_status(self, pipeline: str = "ingestion") -> RefreshStatus | None:
+        return self.db.scalar(select(RefreshStatus).where(RefreshStatus.pipeline == pipeline))
+
     def get_last_refresh(self, pipeline: str = "ingestion") -> datetime | None:
-        existing = self.db.scalar(select(RefreshStatus).where(RefreshStatus.pipeline == pipeline))
+        existing = self.get_refresh_status(pipeline)
         return existing.last_success_at if existing else None
+
+    def get_fetch_state(self, url: str) -> SourceFetchState | None:
+        return self.db.scalar(select(SourceFetchState).where(SourceFetchState.url == url))
+
+    def _save_fetch_state(self, update: FetchStateUpdate) -> None:
+        existing = self.get_fetch_state(update.url)
+        if existing is None:
+            existing = SourceFetchState(url=update.url)
+            self.db.add(existing)
+        existing.etag = update.etag
+        existing.last_modified = update.last_modified
+        existing.content_hash = update.content_hash
+
+    def get_ai_result(
+        self, model: str, prompt_version: str, input_hash: str, fresh_after: datetime
+    ) -> AiExtractionCacheEntry | None:
+        entry = self.db.scalar(
+            select(AiExtractionCacheEntry).where(
+                AiExtractionCacheEntry.model == model,
+                AiExtractionCacheEntry.prompt_version == prompt_version,
+                AiExtractionCacheEntry.input_hash == input_hash,
+            )
+        )
+        if entry is None or _utc(entry.created_at) <= _utc(fresh_after):
+            return None
+        entry.last_used_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return entry
+
+    def save_ai_result(self, entry: AiExtractionCacheEntry, expired_before: datetime, max_entries: int) -> None:
+        """Insert or refresh `entry`, then drop expired entries and the least recently used beyond `max_entries`."""
+        existing = self.db.scalar(
+            select(AiExtractionCacheEntry).where(
+                AiExtractionCacheEntry.model == entry.model,
+                AiExtractionCacheEntry.prompt_version == entry.prompt_version,
+                AiExtractionCacheEntry.input_hash == entry.input_hash,
+            )
+        )
+        if existing is None:
+            self.db.add(entry)
+        else:
+            for name in ("summary", "level", "hazard_type", "confidence", "created_at", "last_used_at"):
+                setattr(existing, name, getattr(entry, name))
+        self.db.flush()
+
+        self.db.execute(delete(AiExtractionCacheEntry).where(AiExtractionCacheEntry.created_at < _utc(expired_before)))
+        overflow = self.db.scalar(select(func.count(AiExtractionCacheEntry.id))) - max_entries
+        if overflow > 0:
+            oldest = (
+                select(AiExtractionCacheEntry.id)
+                .order_by(AiExtractionCacheEntry.last_used_at.asc(), AiExtractionCacheEntry.id.asc())
+                .limit(overflow)
+            )
+            self.db.execute(delete(AiExtractionCacheEntry).where(AiExtractionCacheEntry.id.in_(oldest)))
+        self.db.commit()
+
+    def ensure_jobs(self, intervals: dict[str, int]) -> None:
+        """Register missing jobs as due now and drop jobs that are no longer scheduled."""
+        existing = set(self.db.scalars(select(JobLease.job_key)).all())
+        now = datetime.now(timezone.utc)
+        for job_key, interval in intervals.items():
+            if job_key not in existing:
+                self.db.add(JobLease(job_key=job_key, next_run_at=now, interval_seconds=interval))
+        stale = sorted(existing - set(intervals))
+        for start in range(0, len(stale), _SCOPE_CHUNK):
+            self.db.execute(delete(JobLease).where(JobLease.job_key.in_(stale[start : start + _SCOPE_CHUNK])))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another worker registered the same jobs first.
+            self.db.rollback()
+
+    def claim_due_jobs(self, owner: str, lease_seconds: float, limit: int) -> list[tuple[str, int]]:
+        """Lease up to `limit` due jobs to `owner`; returns (job_key, interval_seconds) of the jobs won."""
+        now = datetime.now(timezone.utc)
+        free = or_(JobLease.lease_until.is_(None), JobLease.lease_until < now)
+        due = self.db.execute(
+            select(JobLease.job_key, JobLease.interval_seconds)
+            .where(JobLease.next_run_at <= now, free)
+            .order_by(JobLease.next_run_at.asc())
+            .limit(limit)
+        ).all()
+        claimed: list[tuple[str, int]] = []
+        for job_key, interval in due:
+            # Conditional update: only one worker sees rowcount 1 for a free, due job.
+            won = self.db.execute(
+                update(JobLease)
+                .where(JobLease.job_key == job_key, JobLease.next_run_at <= now, free)
+                .values(owner=owner, lease_until=now + timedelta(seconds=lease_seconds))
+            ).rowcount
+            if won:
+                claimed.append((job_key, interval))
+        self.db.commit()
+        return claimed
+
+    def release_job(self, job_key: str, owner: str, interval_seconds: int) -> None:
+        now = datetime.now(timezone.utc)
+        self.db.execute(
+            update(JobLease)
+            .where(JobLease.job_key == job_key, JobLease.owner == owner)
+            .values(
+                owner=None,
+                lease_until=None,
+                last_run_at=now,
+                next_run_at=now + timedelta(seconds=interval_seconds),
+                interval_seconds=interval_seconds,
+            )
+        )
+        self.db.commit()
+
+    def list_tracked_locations(self) -> list[TrackedLocation]:
+        stmt = select(TrackedLocation).order_by(TrackedLocation.created_at.asc())
+        return list(self.db.scalars(stmt).all())
+
+    def add_tracked_location(self, lat: float, lon: float, label: str, province: str) -> TrackedLocation:
+        lat, lon = round(lat, 4), round(lon, 4)
+        existing = self.db.scalar(select(TrackedLocation).where(TrackedLocation.lat == lat, TrackedLocation.lon == lon))
+        if existing is None:
+            existing = TrackedLocation(lat=lat, lon=lon)
+            self.db.add(existing)
+        existing.location_label = label
+        existing.province = province
+        self.db.commit()
+        return existing
+
+
+def _filter_warnings(
+    stmt: Any,
+    province: str | None,
+    level: str | None,
+    hazard_type: str | None,
+    active_at: datetime | None,
+    after: tuple[datetime, int] | None,
+    limit: int | None,
+) -> Any:
+    stmt = stmt.where(WarningRecord.superseded.is_(False)).order_by(
+        WarningRecord.issue_time.desc(), WarningRecord.id.desc()
+    )
+    if province:
+        stmt = stmt.where(WarningRecord.province == province)
+    if level:
+        stmt = stmt.where(WarningRecord.level == level)
+    if hazard_type:
+        stmt = stmt.where(WarningRecord.hazard_type == hazard_type)
+    if active_at is not None:
+        stmt = stmt.where(or_(WarningRecord.expires_at.is_(None), WarningRecord.expires_at > _utc(active_at)))
+    if after is not None:
+        issue_time, row_id = _utc(after[0]), after[1]
+        stmt = stmt.where(
+            or_(
+                WarningRecord.issue_time < issue_time,
+                and_(WarningRecord.issue_time == issue_time, WarningRecord.id < row_id),
+            )
+        )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _columns(model: type, names: tuple[str, ...]) -> list[Any]:
+    return [getattr(model, name) for name in names]
+
+
+def _utc(value: Any) -> Any:
+    # SQLite drops tzinfo on write, so every timestamp is stored (and compared) as UTC.
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    return value
+
+
+def _values(row: Any, names: tuple[str, ...]) -> dict[str, Any]:
+    return {name: _utc(getattr(row, name)) for name in names}
+
+
+def _visible_changes(changes: list[tuple[str, dict[str, Any]]]) -> list[tuple[str, dict[str, Any]]]:
+    # Subscribers only ever saw visible rows: a row that became superseded is gone for them, and one that was
+    # superseded all along never existed.
+    visible: list[tuple[str, dict[str, Any]]] = []
+    for kind, row in changes:
+        record = {name: value for name, value in row.items() if name != "superseded"}
+        if not row["superseded"]:
+            visible.append((kind, record))
+        elif kind == "updated":
+            visible.append(("expired", record))
+    return visible
+
+
+def _normalize(values: tuple) -> tuple:
+    return tuple(_utc(value) for value in values)
+
+
+def _index_rows(rows: Iterable[Any], key: tuple[str, ...], values: tuple[str, ...]) -> dict[tuple, dict[str, Any]]:
+    # Later rows win, so a batch never carries the same natural key twice into one INSERT.
+    indexed: dict[tuple, dict[str, Any]] = {}
+    for row in rows:
+        record = {name: _utc(getattr(row, name)) for name in key + values}
+        indexed[tuple(record[name] for name in key)] = record
+    return indexed
+
+
+def _upsert_statement(db: Session, model: type, key: tuple[str, ...], values: tuple[str, ...]) -> Any:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upsert is not supported for database dialect: {dialect}")
+
+    stmt = insert(model)
+    table = model.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={name: stmt.excluded[name] for name in values},
+        where=or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in values)),
+    )
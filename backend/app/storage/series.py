@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from functools import reduce
+import math
+import sys
+from typing import NamedTuple
+
+from app.models import ForecastPoint, ForecastSeries
+
+
+class SeriesPoint(NamedTuple):
+    forecast_time: datetime
+    temperature_c: float
+    humidity_pct: float
+
+
+def pack_values(values: Iterable[float]) -> bytes:
+    # Little-endian float32 regardless of the host, so blobs move between machines unchanged.
+    packed = array("f", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_values(blob: bytes) -> array:
+    values = array("f")
+    values.frombytes(blob)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def build_series(points: Iterable[ForecastPoint]) -> list[ForecastSeries]:
+    """One `ForecastSeries` per (lat, lon), on the coarsest regular step that fits every point; gaps are NaN."""
+    by_location: dict[tuple[float, float], list[ForecastPoint]] = {}
+    for point in points:
+        by_location.setdefault((point.lat, point.lon), []).append(point)
+
+    series: list[ForecastSeries] = []
+    for (lat, lon), group in by_location.items():
+        group.sort(key=lambda point: _utc(point.forecast_time))
+        start = _utc(group[0].forecast_time)
+        offsets = [int((_utc(point.forecast_time) - start).total_seconds()) for point in group]
+        step = reduce(math.gcd, offsets, 0) or 3600
+        count = offsets[-1] // step + 1
+        temperatures = [math.nan] * count
+        humidities = [math.nan] * count
+        for offset, point in zip(offsets, group):
+            temperatures[offset // step] = point.temperature_c
+            humidities[offset // step] = point.humidity_pct
+        first = group[0]
+        series.append(
+            ForecastSeries(
+                lat=lat,
+                lon=lon,
+                cell_key=first.cell_key,
+                location_label=first.location_label,
+                province=first.province,
+                source=first.source,
+                start_time=start,
+                step_seconds=step,
+                count=count,
+                temperatures=pack_values(temperatures),
+                humidities=pack_values(humidities),
+            )
+        )
+    return series
+
+
+def decode_series(start_time: datetime, step_seconds: int, temperatures: bytes, humidities: bytes) -> list[SeriesPoint]:
+    """Points in time order, skipping gaps. float32 keeps ~7 significant digits, so values come back rounded to 0.01."""
+    start = _utc(start_time)
+    step = timedelta(seconds=step_seconds)
+    return [
+        SeriesPoint(start + step * idx, round(temperature, 2), round(humidity, 2))
+        for idx, (temperature, humidity) in enumerate(zip(unpack_values(temperatures), unpack_values(humidities)))
+        if not (math.isnan(temperature) or math.isnan(humidity))
+    ]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
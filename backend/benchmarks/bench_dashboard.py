@@ -0,0 +1,102 @@
+"""`POST /dashboard` requests per second under concurrent clients, in process through httpx's ASGI transport.
+
+The database holds forecasts for every province capital and a national warning set. Requests pick capitals at
+random, so the cached run mostly serves the dashboard cache; the uncached run swaps in a cache that keeps
+nothing and builds every body from the database. No socket or server is involved, so the numbers are the
+application's own ceiling rather than what a deployment behind uvicorn would reach.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+import random
+import tempfile
+import time
+from typing import Any
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.core.database import Base, build_async_engine, build_engine, get_async_db
+from app.main import app
+from app.services import cache as dashboard_cache, spatial
+from app.services.cache import DashboardCache
+from app.storage.repository import WeatherRepository
+from benchmarks.bench_ingestion import locations
+from benchmarks.bench_repository import forecast_points, warning_set
+from benchmarks.results import metric, percentile
+from benchmarks.upstream import FIXTURES
+
+
+def _seed(settings: Settings, warning_count: int) -> None:
+    engine = build_engine(settings)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    payload = json.loads((FIXTURES / "openmeteo_forecast.json").read_text(encoding="utf-8"))
+    try:
+        repo = WeatherRepository(db)
+        repo.upsert_forecast(point for item in locations(31) for point in forecast_points(payload, item))
+        repo.upsert_warnings(warning_set(warning_count))
+    finally:
+        db.close()
+        engine.dispose()
+
+
+async def _load(concurrency: int, duration: float, seed: int) -> tuple[int, list[float]]:
+    capitals = locations(31)
+    rng = random.Random(seed)
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    transport = httpx.ASGITransport(app=app)
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            item = rng.choice(capitals)
+            started = time.perf_counter()
+            response = await client.post("/api/v1/dashboard", json={"lat": item.lat, "lon": item.lon})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return len(latencies), latencies
+
+
+def run(
+    concurrency: tuple[int, ...] = (1, 16, 64), duration: float = 3.0, warning_count: int = 500, seed: int = 0
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{Path(tmp) / 'bench.db'}")
+        _seed(settings, warning_count)
+        async_engine = build_async_engine(settings)
+        sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def override():
+            async with sessions() as db:
+                yield db
+
+        previous_cache, previous_locator = dashboard_cache._cache, spatial._locator
+        app.dependency_overrides[get_async_db] = override
+        try:
+            for mode in ("cached", "uncached"):
+                # Fresh cache and cell index, so neither carries state from another database.
+                dashboard_cache._cache = DashboardCache(
+                    Settings(dashboard_cache_max_entries=1024 if mode == "cached" else 0)
+                )
+                spatial._locator = spatial.ForecastLocator(settings)
+                for clients in concurrency:
+                    count, latencies = asyncio.run(_load(clients, duration, seed))
+                    prefix = f"dashboard.{mode}.{clients}_clients"
+                    results[f"{prefix}.requests_per_second"] = metric(count / duration, "1/s", "higher")
+                    results[f"{prefix}.p50_latency"] = metric(percentile(latencies, 0.5) * 1000, "ms")
+                    results[f"{prefix}.p95_latency"] = metric(percentile(latencies, 0.95) * 1000, "ms")
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+            dashboard_cache._cache, spatial._locator = previous_cache, previous_locator
+            asyncio.run(async_engine.dispose())
+    return results
@@ -0,0 +1,91 @@
+"""End-to-end ingestion cycles against the fake upstream.
+
+Each repeat starts from an empty database: the first cycle is cold (every page parsed, every bulletin sent to the
+AI stub), later cycles are warm (NMC answers 304 and AI results come from the cache), as in a running worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, Callable
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.core.database import Base, build_engine
+from app.core.http import HttpPool
+from app.services.ingestion import IngestionInput, IngestionService
+from app.services.locations import PROVINCE_CAPITALS
+from app.storage.repository import WeatherRepository
+from benchmarks.results import median, metric
+from benchmarks.upstream import FakeUpstream
+
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "nmc_openmeteo_ai": {"warning_provider": "nmc", "forecast_provider": "openmeteo", "ai_provider": "openai"},
+    "qweather": {"warning_provider": "qweather", "forecast_provider": "qweather"},
+}
+
+
+def locations(count: int) -> list[IngestionInput]:
+    """Province capitals first, then copies shifted by whole degrees so every location is its own grid cell."""
+    capitals = sorted(PROVINCE_CAPITALS.items())
+    result = []
+    for idx in range(count):
+        province, (label, lat, lon) = capitals[idx % len(capitals)]
+        shift = idx // len(capitals)
+        result.append(IngestionInput(lat=lat + shift * 0.5, lon=lon + shift * 0.5, province=province, label=label))
+    return result
+
+
+async def _cycles(
+    settings: Settings,
+    payloads: list[IngestionInput],
+    rounds: int,
+    inspect: Callable[[WeatherRepository], None] | None = None,
+) -> tuple[list[float], int]:
+    """Run `rounds` refresh cycles; `inspect` sees the repository before the throwaway database is dropped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(settings, f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        timings: list[float] = []
+        failed = 0
+        try:
+            async with HttpPool(settings) as http:
+                repository = WeatherRepository(db)
+                service = IngestionService(repository, settings=settings, http=http)
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    results = await service.arefresh_many(payloads)
+                    timings.append(time.perf_counter() - started)
+                    failed += sum(1 for result in results if not result.ok)
+                if inspect is not None:
+                    inspect(repository)
+        finally:
+            db.close()
+            engine.dispose()
+    return timings, failed
+
+
+def run(upstream: FakeUpstream, location_count: int = 31, rounds: int = 3, repeat: int = 3) -> dict[str, Any]:
+    payloads = locations(location_count)
+    results: dict[str, Any] = {}
+    for name, overrides in SCENARIOS.items():
+        settings = upstream.settings(**overrides)
+        cold: list[float] = []
+        warm: list[float] = []
+        failed = 0
+        for _ in range(repeat):
+            timings, cycle_failures = asyncio.run(_cycles(settings, payloads, rounds))
+            cold.append(timings[0])
+            warm.extend(timings[1:])
+            failed += cycle_failures
+        prefix = f"ingestion.{name}.{location_count}_locations"
+        results[f"{prefix}.cold_cycle"] = metric(median(cold), "s")
+        if warm:
+            results[f"{prefix}.warm_cycle"] = metric(median(warm), "s")
+        results[f"{prefix}.failed_locations"] = metric(failed / (repeat * rounds), "count")
+    return results
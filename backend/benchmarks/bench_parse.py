@@ -0,0 +1,55 @@
+"""Parse throughput of each provider over the recorded upstream responses, JSON decoding included."""
+
+from __future__ import annotations
+
+import json
+import timeit
+from typing import Any, Callable
+
+from app.providers.base import IngestionContext
+from app.providers.nmc_provider import _parse_bulletin
+from app.providers.openmeteo_provider import _parse_forecast as parse_openmeteo
+from app.providers.qweather_provider import _parse_forecast as parse_qweather_forecast
+from app.providers.qweather_provider import _parse_warnings as parse_qweather_warnings
+from app.services.ai_extractor import _message_json, _parse_item
+from app.services.html_text import extract_page
+from benchmarks.results import metric
+from benchmarks.upstream import FIXTURES
+
+CONTEXT = IngestionContext(lat=39.9, lon=116.4, province="北京", label="北京")
+
+
+def _per_second(func: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def run(repeat: int = 5) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for path in sorted(FIXTURES.glob("nmc_*.html")):
+        page = path.read_text(encoding="utf-8")
+
+        def nmc() -> None:
+            _parse_bulletin(extract_page(page, "text"), CONTEXT)
+
+        rate = _per_second(nmc, repeat)
+        results[f"parse.nmc.{path.stem}.pages_per_second"] = metric(rate, "1/s", "higher")
+        results[f"parse.nmc.{path.stem}.mb_per_second"] = metric(rate * path.stat().st_size / 1e6, "MB/s", "higher")
+
+    openmeteo = (FIXTURES / "openmeteo_forecast.json").read_bytes()
+    for step in (3, 1):
+        rate = _per_second(lambda: parse_openmeteo(json.loads(openmeteo), CONTEXT, step), repeat)
+        results[f"parse.openmeteo.step_{step}h.responses_per_second"] = metric(rate, "1/s", "higher")
+
+    warnings = (FIXTURES / "qweather_warning_now.json").read_bytes()
+    forecast = (FIXTURES / "qweather_weather_7d.json").read_bytes()
+    rate = _per_second(lambda: parse_qweather_warnings(json.loads(warnings), CONTEXT), repeat)
+    results["parse.qweather.warnings.responses_per_second"] = metric(rate, "1/s", "higher")
+    rate = _per_second(lambda: parse_qweather_forecast(json.loads(forecast), CONTEXT), repeat)
+    results["parse.qweather.forecast.responses_per_second"] = metric(rate, "1/s", "higher")
+
+    completion = (FIXTURES / "openai_chat_completion.json").read_bytes()
+    rate = _per_second(lambda: _parse_item(_message_json(json.loads(completion))), repeat)
+    results["parse.openai.completion.responses_per_second"] = metric(rate, "1/s", "higher")
+    return results
@@ -0,0 +1,116 @@
+"""Repository write throughput at growing location counts, on a file-backed SQLite database (WAL).
+
+Forecasts are written in batches of `batch` locations, as the scheduler claims a few jobs per tick; warnings are
+one complete national set per upsert. Each size is written twice: an insert pass and an update pass with every
+value changed, so both diff branches are measured. Building the provider's ForecastPoint objects is not timed;
+packing them into series is, since ingestion does it on the write path.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import json
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, Callable
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.core.database import Base, build_engine
+from app.models import ForecastPoint, WarningRecord
+from app.providers.base import IngestionContext
+from app.providers.openmeteo_provider import _parse_forecast
+from app.services.ingestion import IngestionInput
+from app.services.spatial import cell_key
+from app.storage.repository import WeatherRepository
+from app.storage.series import build_series
+from benchmarks.bench_ingestion import locations
+from benchmarks.results import metric
+from benchmarks.upstream import FIXTURES
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def forecast_points(payload: dict[str, Any], location: IngestionInput, shift: float = 0.0) -> list[ForecastPoint]:
+    """The recorded OpenMeteo run at `location` (3-hourly, as stored in rows mode), temperatures moved by `shift`."""
+    context = IngestionContext(lat=location.lat, lon=location.lon, province=location.province, label=location.label)
+    points = _parse_forecast(payload, context)
+    for point in points:
+        point.cell_key = cell_key(point.lat, point.lon, 0.1)
+        point.temperature_c += shift
+    return points
+
+
+def warning_set(count: int, shift: float = 0.0) -> list[WarningRecord]:
+    return [
+        WarningRecord(
+            source="NMC",
+            detail_url=f"https://nmc.test/{idx}.htm",
+            province=item.province,
+            issue_time=NOW,
+            title=f"{item.label}大风蓝色预警",
+            level="蓝色",
+            hazard_type="大风",
+            expires_at=NOW + timedelta(hours=12),
+            summary=f"{item.label}阵风 {6 + shift:.0f} 级",
+            confidence=0.8,
+        )
+        for idx, item in enumerate(locations(count))
+    ]
+
+
+def _timed(write: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    write()
+    return time.perf_counter() - started
+
+
+def _forecast_passes(repo: WeatherRepository, count: int, batch: int, series: bool) -> tuple[float, float, int]:
+    payload = json.loads((FIXTURES / "openmeteo_forecast.json").read_text(encoding="utf-8"))
+    payloads = locations(count)
+    elapsed = [0.0, 0.0]
+    rows = 0
+    for pass_idx in (0, 1):
+        for start in range(0, count, batch):
+            points = [
+                point
+                for item in payloads[start : start + batch]
+                for point in forecast_points(payload, item, pass_idx * 0.5)
+            ]
+            if pass_idx == 0:
+                rows += len(points)
+            if series:
+                elapsed[pass_idx] += _timed(lambda: repo.upsert_forecast_series(build_series(points)))
+            else:
+                elapsed[pass_idx] += _timed(lambda: repo.upsert_forecast(points))
+    return elapsed[0], elapsed[1], rows
+
+
+def run(sizes: tuple[int, ...] = (1, 100, 10_000), batch: int = 100) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for count in sizes:
+        for layout in ("rows", "series"):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = build_engine(Settings(), f"sqlite:///{Path(tmp) / 'bench.db'}")
+                Base.metadata.create_all(bind=engine)
+                db = sessionmaker(bind=engine)()
+                try:
+                    insert, update, rows = _forecast_passes(WeatherRepository(db), count, batch, layout == "series")
+                    if layout == "rows":
+                        first, second = warning_set(count), warning_set(count, 1)
+                        warning_insert = _timed(lambda: WeatherRepository(db).upsert_warnings(first))
+                        warning_update = _timed(lambda: WeatherRepository(db).upsert_warnings(second))
+                finally:
+                    db.close()
+                    engine.dispose()
+            prefix = f"repository.forecast_{layout}.{count}_locations"
+            results[f"{prefix}.insert_locations_per_second"] = metric(count / insert, "1/s", "higher")
+            results[f"{prefix}.update_locations_per_second"] = metric(count / update, "1/s", "higher")
+            if layout == "rows":
+                results[f"{prefix}.insert_rows_per_second"] = metric(rows / insert, "1/s", "higher")
+        prefix = f"repository.warnings.{count}_rows"
+        results[f"{prefix}.insert_rows_per_second"] = metric(count / warning_insert, "1/s", "higher")
+        results[f"{prefix}.update_rows_per_second"] = metric(count / warning_update, "1/s", "higher")
+    return results
@@ -0,0 +1,52 @@
+"""Micro-benchmark for NMC bulletin text extraction and keyword classification.
+
+Compares the whole-page regex chain `nmc_provider` used to run against `extract_page` (the same regex chain over
+the content element only), and times `_classify` on the extracted text.
+Run from `backend/`: python -m benchmarks.bench_text_match
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import timeit
+from pathlib import Path
+
+from app.providers.nmc_provider import _classify
+from app.services.html_text import extract_page
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def legacy_plain_text(html_text: str) -> str:
+    """The original four full-document passes, each producing a new copy of the page."""
+    no_script = re.sub(r"<script[^>]*>.*?</script>", " ", html_text, flags=re.IGNORECASE | re.DOTALL)
+    no_style = re.sub(r"<style[^>]*>.*?</style>", " ", no_script, flags=re.IGNORECASE | re.DOTALL)
+    stripped = html.unescape(re.sub(r"<[^>]+>", " ", no_style))
+    return re.sub(r"\s+", " ", stripped).strip()
+
+
+def region_plain_text(html_text: str) -> str:
+    return extract_page(html_text, "text").text
+
+
+def _best_us(func, text: str, number: int) -> float:
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    for path in sorted(FIXTURES.glob("nmc_*.html")):
+        page = path.read_text(encoding="utf-8")
+        number = 500
+        regex_chain = _best_us(legacy_plain_text, page, number)
+        region = _best_us(region_plain_text, page, number)
+        text = region_plain_text(page)
+        classify = _best_us(_classify, text, number)
+        print(f"{path.name}: {len(page)} chars of HTML, {len(text)} chars of bulletin text")
+        print(f"  legacy regex chain       : {regex_chain:8.1f} us")
+        print(f"  content-region extraction: {region:8.1f} us  ({regex_chain / region:.2f}x)")
+        print(f"  _classify                : {classify:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
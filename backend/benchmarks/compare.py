@@ -0,0 +1,60 @@
+"""Compare two saved benchmark runs; exits 1 when a metric regressed by more than the threshold.
+
+Run from `backend/`: python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 0.1]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+from typing import Any
+
+from benchmarks.results import load
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]], current: dict[str, dict[str, Any]], threshold: float
+) -> tuple[list[str], list[str]]:
+    """Report lines for every shared metric, and the names of those that regressed beyond `threshold`."""
+    lines: list[str] = []
+    regressions: list[str] = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name]["value"], current[name]["value"]
+        if before == 0:
+            continue
+        change = (after - before) / before
+        # Positive `worse` means the metric moved the wrong way for its direction.
+        worse = change if current[name]["better"] == "lower" else -change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif worse < -threshold:
+            flag = "  improved"
+        lines.append(f"{name}: {before:.3f} -> {after:.3f} {current[name]['unit']} ({change:+.1%}){flag}")
+    for name in sorted(baseline.keys() - current.keys()):
+        lines.append(f"{name}: only in baseline")
+    for name in sorted(current.keys() - baseline.keys()):
+        lines.append(f"{name}: new")
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    print(f"baseline {baseline['environment']['commit']} -> current {current['environment']['commit']}")
+    lines, regressions = compare(baseline["results"], current["results"], args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
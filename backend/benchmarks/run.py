@@ -0,0 +1,67 @@
+"""Run the benchmark suites and save the results as JSON.
+
+Run from `backend/`:
+    python -m benchmarks.run                      # full suite, results in benchmarks/results/
+    python -m benchmarks.run --quick --suites parse,repository
+    python -m benchmarks.run --latency-ms 80 --jitter-ms 40 --error-rate 0.05
+Compare two runs with `python -m benchmarks.compare`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Any
+
+from benchmarks import bench_dashboard, bench_ingestion, bench_parse, bench_repository
+from benchmarks.results import save
+from benchmarks.upstream import FakeUpstream
+
+SUITES = ("ingestion", "parse", "repository", "dashboard")
+
+
+def run(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    suites = args.suites.split(",") if args.suites else list(SUITES)
+    results: dict[str, dict[str, Any]] = {}
+    if "ingestion" in suites:
+        with FakeUpstream(args.latency_ms, args.jitter_ms, args.error_rate, args.seed) as upstream:
+            results.update(
+                bench_ingestion.run(upstream, location_count=args.locations, repeat=1 if args.quick else 3)
+            )
+    if "parse" in suites:
+        results.update(bench_parse.run(repeat=3 if args.quick else 5))
+    if "repository" in suites:
+        results.update(bench_repository.run(sizes=(1, 100, 1000) if args.quick else (1, 100, 10_000)))
+    if "dashboard" in suites:
+        results.update(
+            bench_dashboard.run(concurrency=(1, 16) if args.quick else (1, 16, 64), duration=1.0 if args.quick else 3.0)
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and smaller sizes, for a fast check")
+    parser.add_argument("--locations", type=int, default=31, help="locations per ingestion cycle")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake upstream latency per response")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="extra random latency, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests failing with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+    # Injected upstream failures would otherwise log one warning per request.
+    logging.basicConfig(level=logging.ERROR)
+
+    results = run(args)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = save(config, results, args.output)
+    width = max(len(name) for name in results)
+    for name, item in sorted(results.items()):
+        print(f"{name:<{width}}  {item['value']:>14.3f} {item['unit']}")
+    print(f"\nSaved to {path}")
+
+
+if __name__ == "__main__":
+    main()
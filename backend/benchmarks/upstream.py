@@ -0,0 +1,163 @@
+"""Local stand-in for every upstream the worker talks to, serving the recorded fixtures.
+
+Routes mirror the real APIs under one base URL, so pointing the provider settings at `FakeUpstream.settings()` is
+enough: `/nmc/<fixture>.html`, `/qweather/v7/{warning/now,weather/7d}`, `/openmeteo/v1/forecast` and
+`/openai/v1/chat/completions`. Every response waits `latency_ms` (plus up to `jitter_ms`), and a seeded
+`error_rate` fraction of requests answers 503 instead.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from app.core.config import Settings
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+_JSON_ROUTES = {
+    "/qweather/v7/warning/now": "qweather_warning_now.json",
+    "/qweather/v7/weather/7d": "qweather_weather_7d.json",
+    "/openmeteo/v1/forecast": "openmeteo_forecast.json",
+}
+_BATCH_ID = re.compile(r"^\[(\d+)\] ", re.MULTILINE)
+
+
+class FakeUpstream:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {path: (FIXTURES / name).read_bytes() for path, name in _JSON_ROUTES.items()}
+        self._pages = {f"/nmc/{path.name}": path.read_bytes() for path in sorted(FIXTURES.glob("nmc_*.html"))}
+        self._completion = json.loads((FIXTURES / "openai_chat_completion.json").read_text(encoding="utf-8"))
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("FakeUpstream is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def nmc_paths(self) -> list[str]:
+        """Request paths of the recorded NMC pages, as counted in `requests`."""
+        return list(self._pages)
+
+    @property
+    def nmc_urls(self) -> list[str]:
+        return [f"{self.base_url}{path}" for path in self.nmc_paths]
+
+    def settings(self, **overrides: Any) -> Settings:
+        """Settings with every provider base URL pointed at this server; `overrides` win."""
+        values: dict[str, Any] = {
+            "nmc_source_urls": ",".join(self.nmc_urls),
+            "qweather_api_base": f"{self.base_url}/qweather/v7",
+            "qweather_api_key": "benchmark",
+            "openmeteo_api_base": f"{self.base_url}/openmeteo/v1",
+            "openai_api_base": f"{self.base_url}/openai/v1",
+            "openai_api_key": "benchmark",
+            "ai_retry_base_seconds": 0.01,
+            "fallback_to_mock_on_failure": True,
+        }
+        values.update(overrides)
+        return Settings(**values)
+
+    def start(self) -> FakeUpstream:
+        handler = type("Handler", (_Handler,), {"upstream": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> FakeUpstream:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _delay_and_fail(self, path: str) -> bool:
+        with self._lock:
+            self.requests[path] += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay / 1000)
+        return failed
+
+    def _completion_for(self, request: dict[str, Any]) -> bytes:
+        # Batched prompts number each bulletin "[n] ..."; answer every id with the recorded extraction.
+        content = request["messages"][-1]["content"]
+        ids = [int(item) for item in _BATCH_ID.findall(content)]
+        answer = self._completion["choices"][0]["message"]["content"]
+        if ids:
+            item = json.loads(answer)
+            answer = json.dumps({"results": [{"id": idx, **item} for idx in ids]}, ensure_ascii=False)
+        choice = {**self._completion["choices"][0], "message": {"role": "assistant", "content": answer}}
+        body = {**self._completion, "choices": [choice]}
+        return json.dumps(body, ensure_ascii=False).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    upstream: FakeUpstream
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0]
+        if self.upstream._delay_and_fail(path):
+            self._send(503, b"injected failure", "text/plain")
+            return
+        if path in self.upstream._bodies:
+            self._send(200, self.upstream._bodies[path], "application/json")
+            return
+        page = self.upstream._pages.get(path)
+        if page is None:
+            self._send(404, b"not found", "text/plain")
+            return
+        etag = '"' + hashlib.sha1(page).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", "text/html", etag)
+            return
+        self._send(200, page, "text/html; charset=utf-8", etag)
+
+    def do_POST(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0]
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.upstream._delay_and_fail(path):
+            self._send(503, b"injected failure", "text/plain")
+            return
+        if path != "/openai/v1/chat/completions":
+            self._send(404, b"not found", "text/plain")
+            return
+        self._send(200, self.upstream._completion_for(request), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str, etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
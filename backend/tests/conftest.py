@@ -0,0 +1,55 @@
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import Settings
+from app.core.database import Base, build_async_engine, build_engine, get_async_db
+from app.main import app
+
+
+@pytest.fixture
+def session_factory() -> Iterator[sessionmaker[Session]]:
+    """Sessions sharing one in-memory SQLite database with every table created."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker[Session]) -> Iterator[Session]:
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def api_db(tmp_path) -> Iterator[Session]:
+    """A file-backed SQLite database: seeded through the returned sync session, served to async routes."""
+    url = f"sqlite:///{tmp_path / 'api.db'}"
+    settings = Settings(database_url=url)
+    engine = build_engine(settings)
+    Base.metadata.create_all(bind=engine)
+    async_engine = build_async_engine(settings)
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override() -> AsyncIterator[AsyncSession]:
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override
+    db = sessionmaker(bind=engine)()
+    try:
+        yield db
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        db.close()
+        engine.dispose()
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import Settings
+from app.core.http import HttpPool
+from app.models import AiExtractionCacheEntry
+from app.services.ai_extractor import AiExtractor, BulletinInput
+from app.storage.repository import WeatherRepository
+
+
+def _completion(content: dict) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(content, ensure_ascii=False)}}]})
+
+
+def test_identical_bulletins_are_served_from_the_cache(db) -> None:
+    repository = WeatherRepository(db)
+    settings = Settings(ai_provider="openai", openai_api_key="test", openai_api_base="https://llm.test/v1", ai_cache_max_entries=2)
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["messages"][-1]["content"])
+        return _completion({"summary": "广东暴雨", "level": "橙色", "hazard_type": "暴雨", "confidence": 0.9})
+
+    extractor = AiExtractor(settings, cache=repository)
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return [
+                await extractor.aextract_bulletin(source_url="https://nmc.test/a", title="预警", text=text, http=http)
+                for text in ("广东有暴雨", "广东有暴雨", "广西有大风", "海南有台风", "广东有暴雨")
+            ]
+
+    results = asyncio.run(run())
+
+    assert all(result is not None and result.level == "橙色" for result in results)
+    # The first bulletin was evicted as least recently used once the third distinct text arrived.
+    assert len(calls) == 4
+    assert (extractor.cache_stats.hits, extractor.cache_stats.misses) == (1, 4)
+    assert repository.db.scalar(select(func.count(AiExtractionCacheEntry.id))) == 2
+
+
+def test_short_bulletins_are_batched_and_throttled_requests_retried() -> None:
+    settings = Settings(
+        ai_provider="openai",
+        openai_api_key="test",
+        openai_api_base="https://llm.test/v1",
+        ai_batch_max_bulletins=2,
+        ai_retry_base_seconds=0,
+    )
+    batch_sizes: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][-1]["content"]
+        batch_sizes.append(content.count("source_url="))
+        if len(batch_sizes) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        if content.startswith("[0]"):
+            items = [{"id": idx, "summary": "批量", "level": "黄色", "hazard_type": "大风", "confidence": 0.8} for idx in range(2)]
+            return _completion({"results": items})
+        return _completion({"summary": "单条", "level": "红色", "hazard_type": "暴雨", "confidence": 0.9})
+
+    bulletins = [BulletinInput(f"https://nmc.test/{idx}", "预警", f"公告{idx}") for idx in range(3)]
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return await AiExtractor(settings).aextract_many(bulletins, http)
+
+    results = asyncio.run(run())
+
+    assert [result.summary for result in results] == ["批量", "批量", "单条"]
+    assert sorted(batch_sizes) == [1, 2, 2]
+
+
+def test_deadline_falls_back_to_keyword_results() -> None:
+    settings = Settings(ai_provider="openai", openai_api_key="test", ai_cycle_deadline_seconds=0.05)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        return _completion({"summary": "迟到", "level": "红色", "hazard_type": "暴雨", "confidence": 0.9})
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return await AiExtractor(settings).aextract_many([BulletinInput("https://nmc.test/a", "预警", "公告")], http)
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=2)) == [None]
+
+
+def test_extractors_share_one_token_budget_per_key() -> None:
+    settings = Settings(ai_provider="openai", openai_api_key="test", openai_api_base="https://budget.test/v1", ai_tokens_per_minute=6000)
+    first, second = AiExtractor(settings), AiExtractor(settings)
+    other = AiExtractor(settings.model_copy(update={"openai_api_key": "other"}))
+
+    async def run() -> tuple[float, float]:
+        await first._budget.acquire(6000)
+        started = time.monotonic()
+        await other._budget.acquire(50)
+        unthrottled = time.monotonic() - started
+        # A new extractor (as a new ingestion job builds) waits for the tokens the first one spent.
+        await second._budget.acquire(50)
+        return unthrottled, time.monotonic() - started
+
+    unthrottled, throttled = asyncio.run(run())
+
+    assert first._budget is second._budget and other._budget is not first._budget
+    assert unthrottled < 0.2 and throttled >= 0.4
@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.models import ForecastPoint, WarningRecord
+from benchmarks import bench_ingestion
+from benchmarks.compare import compare
+from benchmarks.results import metric
+from benchmarks.upstream import FakeUpstream
+
+
+def test_fake_upstream_drives_a_full_nmc_openmeteo_ai_cycle() -> None:
+    with FakeUpstream() as upstream:
+        settings = upstream.settings(**bench_ingestion.SCENARIOS["nmc_openmeteo_ai"])
+        timings, failed = asyncio.run(bench_ingestion._cycles(settings, bench_ingestion.locations(2), rounds=2))
+
+        assert len(timings) == 2 and failed == 0
+        # Each page is too long to share a batch, so the cold cycle sends one AI request per page; the warm cycle
+        # gets 304s and never reaches the AI stage.
+        assert upstream.requests["/openai/v1/chat/completions"] == len(upstream.nmc_paths)
+        assert upstream.requests["/openmeteo/v1/forecast"] == 4
+        assert all(upstream.requests[path] == 2 for path in upstream.nmc_paths)
+
+
+def test_injected_errors_fall_back_to_mock_data() -> None:
+    stored: dict[str, set[str]] = {}
+
+    def inspect(repository) -> None:
+        stored["warnings"] = set(repository.db.scalars(select(WarningRecord.source).distinct()))
+        stored["forecast"] = set(repository.db.scalars(select(ForecastPoint.source).distinct()))
+
+    with FakeUpstream(error_rate=1.0) as upstream:
+        settings = upstream.settings(**bench_ingestion.SCENARIOS["qweather"])
+        _, failed = asyncio.run(bench_ingestion._cycles(settings, bench_ingestion.locations(3), 1, inspect))
+
+    assert failed == 3
+    assert stored == {"warnings": {"MockScenario"}, "forecast": {"MockForecast"}}
+
+
+def test_compare_flags_regressions_by_direction() -> None:
+    baseline = {"a.seconds": metric(1.0, "s"), "b.rate": metric(100.0, "1/s", "higher"), "c.gone": metric(1.0, "s")}
+    current = {"a.seconds": metric(1.05, "s"), "b.rate": metric(80.0, "1/s", "higher"), "d.new": metric(1.0, "s")}
+
+    lines, regressions = compare(baseline, current, threshold=0.1)
+
+    assert regressions == ["b.rate"]
+    assert "c.gone: only in baseline" in lines and "d.new: new" in lines
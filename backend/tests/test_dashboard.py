@@ -0,0 +1,114 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import app
+from app.models import ForecastPoint, ProviderCircuit, WarningRecord
+from app.schemas import BatchDashboardResponse, DashboardResponse
+from app.services import serialization
+from app.services.cache import get_dashboard_cache
+from app.services.spatial import cell_key
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _seed(db) -> None:
+    db.add(
+        WarningRecord(
+            source="NMC",
+            title="暴雨预警",
+            level="橙色",
+            hazard_type="暴雨",
+            province="广东",
+            issue_time=NOW,
+            expires_at=NOW + timedelta(hours=6),
+            detail_url="https://nmc.test/a.htm",
+            summary="暴雨",
+            confidence=0.8,
+        )
+    )
+    for lat, lon, temperature in ((39.9, 116.4, 10.0), (23.1, 113.3, 28.0)):
+        db.add_all(
+            ForecastPoint(
+                lat=lat,
+                lon=lon,
+                cell_key=cell_key(lat, lon, 0.1),
+                location_label="测试",
+                province="测试",
+                forecast_time=NOW + timedelta(hours=h),
+                temperature_c=temperature,
+                humidity_pct=50.0,
+                source="MockForecast",
+            )
+            for h in range(3)
+        )
+    db.add(ProviderCircuit(circuit_key="forecast:openmeteo", state="open", failures=3, open_seconds=300))
+    db.commit()
+
+
+def test_batch_dashboard_shares_warnings_and_slices_forecasts(api_db) -> None:
+    _seed(api_db)
+    # New data version, so the process-wide forecast locator rebuilds against this database.
+    get_dashboard_cache().invalidate()
+    body = {
+        "locations": [
+            {"lat": 39.9042, "lon": 116.4074, "ref": "bj"},
+            {"lat": 23.1291, "lon": 113.2644, "ref": "gz"},
+            {"lat": 43.8, "lon": 87.6, "ref": "far"},
+        ]
+    }
+    client = TestClient(app)
+    res = client.post("/api/v1/dashboard/batch", json=body)
+    data = res.json()
+    lines = client.post("/api/v1/dashboard/batch", json=body, headers={"Accept": "application/x-ndjson"}).text.splitlines()
+
+    # Built from row tuples rather than the response model, so check it still matches the declared schema.
+    BatchDashboardResponse.model_validate_json(res.content)
+    assert [w["province"] for w in data["warnings"]] == ["广东"]
+    assert len(data["provinces"]) == 34
+    by_ref = {item["ref"]: item for item in data["locations"]}
+    assert [p["temperature_c"] for p in by_ref["bj"]["forecast_points"]] == [10.0] * 3
+    assert [p["temperature_c"] for p in by_ref["gz"]["forecast_points"]] == [28.0] * 3
+    assert by_ref["gz"]["province"] == "广东"
+    assert by_ref["far"]["forecast_points"] == []
+
+    records = [json.loads(line) for line in lines]
+    assert [record["type"] for record in records] == ["meta", "warning", "location", "location", "location"]
+    assert records[0]["provinces"] == data["provinces"]
+    assert records[0]["stale_sources"] == data["stale_sources"] == ["forecast:openmeteo"]
+    assert records[0]["refresh_interval_minutes"] == data["refresh_interval_minutes"]
+    assert data["refresh_interval_minutes"] == get_settings().warning_refresh_minutes
+    assert records[1]["item"] == data["warnings"][0]
+    assert [record["item"] for record in records[2:]] == data["locations"]
+
+
+def test_dashboard_serializes_rows_straight_to_response_json(api_db) -> None:
+    _seed(api_db)
+    get_dashboard_cache().invalidate()
+    res = TestClient(app).post("/api/v1/dashboard", json={"lat": 23.1291, "lon": 113.2644})
+
+    data = DashboardResponse.model_validate_json(res.content)
+    assert data.current_province == "广东"
+    assert data.provinces[0].name == "广东" and data.provinces[0].highlighted
+    assert sum(item.highlighted for item in data.provinces) == 1
+    assert [w.province for w in data.warnings] == ["广东"] and not data.warnings[0].is_ai_augmented
+    assert [p.temperature_c for p in data.forecast_points] == [28.0] * 3
+    assert data.stale_sources == ["forecast:openmeteo"]
+    assert data.refresh_interval_minutes == get_settings().warning_refresh_minutes
+    # SQLite hands back naive datetimes; they are stored as UTC and rendered as such.
+    assert res.json()["warnings"][0]["issue_time"] == NOW.isoformat().replace("+00:00", "Z")
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch) -> None:
+    value = {
+        "naive": datetime(2026, 10, 17, 8, 30),
+        "utc": NOW,
+        "beijing": datetime(2026, 10, 17, 8, 30, 0, 5, tzinfo=timezone(timedelta(hours=8))),
+        "text": "暴雨",
+        "rows": (1, 2.5, None, True),
+    }
+    fast = serialization.dumps(value)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(value) == fast
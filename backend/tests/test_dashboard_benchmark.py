@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+from app.api.routes import _dashboard_body
+from app.models import ForecastPoint, WarningRecord
+from app.schemas import LocationRequest
+from app.services.spatial import cell_key
+from app.services.province import PROVINCES
+from app.storage.repository import WeatherRepository
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+CELL = cell_key(39.9, 116.4, 0.1)
+# Best of several runs, in seconds; typically around 15 ms, well above that to stay stable on slow CI hosts.
+DASHBOARD_BODY_BUDGET_S = 0.25
+
+
+def _repository(db) -> WeatherRepository:
+    db.add_all(
+        WarningRecord(
+            source="NMC",
+            title=f"暴雨预警 {idx}",
+            level="橙色",
+            hazard_type="暴雨",
+            province=PROVINCES[idx % len(PROVINCES)].name,
+            issue_time=NOW - timedelta(minutes=idx),
+            expires_at=NOW + timedelta(hours=6),
+            detail_url=f"https://nmc.test/{idx}.htm",
+            summary="局地大暴雨，注意防范城乡积涝与山洪地质灾害。",
+            confidence=0.8,
+        )
+        for idx in range(1000)
+    )
+    db.add_all(
+        ForecastPoint(
+            lat=39.9,
+            lon=116.4,
+            cell_key=CELL,
+            location_label="北京",
+            province="北京",
+            forecast_time=NOW + timedelta(hours=3 * h),
+            temperature_c=20.0,
+            humidity_pct=50.0,
+            source="MockForecast",
+        )
+        for h in range(56)
+    )
+    db.commit()
+    return WeatherRepository(db)
+
+
+def test_dashboard_body_1k_warnings_56_points(db) -> None:
+    repo = _repository(db)
+    payload = LocationRequest(lat=39.9042, lon=116.4074, province="北京")
+
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        body = _dashboard_body(payload, repo, CELL)
+        timings.append(time.perf_counter() - started)
+
+    assert min(timings) < DASHBOARD_BODY_BUDGET_S
+    assert body.count(b'"source":"NMC"') == 1000
+    assert body.count(b'"forecast_time"') == 56
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.core.config import Settings
+from app.main import app
+from app.models import WarningRecord
+from app.services import cache as cache_module
+from app.services.cache import VERSION_KEY, DashboardCache
+from app.services.events import CHANNEL, WarningBroker
+
+
+class FakeRedis:
+    """Local stand-in for the handful of Redis commands the cache uses."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.published: list[bytes] = []
+
+    def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.data[key] = value
+
+    def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        assert channel == CHANNEL
+        self.published.append(message)
+
+
+def test_local_tier_evicts_least_recently_used() -> None:
+    cache = DashboardCache(Settings(dashboard_cache_max_entries=2))
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_local_entries_expire_without_redis(monkeypatch) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    cache = DashboardCache(Settings(dashboard_cache_local_ttl_seconds=30))
+    cache.set("a", b"1")
+
+    clock[0] += 29
+    assert cache.get("a") == b"1"
+    # A worker's invalidation never reaches this process, so the entry ages out instead.
+    clock[0] += 2
+    assert cache.get("a") is None
+
+
+def test_version_bump_from_another_process_invalidates_entries() -> None:
+    redis = FakeRedis()
+    settings = Settings(dashboard_cache_version_check_seconds=0)
+    api = DashboardCache(settings, redis_client=redis)
+    worker = DashboardCache(settings, redis_client=redis)
+
+    key = api.key("39.9042", "116.4074", "北京")
+    api.set(key, b"{}")
+    assert DashboardCache(settings, redis_client=redis).get(key) == b"{}"
+
+    worker.invalidate()
+
+    assert redis.get(VERSION_KEY) == b"1"
+    new_key = api.key("39.9042", "116.4074", "北京")
+    assert new_key != key
+    assert api.get(new_key) is None
+
+
+def test_reload_after_a_pushed_change_skips_the_stale_cached_dashboard(api_db, monkeypatch) -> None:
+    redis = FakeRedis()
+    settings = Settings(dashboard_cache_version_check_seconds=60)
+    api_cache = DashboardCache(settings, redis_client=redis)
+    monkeypatch.setattr(cache_module, "_cache", api_cache)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    row = {
+        "source": "NMC",
+        "detail_url": "https://nmc.test/a.htm",
+        "province": "广东",
+        "issue_time": now,
+        "title": "暴雨预警",
+        "level": "橙色",
+        "hazard_type": "暴雨",
+        "expires_at": now + timedelta(hours=6),
+        "summary": "暴雨",
+        "confidence": 0.8,
+    }
+    api_db.add(WarningRecord(**row))
+    api_db.commit()
+    client = TestClient(app)
+    body = {"lat": 23.1291, "lon": 113.2644}
+    assert [w["level"] for w in client.post("/api/v1/dashboard", json=body).json()["warnings"]] == ["橙色"]
+
+    # The worker commits, bumps the shared version, then publishes; the API process relays the change.
+    api_db.execute(update(WarningRecord).values(level="红色"))
+    api_db.commit()
+    DashboardCache(settings, redis_client=redis).invalidate()
+    WarningBroker(settings, redis_client=redis).publish([("updated", {**row, "level": "红色"})])
+    WarningBroker(settings, redis_client=redis, cache=api_cache)._relay(redis.published[0])
+
+    # The client reloads on the pushed event, well within the version check interval.
+    assert [w["level"] for w in client.post("/api/v1/dashboard", json=body).json()["warnings"]] == ["红色"]
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+from app.core.config import Settings
+from app.core.database import async_database_url, build_engine
+
+
+def test_sqlite_engine_uses_wal_and_busy_timeout(tmp_path) -> None:
+    engine = build_engine(Settings(sqlite_busy_timeout_ms=1234), f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert engine.pool.size() == Settings().db_pool_size
+
+
+def test_async_url_picks_async_drivers() -> None:
+    assert async_database_url("sqlite:///./weather.db") == "sqlite+aiosqlite:///./weather.db"
+    assert (
+        async_database_url("postgresql+psycopg://weather:secret@db:5432/weather")
+        == "postgresql+psycopg://weather:secret@db:5432/weather"
+    )
+    assert async_database_url("postgresql://weather:secret@db/weather") == "postgresql+psycopg://weather:secret@db/weather"
@@ -0,0 +1,65 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import Settings
+from app.services.events import WarningBroker
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _row(province: str, level: str = "黄色") -> dict:
+    return {
+        "source": "NMC",
+        "detail_url": "https://nmc.test/a.htm",
+        "province": province,
+        "issue_time": NOW,
+        "title": "暴雨预警",
+        "level": level,
+        "hazard_type": "暴雨",
+        "expires_at": NOW + timedelta(hours=6),
+        "summary": "暴雨",
+        "confidence": 0.8,
+    }
+
+
+def test_subscribers_receive_their_province_diff() -> None:
+    broker = WarningBroker(Settings(warning_stream_heartbeat_seconds=0.05))
+
+    async def run() -> tuple[list[bytes], list[bytes]]:
+        guangdong = broker.subscribe("广东")
+        everywhere = broker.subscribe()
+        assert await anext(guangdong) == await anext(everywhere) == b"retry: 5000\n\n"
+        broker.publish([("new", _row("广东")), ("updated", _row("广西", "橙色")), ("expired", _row("广东", "蓝色"))])
+        local = [await anext(guangdong), await anext(guangdong)]
+        national = [await anext(everywhere), await anext(everywhere)]
+        await guangdong.aclose()
+        await everywhere.aclose()
+        return local, national
+
+    local, national = asyncio.run(run())
+
+    assert local[1] == b": ping\n\n"
+    event, data = local[0].decode().strip().split("\n")
+    assert event == "event: warnings"
+    payload = json.loads(data.removeprefix("data: "))
+    assert payload["province"] == "广东"
+    assert [item["level"] for item in payload["new"]] == ["黄色"]
+    assert [item["level"] for item in payload["expired"]] == ["蓝色"]
+    assert payload["updated"] == []
+    assert sorted(json.loads(frame.decode().split("data: ")[1])["province"] for frame in national) == ["广东", "广西"]
+    assert broker._subscribers == set()
+
+
+def test_lagging_subscriber_is_told_to_resync() -> None:
+    broker = WarningBroker(Settings(warning_stream_queue_size=1))
+
+    async def run() -> list[bytes]:
+        stream = broker.subscribe()
+        await anext(stream)
+        broker.publish([("new", _row("广东"))])
+        broker.publish([("new", _row("广西"))])
+        await asyncio.sleep(0)
+        return [frame async for frame in stream]
+
+    assert asyncio.run(run()) == [b"event: resync\ndata: {}\n\n"]
@@ -0,0 +1,42 @@
+from app.services.geo import ProvinceResolver, get_province_resolver
+from app.services.locations import PROVINCE_CAPITALS
+
+
+def _square(x0: float, y0: float, x1: float, y1: float) -> list[list[float]]:
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+def test_polygon_holes_and_multipolygons() -> None:
+    resolver = ProvinceResolver.from_geojson(
+        {
+            "features": [
+                {
+                    "properties": {"name": "北京"},
+                    "geometry": {"type": "Polygon", "coordinates": [_square(0, 0, 10, 10), _square(4, 4, 6, 6)]},
+                },
+                {
+                    "properties": {"name": "南海诸岛"},
+                    "geometry": {"type": "MultiPolygon", "coordinates": [[_square(20, 0, 21, 1)], [_square(30, 0, 31, 1)]]},
+                },
+            ]
+        }
+    )
+    assert resolver.resolve(lat=2, lon=2) == "北京"
+    assert resolver.resolve(lat=5, lon=5) is None
+    assert resolver.resolve(lat=0.5, lon=30.5) == "海南"
+    assert resolver.resolve(lat=0.5, lon=25) is None
+    assert resolver.resolve(lat=10.02, lon=5) == "北京"
+
+
+def test_bundled_boundaries_resolve_capitals() -> None:
+    resolver = get_province_resolver()
+    assert resolver.resolve(39.9042, 116.4074) == "北京"
+    assert resolver.resolve(23.1291, 113.2644) == "广东"
+    assert resolver.resolve(43.8256, 87.6168) == "新疆"
+    assert resolver.resolve(35.0, 140.0) is None
+
+
+def test_every_capital_resolves_to_its_province() -> None:
+    resolver = get_province_resolver()
+    for province, (label, lat, lon) in PROVINCE_CAPITALS.items():
+        assert resolver.resolve(lat, lon) == province, label
@@ -1,6 +1,9 @@
+from datetime import datetime, timedelta, timezone
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.models import RefreshStatus
 
 
 def test_health() -> None:
@@ -8,3 +11,19 @@ def test_health() -> None:
     res = client.get("/api/v1/health")
     assert res.status_code == 200
     assert res.json()["status"] == "ok"
+
+
+def test_ready_reports_data_freshness(api_db) -> None:
+    client = TestClient(app)
+    assert client.get("/api/v1/ready").json()["status"] == "empty"
+
+    status = RefreshStatus(pipeline="ingestion", last_success_at=datetime.now(timezone.utc) - timedelta(days=1))
+    api_db.add(status)
+    api_db.commit()
+    assert client.get("/api/v1/ready").json()["status"] == "stale"
+
+    status.last_success_at = datetime.now(timezone.utc)
+    api_db.commit()
+    res = client.get("/api/v1/ready")
+    assert res.status_code == 200
+    assert res.json()["status"] == "fresh"
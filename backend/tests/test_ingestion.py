@@ -0,0 +1,332 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import Settings
+from app.core.http import HttpPool
+from app.models import (
+    ForecastPoint,
+    ForecastSeries,
+    ProviderCircuit,
+    RefreshStatus,
+    SourceFetchState,
+    WarningHistory,
+    WarningRecord,
+)
+from app.services.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.ingestion import IngestionInput, IngestionService, location_pipeline
+from app.services.locations import PROVINCE_CAPITALS, LocationRegistry
+from app.services.warning_merge import merge_warnings
+from app.storage.repository import WeatherRepository
+
+
+def test_refresh_many_covers_every_registered_location(db) -> None:
+    settings = Settings(warning_provider="mock", forecast_provider="mock", ingestion_max_concurrency=3)
+    repository = WeatherRepository(db)
+    repository.add_tracked_location(30.0, 120.0, "自选点", "浙江")
+
+    locations = LocationRegistry(repository, settings=settings).list_locations()
+    assert len(locations) == len(PROVINCE_CAPITALS) + 1
+
+    results = IngestionService(repository, settings=settings).refresh_many(locations)
+
+    assert all(result.ok for result in results)
+    cells = select(ForecastPoint.lat, ForecastPoint.lon).distinct().subquery()
+    assert db.scalar(select(func.count()).select_from(cells)) == len(locations)
+    statuses = set(db.scalars(select(RefreshStatus.pipeline)).all())
+    assert {location_pipeline(item) for item in locations} <= statuses
+    assert repository.get_last_refresh("ingestion") is not None
+
+
+def test_repeated_mock_refresh_writes_nothing(db) -> None:
+    settings = Settings(warning_provider="mock", forecast_provider="mock")
+    repository = WeatherRepository(db)
+    locations = LocationRegistry(repository, settings=settings).list_locations()
+    service = IngestionService(repository, settings=settings)
+    service.refresh_many(locations)
+    first = service.last_warning_upsert
+
+    service.refresh_many(locations)
+    second = service.last_warning_upsert
+
+    assert first.inserted > 0
+    assert (second.inserted, second.updated, second.deleted, second.changes) == (0, 0, 0, [])
+    assert db.scalar(select(func.count()).select_from(WarningHistory)) == 0
+
+
+def test_unchanged_nmc_pages_reuse_previous_records(db) -> None:
+    settings = Settings(
+        warning_provider="nmc",
+        forecast_provider="mock",
+        nmc_source_urls="https://nmc.test/a.htm,https://nmc.test/b.htm",
+    )
+    page = "<html><head><title>暴雨预警</title></head><body><div id='text'>广东有暴雨。</div></body></html>"
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/a.htm":
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, headers={"etag": '"v1"'}, text=page)
+        # b.htm ignores validators; its text does not change.
+        return httpx.Response(200, text=page)
+
+    location = IngestionInput(lat=23.13, lon=113.26, province="广东", label="广州")
+
+    async def run() -> list[int]:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            service = IngestionService(WeatherRepository(db), settings=settings, http=http)
+            await service.arefresh_many([location])
+            first = sorted(db.scalars(select(WarningRecord.id)).all())
+            requests.clear()
+            await service.arefresh_many([location])
+            assert sorted(db.scalars(select(WarningRecord.id)).all()) == first
+            return first
+
+    assert len(asyncio.run(run())) == 2
+    conditional = {request.url.path: request.headers.get("if-none-match") for request in requests}
+    assert conditional == {"/a.htm": '"v1"', "/b.htm": None}
+
+
+def test_fetch_state_is_saved_only_with_its_warnings(db) -> None:
+    settings = Settings(warning_provider="nmc", forecast_provider="mock", nmc_source_urls="https://nmc.test/a.htm")
+    page = "<html><head><title>暴雨预警</title></head><body><div id='text'>广东有暴雨。</div></body></html>"
+    conditional: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        conditional.append(request.headers.get("if-none-match"))
+        return httpx.Response(200, headers={"etag": '"v1"'}, text=page)
+
+    class FailingRepository(WeatherRepository):
+        def upsert_warnings(self, *args, **kwargs):
+            raise RuntimeError("disk full")
+
+    location = IngestionInput(lat=23.13, lon=113.26, province="广东", label="广州")
+
+    async def run() -> None:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            with pytest.raises(RuntimeError):
+                await IngestionService(FailingRepository(db), settings=settings, http=http).arefresh_many([location])
+            assert db.scalar(select(func.count()).select_from(SourceFetchState)) == 0
+            await IngestionService(WeatherRepository(db), settings=settings, http=http).arefresh_many([location])
+
+    asyncio.run(run())
+
+    # Validators were not kept for the lost write, so the retry downloads the page again.
+    assert conditional == [None, None]
+    assert db.scalar(select(SourceFetchState.etag)) == '"v1"'
+    assert db.scalar(select(func.count()).select_from(WarningRecord)) == 1
+
+
+def test_series_storage_keeps_full_hourly_openmeteo_run(db) -> None:
+    settings = Settings(warning_provider="mock", forecast_provider="openmeteo", forecast_storage="series")
+    hours = 24 * 7
+    payload = {
+        "hourly": {
+            "time": [f"2026-10-{17 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)],
+            "temperature_2m": [20.0 + (h % 24) / 10 for h in range(hours)],
+            "relative_humidity_2m": [60.0] * hours,
+        }
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=payload)
+
+    locations = [
+        IngestionInput(lat=39.9042, lon=116.4074, province="北京", label="北京"),
+        IngestionInput(lat=23.1291, lon=113.2644, province="广东", label="广州"),
+    ]
+
+    async def run() -> None:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            await IngestionService(WeatherRepository(db), settings=settings, http=http).arefresh_many(locations)
+
+    asyncio.run(run())
+
+    assert db.scalar(select(func.count()).select_from(ForecastPoint)) == 0
+    assert db.scalar(select(func.count()).select_from(ForecastSeries)) == 2
+    repository = WeatherRepository(db)
+    cell = repository.list_forecast_cells()[0][0]
+    series = repository.list_forecast_rows(cell)
+    assert len(series) == hours
+    assert series[1].forecast_time - series[0].forecast_time == timedelta(hours=1)
+    assert [point.temperature_c for point in series[:3]] == [20.0, 20.1, 20.2]
+
+
+def test_circuit_breaker_opens_probes_once_and_backs_off() -> None:
+    settings = Settings(circuit_failure_threshold=2, circuit_open_seconds=60, circuit_max_open_seconds=150)
+    now = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    breaker = CircuitBreaker(key="warning:nmc")
+
+    breaker.record_failure("timeout", now, settings)
+    assert breaker.state == CLOSED and breaker.allow(now)
+    breaker.record_failure("timeout", now, settings)
+    assert breaker.state == OPEN and not breaker.allow(now + timedelta(seconds=59))
+
+    later = now + timedelta(seconds=60)
+    assert breaker.allow(later) and breaker.state == HALF_OPEN
+    assert not breaker.allow(later)
+    breaker.record_failure("timeout", later, settings)
+    assert breaker.open_seconds == 120 and breaker.open_until == later + timedelta(seconds=120)
+
+    breaker.state = HALF_OPEN
+    breaker.record_failure("timeout", later, settings)
+    assert breaker.open_seconds == 150
+
+    breaker.state = HALF_OPEN
+    breaker.record_success(later)
+    assert breaker.state == CLOSED and breaker.failures == 0 and not breaker.stale
+
+
+def test_failing_provider_keeps_last_known_good_warnings_and_opens_circuit(db) -> None:
+    settings = Settings(
+        warning_provider="nmc",
+        forecast_provider="mock",
+        nmc_source_urls="https://nmc.test/a.htm",
+        circuit_failure_threshold=2,
+    )
+    page = "<html><head><title>暴雨预警</title></head><body><div id='text'>广东有暴雨。</div></body></html>"
+    upstream = {"up": True, "requests": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream["requests"] += 1
+        if upstream["up"]:
+            return httpx.Response(200, text=page)
+        return httpx.Response(503)
+
+    location = IngestionInput(lat=23.13, lon=113.26, province="广东", label="广州")
+
+    async def run() -> None:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            service = IngestionService(WeatherRepository(db), settings=settings, http=http)
+            await service.arefresh_many([location])
+            upstream["up"] = False
+            await service.arefresh_many([location])
+            await service.arefresh_many([location])
+            upstream["requests"] = 0
+            await service.arefresh_many([location])
+
+    asyncio.run(run())
+
+    # Neither demo warnings nor an empty set replaced the real ones, and the open circuit made no request.
+    assert [row.source for row in db.scalars(select(WarningRecord))] == ["NMC"]
+    assert upstream["requests"] == 0
+    circuit = db.scalar(select(ProviderCircuit).where(ProviderCircuit.circuit_key == "warning:nmc"))
+    assert circuit.state == OPEN and circuit.failures == 2 and circuit.last_success_at is not None
+    assert WeatherRepository(db).list_stale_sources() == ["warning:nmc"]
+
+
+def _warning(source: str, province: str, level: str, confidence: float, issued: datetime) -> WarningRecord:
+    return WarningRecord(
+        source=source,
+        title=f"{province}暴雨预警",
+        level=level,
+        hazard_type="暴雨",
+        province=province,
+        issue_time=issued,
+        expires_at=issued + timedelta(hours=12),
+        detail_url=f"https://{source}.test/{province}",
+        summary="暴雨",
+        confidence=confidence,
+    )
+
+
+def test_merge_warnings_keeps_most_confident_overlapping_copy() -> None:
+    now = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    nmc = [_warning("NMC", "广东", "蓝色", 0.75, now), _warning("NMC", "广西", "蓝色", 0.75, now)]
+    qweather = [
+        _warning("QWeather", "广东", "蓝色", 1.0, now + timedelta(hours=2)),
+        _warning("QWeather", "广西", "黄色", 1.0, now),
+        _warning("QWeather", "广西", "蓝色", 1.0, now + timedelta(hours=13)),
+    ]
+
+    kept, dropped = merge_warnings([nmc, qweather])
+
+    assert sorted((w.source, w.province, w.level) for w in kept) == [
+        ("NMC", "广西", "蓝色"),
+        ("QWeather", "广东", "蓝色"),
+        ("QWeather", "广西", "蓝色"),
+        ("QWeather", "广西", "黄色"),
+    ]
+    assert [(w.source, w.province) for w in dropped] == [("NMC", "广东")]
+
+
+def test_warning_sources_fan_out_merge_and_drop_the_slow_one_at_the_deadline(db) -> None:
+    settings = Settings(
+        warning_provider="nmc,qweather",
+        forecast_provider="mock",
+        nmc_source_urls="https://nmc.test/a.htm",
+        qweather_api_base="https://qweather.test/v7",
+        qweather_api_key="test",
+        warning_source_deadline_seconds=0.5,
+    )
+    page = "<html><head><title>暴雨预警</title></head><body><div id='text'>广东有暴雨。</div></body></html>"
+    qweather = {"delay": 0.0}
+    nmc_statuses: list[int] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "nmc.test":
+            status = 304 if request.headers.get("if-none-match") == '"v1"' else 200
+            nmc_statuses.append(status)
+            return httpx.Response(status, text=page if status == 200 else "", headers={"ETag": '"v1"'})
+        await asyncio.sleep(qweather["delay"])
+        pub_time = datetime.now(timezone.utc).isoformat()
+        body = {"warning": [{"pubTime": pub_time, "title": "暴雨蓝色预警", "severityColor": "Blue", "typeName": "暴雨"}]}
+        return httpx.Response(200, json=body)
+
+    location = IngestionInput(lat=23.13, lon=113.26, province="广东", label="广州")
+
+    async def cycles() -> tuple[list, list]:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            service = IngestionService(WeatherRepository(db), settings=settings, http=http)
+            merged = await service.arefresh_many([location], forecast=False)
+            # The NMC copy lost the merge: hidden from reads, but its page keeps its validators.
+            assert [row.source for row in service.repository.list_warnings(None)] == ["QWeather"]
+            assert db.scalar(select(WarningRecord.superseded).where(WarningRecord.source == "NMC")) is True
+            assert db.scalar(select(func.count()).select_from(SourceFetchState)) == 1
+            qweather["delay"] = 5.0
+            return merged, await service.arefresh_many([location], forecast=False)
+
+    merged, slow = asyncio.run(cycles())
+
+    assert merged[0].ok
+    assert "qweather" in slow[0].error and "deadline" in slow[0].error
+    # The 304 hands back the superseded NMC record, which wins now that QWeather is carried forward as it was.
+    assert nmc_statuses == [200, 304]
+    assert sorted(row.source for row in WeatherRepository(db).list_warnings(None)) == ["NMC", "QWeather"]
+    # A deadline drop is not an upstream failure, so the circuit is untouched.
+    assert db.scalar(select(ProviderCircuit.failures).where(ProviderCircuit.circuit_key == "warning:qweather")) == 0
+
+
+def test_warning_deadline_excludes_time_queued_behind_other_locations(db) -> None:
+    settings = Settings(
+        warning_provider="qweather",
+        forecast_provider="mock",
+        qweather_api_base="https://qweather.test/v7",
+        qweather_api_key="test",
+        ingestion_max_concurrency=2,
+        warning_source_deadline_seconds=0.3,
+    )
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"warning": []})
+
+    # Twelve locations two at a time queue for about 0.6s, twice the per-call deadline.
+    locations = [
+        IngestionInput(lat=20.0 + idx, lon=110.0, province="广东", label=f"点{idx}") for idx in range(12)
+    ]
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return await IngestionService(WeatherRepository(db), settings=settings, http=http).arefresh_many(
+                locations, forecast=False
+            )
+
+    assert all(result.ok for result in asyncio.run(run()))
+    circuit = db.scalar(select(ProviderCircuit).where(ProviderCircuit.circuit_key == "warning:qweather"))
+    assert (circuit.state, circuit.failures) == (CLOSED, 0)
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import Settings
+from app.main import app
+from app.services.ingestion import IngestionInput, IngestionService
+from app.storage.repository import WeatherRepository
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_dashboard_request_is_timed_by_route_and_stage(api_db) -> None:
+    client = TestClient(app)
+    labels = {"method": "POST", "route": "dashboard", "status": "200"}
+    before = _sample("weather_api_request_seconds_count", **labels)
+    serialized = _sample("weather_api_stage_seconds_count", endpoint="dashboard", stage="serialize")
+
+    # A location far from the cached ones, so the body is built rather than served from the cache.
+    assert client.post("/api/v1/dashboard", json={"lat": 21.3, "lon": 79.1}).status_code == 200
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "weather_api_request_seconds_bucket" in res.text
+    assert _sample("weather_api_request_seconds_count", **labels) == before + 1
+    assert _sample("weather_api_stage_seconds_count", endpoint="dashboard", stage="serialize") == serialized + 1
+    assert _sample("weather_api_request_seconds_count", method="GET", route="metrics", status="200") == 0
+
+
+def test_ingestion_cycle_records_fetch_and_write_metrics(db) -> None:
+    repository = WeatherRepository(db)
+    settings = Settings(warning_provider="mock", forecast_provider="mock")
+    fetches = _sample("weather_provider_fetch_seconds_count", kind="forecast", provider="mock", outcome="ok")
+    writes = _sample("weather_db_write_seconds_count", table="forecast_points")
+    inserted = _sample("weather_db_rows_written_total", table="forecast_points", op="inserted")
+
+    [result] = IngestionService(repository, settings=settings).refresh_many(
+        [IngestionInput(lat=39.9042, lon=116.4074, province="北京", label="北京")]
+    )
+
+    assert _sample("weather_provider_fetch_seconds_count", kind="forecast", provider="mock", outcome="ok") == fetches + 1
+    assert _sample("weather_db_write_seconds_count", table="forecast_points") == writes + 1
+    assert _sample("weather_db_rows_written_total", table="forecast_points", op="inserted") == inserted + result.forecast_points
+    assert _sample("weather_ingestion_stage_seconds_count", stage="write") > 0
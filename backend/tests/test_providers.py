@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from app.core.config import Settings
+from app.core.http import HttpPool
+from app.providers.base import IngestionContext
+from app.providers.nmc_provider import NmcBulletinWarningProvider
+
+CONTEXT = IngestionContext(lat=39.9042, lon=116.4074, province="北京", label="北京")
+
+BULLETIN = """<html><head><title>暴雨蓝色预警</title><style>.a{}</style></head>
+<body><p>广东、广西部分地区有暴雨，局地大暴雨。</p></body></html>"""
+
+
+def test_nmc_fetches_all_sources_through_shared_pool() -> None:
+    settings = Settings(nmc_source_urls="https://nmc.test/a.htm,https://nmc.test/b.htm")
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, text=BULLETIN)
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return await NmcBulletinWarningProvider(settings).afetch_warnings(CONTEXT, http)
+
+    rows = asyncio.run(run())
+
+    assert sorted(seen) == ["https://nmc.test/a.htm", "https://nmc.test/b.htm"]
+    assert {(row.detail_url, row.province) for row in rows} == {
+        ("https://nmc.test/a.htm", "广东"),
+        ("https://nmc.test/a.htm", "广西"),
+        ("https://nmc.test/b.htm", "广东"),
+        ("https://nmc.test/b.htm", "广西"),
+    }
+    assert all(row.hazard_type == "暴雨" and row.level == "蓝色" for row in rows)
+
+
+def test_nmc_reads_only_the_content_region() -> None:
+    settings = Settings(nmc_source_urls="https://nmc.test/a.htm")
+    page = (
+        "<html><head><title>暴雨预警</title><style>li { color: red }</style></head><body>"
+        "<ul class='nav'><li>北京</li><li>天津</li></ul>"
+        "<div id='text'><div class='lead'><p>四川、重庆有暴雨，发布暴雨橙色预警。</p></div>"
+        "<table><tr><td>四川</td><td>暴雨</td><td>橙色</td></tr>"
+        "<tr><td>重庆</td><td>大风</td><td>蓝色</td></tr></table></div>"
+        "<div class='footer'>湖北 &copy; 版权所有</div></body></html>"
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, text=page)
+
+    async def run() -> list:
+        async with HttpPool(settings, transport=httpx.MockTransport(handler)) as http:
+            return await NmcBulletinWarningProvider(settings).afetch_warnings(CONTEXT, http)
+
+    rows = asyncio.run(run())
+
+    assert {row.title for row in rows} == {"暴雨预警"}
+    assert {(row.province, row.hazard_type, row.level) for row in rows} == {
+        ("四川", "暴雨", "橙色"),
+        ("重庆", "大风", "蓝色"),
+    }
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.models import ForecastHistory, ForecastPoint, ForecastSeries, WarningHistory, WarningRecord
+from app.services.spatial import cell_key
+from app.storage.repository import WeatherRepository
+from app.storage.series import build_series, decode_series
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _warning(
+    province: str, level: str = "黄色", expires_in: timedelta = timedelta(hours=12), source: str = "NMC"
+) -> WarningRecord:
+    return WarningRecord(
+        source=source,
+        title="暴雨预警",
+        level=level,
+        hazard_type="暴雨",
+        province=province,
+        issue_time=NOW,
+        expires_at=NOW + expires_in,
+        detail_url="https://nmc.test/a.htm",
+        summary="暴雨",
+        confidence=0.75,
+    )
+
+
+def _forecast(lat: float, lon: float, hours: int, temperature: float = 20.0) -> list[ForecastPoint]:
+    return [
+        ForecastPoint(
+            lat=lat,
+            lon=lon,
+            cell_key=cell_key(lat, lon, 0.1),
+            location_label="测试",
+            province="北京",
+            forecast_time=NOW + timedelta(hours=h),
+            temperature_c=temperature,
+            humidity_pct=50.0,
+            source="MockForecast",
+        )
+        for h in range(hours)
+    ]
+
+
+def test_upsert_warnings_writes_only_changes(db) -> None:
+    repo = WeatherRepository(db)
+    first = repo.upsert_warnings([_warning("广东"), _warning("广西")])
+    assert (first.inserted, first.updated, first.deleted) == (2, 0, 0)
+
+    unchanged = repo.upsert_warnings([_warning("广东"), _warning("广西")])
+    assert (unchanged.inserted, unchanged.updated) == (0, 0)
+
+    changed = repo.upsert_warnings([_warning("广东", level="橙色"), _warning("福建")])
+    assert (changed.inserted, changed.updated, changed.deleted) == (1, 1, 1)
+    rows = {row.province: row.level for row in repo.list_warnings(None)}
+    assert rows == {"广东": "橙色", "福建": "黄色"}
+    changes = sorted((kind, row["province"]) for kind, row in changed.changes)
+    assert changes == [("expired", "广西"), ("new", "福建"), ("updated", "广东")]
+    assert unchanged.changes == []
+    assert [row.province for row in repo.db.scalars(select(WarningHistory))] == ["广西"]
+
+
+def test_upsert_warnings_drops_expired_rows(db) -> None:
+    repo = WeatherRepository(db)
+    repo.upsert_warnings([_warning("广东"), _warning("广西", expires_in=timedelta(hours=-1))])
+    assert [row.province for row in repo.list_warnings(None)] == ["广东"]
+
+
+def test_upsert_warnings_keeps_rows_of_failed_provinces(db) -> None:
+    repo = WeatherRepository(db)
+    repo.upsert_warnings([_warning("广东"), _warning("广西"), _warning("广西", source="QWeather")])
+
+    result = repo.upsert_warnings([_warning("广东"), _warning("广西")], keep_provinces={("QWeather", "广西")})
+    assert (result.inserted, result.updated, result.deleted, result.changes) == (0, 0, 0, [])
+
+    # Only the failed source is carried forward; the other source's missing rows still expire.
+    result = repo.upsert_warnings([_warning("广东")], keep_provinces={("QWeather", "广西")})
+    assert [(kind, row["source"], row["province"]) for kind, row in result.changes] == [("expired", "NMC", "广西")]
+    rows = sorted((row.source, row.province) for row in repo.list_warnings(None))
+    assert rows == [("NMC", "广东"), ("QWeather", "广西")]
+
+
+def test_upsert_forecast_keeps_other_locations(db) -> None:
+    repo = WeatherRepository(db)
+    repo.upsert_forecast(_forecast(39.9, 116.4, 6) + _forecast(31.2, 121.5, 6))
+
+    result = repo.upsert_forecast(_forecast(39.9, 116.4, 4, temperature=21.0))
+
+    assert (result.inserted, result.updated, result.deleted) == (0, 4, 2)
+    assert len(repo.list_forecast(cell_key(31.2, 121.5, 0.1))) == 6
+    assert [row.temperature_c for row in repo.list_forecast(cell_key(39.9, 116.4, 0.1))] == [21.0] * 4
+    assert repo.db.scalar(select(func.count()).select_from(ForecastPoint)) == 10
+    # The replaced run of the refreshed location is archived whole; the untouched location is not.
+    (archived,) = repo.db.scalars(select(ForecastHistory)).all()
+    assert (archived.lat, archived.count) == (39.9, 6)
+    points = decode_series(archived.start_time, archived.step_seconds, archived.temperatures, archived.humidities)
+    assert [point.temperature_c for point in points] == [20.0] * 6
+
+
+def test_list_warnings_filters_and_pages_by_keyset(db) -> None:
+    repo = WeatherRepository(db)
+    rows = []
+    for idx, province in enumerate(["广东", "广东", "广西", "广东", "广东"]):
+        row = _warning(province)
+        row.issue_time = NOW - timedelta(hours=idx)
+        rows.append(row)
+    repo.upsert_warnings(rows)
+
+    first = repo.list_warnings("广东", active_at=NOW, limit=2)
+    last = first[-1]
+    second = repo.list_warnings("广东", active_at=NOW, after=(last.issue_time, last.id), limit=2)
+
+    pages = [row.issue_time.replace(tzinfo=timezone.utc) for row in first + second]
+    assert pages == [NOW - timedelta(hours=idx) for idx in (0, 1, 3, 4)]
+    assert repo.list_warnings("广东", active_at=NOW + timedelta(days=1)) == []
+
+
+def test_forecast_series_round_trips_and_replaces_point_rows(db) -> None:
+    repo = WeatherRepository(db)
+    points = _forecast(39.9, 116.4, 6)
+    del points[2]
+    repo.upsert_forecast(_forecast(39.9, 116.4, 6))
+
+    first = repo.upsert_forecast_series(build_series(points))
+    again = repo.upsert_forecast_series(build_series(points))
+
+    assert (first.inserted, first.deleted) == (1, 6)
+    assert (again.inserted, again.updated, again.deleted) == (0, 0, 0)
+    assert repo.db.scalar(select(func.count()).select_from(ForecastPoint)) == 0
+    cell = cell_key(39.9, 116.4, 0.1)
+    series = repo.list_forecast_rows(cell)
+    assert [point.forecast_time for point in series] == [point.forecast_time for point in points]
+    assert [point.temperature_c for point in series] == [20.0] * 5
+    assert repo.list_forecast_cells() == [(cell, 39.9, 116.4)]
+
+    repo.upsert_forecast(_forecast(39.9, 116.4, 2, temperature=18.5))
+    assert repo.db.scalar(select(func.count()).select_from(ForecastSeries)) == 0
+    assert [point.temperature_c for point in repo.list_forecast_rows(cell)] == [18.5, 18.5]
+    # The point run replaced by the series, and the series replaced by points again; the unchanged rewrite adds none.
+    assert [row.count for row in repo.db.scalars(select(ForecastHistory).order_by(ForecastHistory.id))] == [6, 6]
+
+
+def test_forecast_series_archives_the_replaced_run(db) -> None:
+    repo = WeatherRepository(db)
+    repo.upsert_forecast_series(build_series(_forecast(39.9, 116.4, 6) + _forecast(31.2, 121.5, 6)))
+
+    result = repo.upsert_forecast_series(build_series(_forecast(39.9, 116.4, 6, temperature=22.0)))
+
+    assert (result.inserted, result.updated, result.deleted) == (0, 1, 0)
+    (archived,) = repo.db.scalars(select(ForecastHistory)).all()
+    assert (archived.lat, archived.archive_day) == (39.9, datetime.now(timezone.utc).date())
+    points = decode_series(archived.start_time, archived.step_seconds, archived.temperatures, archived.humidities)
+    assert [point.temperature_c for point in points] == [20.0] * 6
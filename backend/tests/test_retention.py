@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.core.database import Base, build_engine
+from app.models import ForecastHistory, ForecastPoint, ForecastSeries, WarningHistory, WarningRecord
+from app.services.retention import RetentionService
+from app.services.spatial import cell_key
+from app.storage.repository import SERIES_KEY, SERIES_VALUES, WeatherRepository
+from app.storage.series import build_series
+
+NOW = datetime(2026, 10, 17, 12, tzinfo=timezone.utc)
+
+
+def _warning(province: str, expires_in: timedelta) -> WarningRecord:
+    return WarningRecord(
+        source="NMC",
+        title="暴雨预警",
+        level="黄色",
+        hazard_type="暴雨",
+        province=province,
+        issue_time=NOW - timedelta(hours=12),
+        expires_at=NOW + expires_in,
+        detail_url="https://nmc.test/a.htm",
+        summary="暴雨",
+        confidence=0.75,
+    )
+
+
+def _forecast(lat: float, start: datetime, hours: int) -> list[ForecastPoint]:
+    return [
+        ForecastPoint(
+            lat=lat,
+            lon=116.4,
+            cell_key=cell_key(lat, 116.4, 0.1),
+            location_label="测试",
+            province="北京",
+            forecast_time=start + timedelta(hours=h),
+            temperature_c=20.0,
+            humidity_pct=50.0,
+            source="MockForecast",
+        )
+        for h in range(hours)
+    ]
+
+
+def test_retention_archives_expired_warnings_prunes_history_and_old_forecasts(tmp_path) -> None:
+    settings = Settings(
+        database_url=f"sqlite:///{tmp_path / 'retention.db'}",
+        warning_history_days=30,
+        forecast_retention_hours=24,
+        forecast_history_days=7,
+        sqlite_vacuum_free_ratio=0.0,
+    )
+    engine = build_engine(settings)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([_warning("广东", timedelta(hours=6)), _warning("广西", timedelta(hours=-1))])
+    db.add(
+        WarningHistory(
+            archive_day=date(2026, 9, 1),
+            archived_at=NOW - timedelta(days=46),
+            source="NMC",
+            title="暴雨预警",
+            level="黄色",
+            hazard_type="暴雨",
+            province="福建",
+            issue_time=NOW - timedelta(days=47),
+            detail_url="https://nmc.test/old.htm",
+            summary="暴雨",
+            confidence=0.75,
+        )
+    )
+    db.add_all(_forecast(39.9, NOW - timedelta(hours=30), 12) + _forecast(40.9, NOW - timedelta(hours=1), 12))
+    old_run = build_series(_forecast(42.9, NOW - timedelta(days=20), 6))[0]
+    columns = {name: getattr(old_run, name) for name in SERIES_KEY + SERIES_VALUES}
+    db.add(ForecastHistory(archive_day=date(2026, 9, 27), archived_at=NOW - timedelta(days=20), **columns))
+    db.commit()
+    repository = WeatherRepository(db)
+    # One series that ended two days ago, as a location dropped from ingestion would leave behind.
+    repository.upsert_forecast_series(build_series(_forecast(41.9, NOW - timedelta(days=3), 24)))
+
+    result = RetentionService(repository, settings=settings).run(NOW)
+
+    assert (result.archived_warnings, result.pruned_history) == (1, 1)
+    assert [row.province for row in db.scalars(select(WarningRecord))] == ["广东"]
+    assert [row.province for row in db.scalars(select(WarningHistory))] == ["广西"]
+    # Forecast steps older than 24 hours: six of the first run, and the whole ended series.
+    assert result.pruned_forecasts == 6 + 1
+    assert db.scalar(select(func.count()).select_from(ForecastPoint)) == 6 + 12
+    assert db.scalar(select(func.count()).select_from(ForecastSeries)) == 0
+    # Both pruned runs moved to the history; the 20-day-old archive day fell out of FORECAST_HISTORY_DAYS.
+    assert result.pruned_forecast_history == 1
+    archived = {
+        row.lat: (row.start_time.replace(tzinfo=timezone.utc), row.count) for row in db.scalars(select(ForecastHistory))
+    }
+    assert archived == {39.9: (NOW - timedelta(hours=30), 6), 41.9: (NOW - timedelta(days=3), 24)}
+    assert result.statements[0] == "VACUUM" and 'ANALYZE "warning_records"' in result.statements
+    db.close()
+    engine.dispose()
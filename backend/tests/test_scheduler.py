@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.core.config import Settings
+from app.models import ForecastPoint, JobLease, WarningRecord
+from app.services.scheduler import RETENTION_JOB, WARNINGS_JOB, RefreshScheduler, next_warning_interval
+from app.storage.repository import WeatherRepository
+
+
+def test_due_job_is_claimed_by_one_owner_only(session_factory) -> None:
+    first, second = WeatherRepository(session_factory()), WeatherRepository(session_factory())
+    first.ensure_jobs({"warnings": 300, "forecast:1.0000,2.0000": 3600})
+    second.ensure_jobs({"warnings": 300, "forecast:1.0000,2.0000": 3600})
+
+    assert sorted(key for key, _ in first.claim_due_jobs("a", 600, 10)) == ["forecast:1.0000,2.0000", "warnings"]
+    assert second.claim_due_jobs("b", 600, 10) == []
+
+    first.release_job("warnings", "a", 300)
+    assert second.claim_due_jobs("b", 600, 10) == []
+    second.ensure_jobs({"warnings": 300})
+    assert second.db.scalars(select(JobLease.job_key)).all() == ["warnings"]
+
+
+def test_tick_runs_due_jobs_and_leaves_them_scheduled(session_factory) -> None:
+    settings = Settings(warning_provider="mock", forecast_provider="mock", ingestion_max_concurrency=100)
+    scheduler = RefreshScheduler(session_factory, settings=settings, owner="worker-1")
+
+    ran = asyncio.run(scheduler.tick())
+
+    db = session_factory()
+    locations = db.scalar(select(func.count()).where(JobLease.job_key.like("forecast:%")))
+    assert {WARNINGS_JOB, RETENTION_JOB} <= set(ran) and len(ran) == locations + 2
+    cells = select(ForecastPoint.lat, ForecastPoint.lon).distinct().subquery()
+    assert db.scalar(select(func.count()).select_from(cells)) == locations
+    assert db.scalar(select(func.count()).select_from(WarningRecord)) > 0
+    assert db.scalar(select(func.count()).where(JobLease.owner.is_not(None))) == 0
+    assert asyncio.run(RefreshScheduler(session_factory, settings=settings, owner="worker-2").tick()) == []
+
+
+def test_national_warning_interval_backs_off_until_a_change() -> None:
+    settings = Settings(warning_refresh_minutes=5, nmc_max_refresh_minutes=30)
+
+    assert next_warning_interval(300, False, settings, adaptive=True) == 600
+    assert next_warning_interval(1200, False, settings, adaptive=True) == 1800
+    assert next_warning_interval(1800, False, settings, adaptive=True) == 1800
+    assert next_warning_interval(1800, True, settings, adaptive=True) == 300
+    assert next_warning_interval(1800, False, settings, adaptive=False) == 300
@@ -0,0 +1,34 @@
+import math
+import random
+
+from app.services.spatial import CellIndex, cell_key, snap_to_grid
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def test_nearby_points_share_a_grid_cell() -> None:
+    assert snap_to_grid(39.9042, 116.4074, 0.1) == (39.9, 116.4)
+    assert cell_key(39.9042, 116.4074, 0.1) == cell_key(39.8791, 116.3822, 0.1)
+    assert cell_key(39.9042, 116.4074, 0.1) != cell_key(39.9042, 116.5074, 0.1)
+
+
+def test_cell_index_matches_brute_force_nearest() -> None:
+    rng = random.Random(7)
+    cells = [(idx, rng.uniform(18, 53), rng.uniform(73, 135)) for idx in range(500)]
+    index = CellIndex(cells)
+
+    for _ in range(200):
+        lat, lon = rng.uniform(18, 53), rng.uniform(73, 135)
+        expected = min(cells, key=lambda cell: _haversine_km(lat, lon, cell[1], cell[2]))
+        assert index.nearest(lat, lon, radius_km=10_000) == expected[0]
+
+
+def test_cell_index_respects_radius() -> None:
+    index = CellIndex([(1, 39.9, 116.4)])
+    assert index.nearest(39.95, 116.45, radius_km=50) == 1
+    assert index.nearest(31.2, 121.5, radius_km=50) is None
+    assert CellIndex([]).nearest(39.9, 116.4, radius_km=50) is None
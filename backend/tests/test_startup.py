@@ -0,0 +1,63 @@
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from app import main
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Only needed once ingestion runs; the API process must not import them.
+INGESTION_ONLY = {
+    "httpx",
+    "dateutil",
+    "app.core.http",
+    "app.providers.nmc_provider",
+    "app.providers.openmeteo_provider",
+    "app.providers.qweather_provider",
+    "app.services.ai_extractor",
+}
+
+# Self time of the app's own modules, in microseconds; well above a typical run to stay stable on slow CI hosts.
+APP_IMPORT_BUDGET_US = 250_000
+
+
+def _import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_api_import_stays_lean() -> None:
+    times = _import_times("app.main")
+
+    assert INGESTION_ONLY.isdisjoint(times)
+    app_time = sum(value for name, value in times.items() if name == "app" or name.startswith("app."))
+    assert app_time < APP_IMPORT_BUDGET_US
+
+
+def test_startup_ingestion_runs_off_the_event_loop(monkeypatch) -> None:
+    threads: list[threading.Thread] = []
+    monkeypatch.setattr(main.settings, "ingest_on_startup", True)
+    monkeypatch.setattr(main.Base.metadata, "create_all", lambda bind: None)
+    monkeypatch.setattr(main, "_ingest_once", lambda: threads.append(threading.current_thread()))
+
+    async def start() -> None:
+        await main.on_startup()
+        await main.app.state.ingestion_task
+
+    asyncio.run(start())
+
+    assert threads and threads[0] is not threading.main_thread()
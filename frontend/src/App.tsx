@@ -1,9 +1,9 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { ChinaMapPanel } from "./components/ChinaMapPanel";
 import { ForecastChart } from "./components/ForecastChart";
 import { LocationPanel } from "./components/LocationPanel";
 import { WarningList } from "./components/WarningList";
-import { fetchDashboard } from "./services/api";
+import { fetchDashboard, subscribeWarningChanges } from "./services/api";
 import { DashboardResponse, LocationPayload, MapPickPoint, ProvinceCoord, SelectedLocation, WarningItem } from "./types";
 
 const defaultLocation: SelectedLocation = {
@@ -64,7 +64,10 @@ export default function App() {
   const [selectedLocation, setSelectedLocation] = useState<SelectedLocation>(defaultLocation);
   const [activeWarningKey, setActiveWarningKey] = useState<string>("");
 
+  const lastPayload = useRef<LocationPayload>(defaultLocation);
+
   const load = async (payload: LocationPayload) => {
+    lastPayload.current = payload;
     setLoading(true);
     setError("");
     try {
@@ -81,6 +84,9 @@ export default function App() {
     void load(defaultLocation);
   }, []);
 
+  // Reload only when the server pushes a warning change instead of polling.
+  useEffect(() => subscribeWarningChanges(() => void load(lastPayload.current)), []);
+
   const submitLocation = () => {
     void load(selectedLocation);
   };
@@ -128,8 +134,11 @@ export default function App() {
     <main className="page">
       <header>
         <h1>全国极端天气展示看板</h1>
-        <p>当前刷新周期：30 分钟，当前省份优先高亮</p>
+        <p>{data ? `预警刷新周期：${data.refresh_interval_minutes} 分钟，` : ""}当前省份优先高亮</p>
         {data?.last_refresh_at && <p>最近刷新：{new Date(data.last_refresh_at).toLocaleString()}</p>}
+        {data && data.stale_sources.length > 0 && (
+          <p className="error">数据源暂时不可用，正在展示最近一次成功获取的数据：{data.stale_sources.join("、")}</p>
+        )}
       </header>
 
       <LocationPanel value={selectedLocation} onChange={setSelectedLocation} onSubmit={submitLocation} />
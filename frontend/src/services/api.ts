@@ -13,3 +13,11 @@ export async function fetchDashboard(payload: LocationPayload): Promise<Dashboar
 
   return response.json() as Promise<DashboardResponse>;
 }
+
+// Calls `onChange` whenever a refresh changes warnings, or when the stream asks the client to resync.
+export function subscribeWarningChanges(onChange: () => void): () => void {
+  const source = new EventSource("/api/v1/warnings/stream");
+  source.addEventListener("warnings", onChange);
+  source.addEventListener("resync", onChange);
+  return () => source.close();
+}
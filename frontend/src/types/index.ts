@@ -51,4 +51,5 @@ export type DashboardResponse = {
   forecast_points: ForecastPoint[];
   last_refresh_at: string | null;
   refresh_interval_minutes: number;
+  stale_sources: string[];
 };
@@ -1,40 +1,46 @@
-from apscheduler.schedulers.blocking import BlockingScheduler
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from prometheus_client import start_http_server
 
 from app.core.config import get_settings
-from app.core.database import Base
-from app.services.ingestion import IngestionInput, IngestionService
-from app.storage.repository import WeatherRepository
+from app.core.database import Base, SessionLocal, engine
+from app.core.http import HttpPool
+from app.services.scheduler import RefreshScheduler
 
 settings = get_settings()
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {})
-SessionLocal = sessionmaker(bind=engine)
+# One pooled client for the whole worker process, so keep-alive connections survive between cycles.
+http_pool = HttpPool(settings)
+# Jobs are leased through the database, so any number of workers can run this loop side by side.
+refresh_scheduler = RefreshScheduler(SessionLocal, settings=settings, http=http_pool)
 
 
-def run_refresh() -> None:
-    db = SessionLocal()
+async def run() -> None:
+    Base.metadata.create_all(bind=engine)
+    if settings.metrics_enabled and settings.worker_metrics_port:
+        # Scraped separately from the API; the exporter runs on its own daemon thread.
+        start_http_server(settings.worker_metrics_port)
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        refresh_scheduler.tick,
+        "interval",
+        seconds=settings.scheduler_tick_seconds,
+        id="weather_refresh",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    await refresh_scheduler.tick()
+    scheduler.start()
     try:
-        repository = WeatherRepository(db)
-        service = IngestionService(repository, settings=settings)
-        service.refresh(
-            IngestionInput(
-                lat=settings.default_lat,
-                lon=settings.default_lon,
-                province=settings.default_province,
-                label=settings.default_label,
-            )
-        )
+        await asyncio.Event().wait()
     finally:
-        db.close()
+        scheduler.shutdown(wait=False)
+        await http_pool.aclose()
 
 
 def main() -> None:
-    Base.metadata.create_all(bind=engine)
-    scheduler = BlockingScheduler()
-    scheduler.add_job(run_refresh, "interval", minutes=settings.refresh_interval_minutes, id="weather_refresh", replace_existing=True)
-    run_refresh()
-    scheduler.start()
+    asyncio.run(run())
 
 
 if __name__ == "__main__":